@@ -0,0 +1,124 @@
+# bench_startup.py — how long the `courtroom` command takes to start, and what it loads
+#
+#   python benchmarks/bench_startup.py --json startup.json
+#   python benchmarks/bench_startup.py --baseline startup.json   # exit 1 on regression
+#
+# Every measurement is a fresh interpreter, so nothing is cached in sys.modules. Exits 1
+# if a command that needs no provider loads a heavy dependency.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded only when trials actually run (or the UI is served)
+HEAVY = ("openai", "aiohttp", "requests", "streamlit", "pandas", "sqlite3", "asyncio")
+
+# Name -> courtroom arguments; "dry-run" plans without building a trial
+COMMANDS = {
+    "help": ["--help"],
+    "run_batch_help": ["run-batch", "--help"],
+    "dry_run": ["run-batch", "--dry-run", "--cases", "50"],
+}
+
+# Runs a command in-process and reports which heavy modules it left behind
+_PROBE = """
+import contextlib, io, json, sys
+from courtroom_simulator.cli import main
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        main({args!r})
+    except SystemExit:
+        pass
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time and lazy imports")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per command; the median is reported")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file to compare against; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown before a timing counts as a regression")
+    return parser.parse_args()
+
+
+def median_ms(argv: list[str], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(argv, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - started)
+    return round(statistics.median(times) * 1000, 1)
+
+
+def import_ms(module: str) -> float:
+    """Cumulative import time of `module` from `python -X importtime`, in ms."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return round(int(fields[1]) / 1000, 1)
+    return 0.0
+
+
+def loaded_heavy(args: list[str]) -> list[str]:
+    result = subprocess.run([sys.executable, "-c", _PROBE.format(args=args, heavy=HEAVY)],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(repeat: int) -> dict:
+    results = {"interpreter_ms": median_ms([sys.executable, "-c", "pass"], repeat)}
+    for name, args in COMMANDS.items():
+        results[f"{name}_ms"] = median_ms([sys.executable, "-m", "courtroom_simulator", *args], repeat)
+    for module in ("courtroom_simulator.cli", "courtroom_simulator.batch_trialrunner",
+                   "courtroom_simulator.trial_factory"):
+        results[f"import_{module.rsplit('.', 1)[-1]}_ms"] = import_ms(module)
+    results["heavy_modules"] = {name: loaded_heavy(args) for name, args in COMMANDS.items()}
+    return results
+
+
+def main():
+    args = parse_args()
+    results = measure(args.repeat)
+    floor = results["interpreter_ms"]
+    print(f"🐍 Interpreter alone: {floor} ms")
+    for name in COMMANDS:
+        print(f"   ⏱️ courtroom {' '.join(COMMANDS[name])}: {results[f'{name}_ms']} ms "
+              f"(+{results[f'{name}_ms'] - floor:.1f} ms)")
+    print(f"   📦 import cli {results['import_cli_ms']} ms, batch runner {results['import_batch_trialrunner_ms']} ms, "
+          f"trial machinery {results['import_trial_factory_ms']} ms")
+    failed = False
+    for name, modules in results["heavy_modules"].items():
+        if modules:
+            failed = True
+            print(f"❌ courtroom {' '.join(COMMANDS[name])} loaded {', '.join(modules)}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name in COMMANDS:
+            # Compared above the interpreter's own start-up, which the package cannot change
+            old = baseline[f"{name}_ms"] - baseline["interpreter_ms"]
+            new = results[f"{name}_ms"] - floor
+            if old > 0 and (new - old) / old > args.tolerance:
+                failed = True
+                print(f"❌ Regression: {name}: +{old:.1f} ms -> +{new:.1f} ms")
+    if failed:
+        sys.exit(1)
+    print("✅ Start-up loads no provider client")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# bench_trials.py — offline orchestration benchmark on the deterministic fake backend
+#
+#   python benchmarks/bench_trials.py --trials 20 --json bench.json
+#   python benchmarks/bench_trials.py --trials 20 --baseline bench.json   # exit 1 on regression
+#
+# No network and no provider quota: every completion comes from FakeBackend, so calls and
+# tokens per trial are exactly reproducible for a given seed and only change when the
+# orchestration does.
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from courtroom_simulator.agents.backends import FakeBackend  # noqa: E402
+from courtroom_simulator.agents.base_agent import BaseAgent  # noqa: E402
+from courtroom_simulator.agents.memory import build_memory  # noqa: E402
+from courtroom_simulator.agents.rate_limit import RateLimiter  # noqa: E402
+from courtroom_simulator.case_store import open_cases  # noqa: E402
+from courtroom_simulator.scheduler import TrialScheduler  # noqa: E402
+from courtroom_simulator.trial_factory import abuild_trial  # noqa: E402
+
+# Metric -> direction in which it gets worse
+REGRESSIONS = {
+    "trials_per_s": "lower",
+    "calls_per_trial": "higher",
+    "examination_calls_per_trial": "higher",
+    "prompt_tokens_per_trial": "higher",
+    "completion_tokens_per_trial": "higher",
+    "memory_per_trial_kb": "higher",
+    "shared_prefix_ratio": "lower",
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark trial orchestration against a fake LLM")
+    parser.add_argument("--data", default=os.path.join(ROOT, "cases.csv"),
+                        help="preprocessed case store directory or raw cases CSV")
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--memory", choices=["full", "window", "budget", "summary"], default="summary")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds added to the latency")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls answered 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="fraction of calls answered 503")
+    parser.add_argument("--speculative", action="store_true")
+    parser.add_argument("--compact", action="store_true", help="several decisions per call, as JSON")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file to compare against; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed relative change before a metric counts as a regression")
+    return parser.parse_args()
+
+
+def run_trials(cases: list[dict], args) -> tuple[dict, float]:
+    """Run every case once on a fresh fake backend; returns ({case_id: trial}, seconds)."""
+    BaseAgent.backend = FakeBackend(seed=args.seed, latency=args.latency, jitter=args.jitter,
+                                    rate_limit_rate=args.rate_limit_rate,
+                                    server_error_rate=args.server_error_rate, retry_after=0.0)
+    BaseAgent.default_memory = build_memory(args.memory)
+    if args.rate_limit_rate:
+        # Unbounded budget; only here so 429s take the real backoff-and-retry path
+        BaseAgent.rate_limiter = RateLimiter(requests_per_minute=1e9, tokens_per_minute=1e12, max_backoff=0.0)
+    scheduler = TrialScheduler(max_concurrent_trials=args.concurrency)
+    options = {"speculative": args.speculative, "compact": args.compact}
+    jobs = [(case["id"], lambda text=case["text"]: abuild_trial(text, **options)) for case in cases]
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # the trials narrate every turn
+        results = asyncio.run(scheduler.arun(jobs))
+    return results, time.perf_counter() - started
+
+
+def measure(cases: list[dict], args) -> dict:
+    results, elapsed = run_trials(cases, args)
+    failed = [case_id for case_id, trial in results.items() if isinstance(trial, Exception)]
+    trials = [trial for trial in results.values() if not isinstance(trial, Exception)]
+    usage = [trial.token_usage() for trial in trials]
+    reuse = [trial.prefix_reuse()["total"] for trial in trials]
+    examination = [sum(trial.phase_calls.get(phase, 0) for phase in ("prosecution_case", "defense_case"))
+                   for trial in trials]
+    n = max(len(trials), 1)
+    del results, trials
+
+    # Second, identical pass under tracemalloc: what a finished trial keeps alive
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    retained, _ = run_trials(cases, args)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+
+    return {
+        "trials": len(usage),
+        "failed": len(failed),
+        "seconds": round(elapsed, 3),
+        "trials_per_s": round(len(usage) / elapsed, 2) if elapsed else 0.0,
+        "calls_per_trial": round(sum(u["calls"] for u in usage) / n, 2),
+        "examination_calls_per_trial": round(sum(examination) / n, 2),
+        "prompt_tokens_per_trial": round(sum(u["prompt_tokens"] for u in usage) / n, 1),
+        "completion_tokens_per_trial": round(sum(u["completion_tokens"] for u in usage) / n, 1),
+        "shared_prefix_ratio": round(sum(r["shared_prefix_tokens"] for r in reuse)
+                                     / max(sum(r["prompt_tokens"] for r in reuse), 1), 3),
+        "memory_per_trial_kb": round((current - before) / n / 1024, 1),
+        "peak_memory_kb": round((peak - before) / 1024, 1),
+        "backend": dict(BaseAgent.backend.stats),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for metric, worse in REGRESSIONS.items():
+        old, new = baseline.get(metric), results.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        if (worse == "higher" and change > tolerance) or (worse == "lower" and change < -tolerance):
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    cases = list(open_cases(args.data).iter_cases(limit=args.trials))
+    results = measure(cases, args)
+    results["config"] = {key: value for key, value in vars(args).items() if key not in ("json", "baseline")}
+
+    print(f"🏁 {results['trials']} trials ({results['failed']} failed) in {results['seconds']}s "
+          f"-> {results['trials_per_s']} trials/s")
+    print(f"   📞 {results['calls_per_trial']} calls/trial, {results['prompt_tokens_per_trial']} prompt / "
+          f"{results['completion_tokens_per_trial']} completion tokens/trial")
+    print(f"   ❓ {results['examination_calls_per_trial']} calls/trial examining witnesses")
+    print(f"   🔁 {results['shared_prefix_ratio']:.1%} of prompt tokens repeat a prefix the agent already sent")
+    print(f"   🧠 {results['memory_per_trial_kb']} KiB retained per trial, peak {results['peak_memory_kb']} KiB")
+    backend = results["backend"]
+    print(f"   🧪 Fake backend: {backend.get('requests', 0)} requests, {backend.get('rate_limited', 0)} x 429, "
+          f"{backend.get('server_errors', 0)} x 503")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"❌ Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
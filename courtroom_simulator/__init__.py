@@ -0,0 +1,3 @@
+"""Multi-agent courtroom trial simulation over LLMs."""
+
+__version__ = "0.1.0"
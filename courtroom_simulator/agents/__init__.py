@@ -0,0 +1 @@
+"""Trial participants and the LLM plumbing they share."""
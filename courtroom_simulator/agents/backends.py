@@ -0,0 +1,378 @@
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Iterator, Optional, Union
+
+from .env import load_env
+from .llm_cache import cache_key
+from .tokens import count_message_tokens, count_tokens
+
+GROQ_API_BASE = "https://api.groq.com/openai/v1"
+
+
+class BackendError(Exception):
+    """A provider call failed; `status` is the HTTP status when there was one.
+
+    `retryable` says whether sending the same request again may succeed: by default for
+    429, 408, 409, 5xx and failures without a status (timeouts, dropped connections).
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None,
+                 retryable: Optional[bool] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        if retryable is None:
+            retryable = status is None or status in (408, 409, 429) or status >= 500
+        self.retryable = retryable
+
+
+class RateLimitError(BackendError):
+    """HTTP 429: the caller should back off (for `retry_after` seconds if given) and retry."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message, status=429, retry_after=retry_after)
+
+
+class BackendTimeout(BackendError):
+    """No response in time; the request may or may not have reached the provider."""
+
+
+def _as_chunk(response: dict) -> dict:
+    """A whole response as a single streaming chunk."""
+    content = response["choices"][0]["message"]["content"]
+    return {"choices": [{"delta": {"content": content}}], "usage": response.get("usage")}
+
+
+class LLMBackend:
+    """Chat-completion transport used by BaseAgent.
+
+    `request` is an OpenAI-style dict (model, messages, temperature, max_tokens); the
+    result has the OpenAI response shape: {"choices": [{"message": {"content"}}], "usage"}.
+    `stream`/`astream` yield OpenAI-style chunks ({"choices": [{"delta": {"content"}}]},
+    optionally with "usage" on the last one); by default the whole reply is one chunk.
+    """
+
+    def create(self, request: dict) -> dict:
+        raise NotImplementedError
+
+    async def acreate(self, request: dict) -> dict:
+        return await asyncio.to_thread(self.create, request)
+
+    def stream(self, request: dict) -> Iterator[dict]:
+        yield _as_chunk(self.create(request))
+
+    async def astream(self, request: dict) -> AsyncIterator[dict]:
+        yield _as_chunk(await self.acreate(request))
+
+    def http_pool(self, max_connections: int = 100):
+        """Async context in which concurrent calls share one connection pool; transports
+        without connections need none."""
+        return _no_pool()
+
+
+@asynccontextmanager
+async def _no_pool():
+    # contextlib.nullcontext only supports `async with` from Python 3.10
+    yield
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _translate(error: Exception) -> BackendError:
+    """The `openai` client's exception as a BackendError the retry policy understands."""
+    import openai
+
+    if isinstance(error, openai.error.RateLimitError):
+        return RateLimitError(str(error), _retry_after(error))
+    if isinstance(error, openai.error.Timeout):
+        return BackendTimeout(str(error))
+    if isinstance(error, openai.error.APIConnectionError):
+        return BackendError(str(error))
+    status = getattr(error, "http_status", None)
+    # Anything else without a status (bad arguments, auth setup) will fail the same way again
+    return BackendError(str(error), status=status, retry_after=_retry_after(error),
+                        retryable=None if status else False)
+
+
+@asynccontextmanager
+async def pooled_http_session(max_connections: int = 100):
+    """Route every `openai` async call made inside this context through one aiohttp connection pool."""
+    import aiohttp
+    import openai
+
+    connector = aiohttp.TCPConnector(limit=max_connections)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        token = openai.aiosession.set(session)
+        try:
+            yield session
+        finally:
+            openai.aiosession.reset(token)
+
+
+class OpenAIBackend(LLMBackend):
+    """Any OpenAI-compatible endpoint through the `openai` client; Groq by default.
+
+    The key and base URL are read per call (GROQ_API_TOKEN / LLM_API_BASE) unless given,
+    after loading .env on first use; neither `openai` nor `dotenv` is imported before then. Every call carries `timeout` and
+    blocking calls share one keep-alive connection pool of `pool_size` connections
+    (async calls use the aiohttp pool of `http_pool`). Client errors come
+    back as BackendError, never as reply text.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, api_base: Optional[str] = None,
+                 timeout: Optional[float] = 60.0, pool_size: int = 32):
+        self.api_key = api_key
+        self.api_base = api_base
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _http_session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+            return self._session
+
+    def _credentials(self) -> dict:
+        load_env()
+        return {
+            "api_key": self.api_key or os.getenv("GROQ_API_TOKEN"),
+            "api_base": self.api_base or os.getenv("LLM_API_BASE", GROQ_API_BASE),
+            "request_timeout": self.timeout,
+        }
+
+    def http_pool(self, max_connections: int = 100):
+        return pooled_http_session(max_connections)
+
+    def _pooled(self):
+        import openai
+
+        # The client reads its requests session from a module global; keep it on ours
+        openai.requestssession = self._http_session()
+        return openai
+
+    def create(self, request: dict) -> dict:
+        openai = self._pooled()
+        try:
+            return openai.ChatCompletion.create(**request, **self._credentials())
+        except openai.error.OpenAIError as e:
+            raise _translate(e) from e
+
+    async def acreate(self, request: dict) -> dict:
+        import openai
+
+        try:
+            return await openai.ChatCompletion.acreate(**request, **self._credentials())
+        except openai.error.OpenAIError as e:
+            raise _translate(e) from e
+
+    def stream(self, request: dict) -> Iterator[dict]:
+        openai = self._pooled()
+        try:
+            yield from openai.ChatCompletion.create(**request, **self._credentials(), stream=True)
+        except openai.error.OpenAIError as e:
+            raise _translate(e) from e
+
+    async def astream(self, request: dict) -> AsyncIterator[dict]:
+        import openai
+
+        try:
+            async for chunk in await openai.ChatCompletion.acreate(**request, **self._credentials(), stream=True):
+                yield chunk
+        except openai.error.OpenAIError as e:
+            raise _translate(e) from e
+
+
+# === Deterministic stand-in for offline runs and benchmarks ===
+Reply = Union[str, Callable[[random.Random, dict], str]]
+
+FILLER = ("the", "court", "evidence", "witness", "record", "testimony", "counsel", "facts",
+          "appeal", "judgment", "section", "order", "statement", "respondent", "appellant")
+
+
+def _filler(rng: random.Random, request: dict) -> str:
+    words = rng.randint(8, max(8, min(request.get("max_tokens", 512), 120)))
+    return " ".join(rng.choice(FILLER) for _ in range(words)).capitalize() + "."
+
+
+def _question(rng: random.Random, request: dict) -> str:
+    question = "Where were you on the day in question?"
+    return question + " No further questions." if rng.random() < 0.35 else question
+
+
+def _finding(rng: random.Random, request: dict) -> str:
+    """One of the findings the prompt offers ("the defendant [liable/not liable]", "one of: guilty, not guilty")."""
+    offered = re.search(r"the defendant \[([^\]]*)\]|one of: ([^.]*)", request["messages"][-1]["content"])
+    labels = re.split(r"\s*[/,]\s*", offered.group(1) or offered.group(2)) if offered else ["guilty", "not guilty"]
+    return rng.choice(labels)
+
+
+# Compact protocol (JSON) replies, with the same odds per question as the free-text ones
+def _listed(prompt: str, end: str) -> list[int]:
+    """Numbers of the numbered lines just before the last `end` in `prompt`."""
+    numbers = []
+    for line in reversed(prompt[:prompt.rfind(end)].splitlines()):
+        match = re.match(r"(\d+)\. ", line)
+        if not match:
+            break
+        numbers.insert(0, int(match.group(1)))
+    return numbers
+
+
+def _questions_json(rng: random.Random, request: dict) -> str:
+    limit = int(re.search(r"up to (\d+)", request["messages"][-1]["content"]).group(1))
+    questions, done = [], False
+    while len(questions) < limit and not done:
+        questions.append("Where were you on the day in question?")
+        done = rng.random() < 0.35
+    return json.dumps({"questions": questions, "done": done})
+
+
+def _objections_json(rng: random.Random, request: dict) -> str:
+    numbers = _listed(request["messages"][-1]["content"], "Should you object")
+    return json.dumps({"objections": [{"question": n, "grounds": "Leading the witness."}
+                                      for n in numbers if rng.random() < 0.25]})
+
+
+def _rulings_json(rng: random.Random, request: dict) -> str:
+    numbers = _listed(request["messages"][-1]["content"], "Rule on each")
+    return json.dumps({"rulings": [{"question": n, "ruling": rng.choice(["overruled", "sustained"])}
+                                   for n in numbers]})
+
+
+def _answers_json(rng: random.Random, request: dict) -> str:
+    numbers = _listed(request["messages"][-1]["content"], "Reply with JSON")
+    return json.dumps({"answers": [_filler(rng, request) for _ in numbers]})
+
+
+# Checked in order against the last user message; the first match answers
+DEFAULT_SCRIPT = [
+    (r'\{"questions": \[', _questions_json),
+    (r'\{"objections": \[', _objections_json),
+    (r'\{"rulings": \[', _rulings_json),
+    (r'\{"answers": \[', _answers_json),
+    (r"criminal or civil", lambda rng, request: rng.choice(["criminal", "civil"])),
+    (r"Should you object", lambda rng, request: "Objection, leading the witness." if rng.random() < 0.25
+        else "No objection."),
+    (r"raised an objection", lambda rng, request: rng.choice(["Overruled.", "Sustained."])),
+    (r"State your finding", _finding),
+    (r"deliver your verdict", lambda rng, request: _filler(rng, request) + " I find the defendant "
+        + _finding(rng, request) + "."),
+    (r"Ask .* question", _question),
+]
+
+
+class FakeBackend(LLMBackend):
+    """Seeded, in-process fake LLM: scripted replies, simulated latency and failures.
+
+    Replies depend only on `seed` and the request, so a run is reproducible no matter how
+    concurrent calls interleave. Each attempt (seeded by how often that request has been
+    sent) fails with HTTP 429 or 5xx at the given rates, which exercises the rate limiter
+    and retry paths without a network and without changing the replies that get through.
+    """
+
+    def __init__(self, seed: int = 0, latency: float = 0.0, jitter: float = 0.0, token_latency: float = 0.0,
+                 rate_limit_rate: float = 0.0, server_error_rate: float = 0.0,
+                 retry_after: Optional[float] = 0.05,
+                 script: Optional[list[tuple[str, Reply]]] = None):
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.token_latency = token_latency  # streaming: seconds between chunks after the first
+        self.rate_limit_rate = rate_limit_rate
+        self.server_error_rate = server_error_rate
+        self.retry_after = retry_after
+        self.script = [(re.compile(pattern), reply) for pattern, reply in (script or []) + DEFAULT_SCRIPT]
+        self.stats = Counter()
+        self._attempts = Counter()
+        self._lock = threading.Lock()
+
+    def _rngs(self, request: dict) -> tuple[random.Random, random.Random]:
+        """(per-attempt generator for latency and faults, per-request generator for the reply)"""
+        key = cache_key(request)
+        with self._lock:
+            attempt = self._attempts[key]
+            self._attempts[key] += 1
+        return random.Random(f"{self.seed}:{key}:{attempt}"), random.Random(f"{self.seed}:{key}")
+
+    def _reply(self, rng: random.Random, request: dict) -> str:
+        prompt = request["messages"][-1]["content"]
+        for pattern, reply in self.script:
+            if pattern.search(prompt):
+                return reply(rng, request) if callable(reply) else reply
+        return _filler(rng, request)
+
+    def _respond(self, attempt_rng: random.Random, rng: random.Random, request: dict) -> dict:
+        roll = attempt_rng.random()
+        with self._lock:
+            self.stats["requests"] += 1
+            if roll < self.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+            elif roll < self.rate_limit_rate + self.server_error_rate:
+                self.stats["server_errors"] += 1
+        if roll < self.rate_limit_rate:
+            raise RateLimitError("Rate limit reached (fake backend)", self.retry_after)
+        if roll < self.rate_limit_rate + self.server_error_rate:
+            raise BackendError("Service unavailable (fake backend)", status=503)
+        text = self._reply(rng, request)
+        prompt_tokens = count_message_tokens(request["messages"])
+        completion_tokens = min(count_tokens(text), request.get("max_tokens", 512))
+        return {
+            "choices": [{"message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def _delay(self, rng: random.Random) -> float:
+        return max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+
+    def create(self, request: dict) -> dict:
+        attempt_rng, rng = self._rngs(request)
+        time.sleep(self._delay(attempt_rng))
+        return self._respond(attempt_rng, rng, request)
+
+    async def acreate(self, request: dict) -> dict:
+        attempt_rng, rng = self._rngs(request)
+        await asyncio.sleep(self._delay(attempt_rng))
+        return self._respond(attempt_rng, rng, request)
+
+    def _chunks(self, response: dict) -> list[dict]:
+        words = response["choices"][0]["message"]["content"].split(" ")
+        chunks = [{"choices": [{"delta": {"content": word if i == 0 else " " + word}}]}
+                  for i, word in enumerate(words)]
+        chunks[-1]["usage"] = response["usage"]
+        return chunks
+
+    def stream(self, request: dict) -> Iterator[dict]:
+        response = self.create(request)
+        for i, chunk in enumerate(self._chunks(response)):
+            if i:
+                time.sleep(self.token_latency)
+            yield chunk
+
+    async def astream(self, request: dict) -> AsyncIterator[dict]:
+        response = await self.acreate(request)
+        for i, chunk in enumerate(self._chunks(response)):
+            if i:
+                await asyncio.sleep(self.token_latency)
+            yield chunk
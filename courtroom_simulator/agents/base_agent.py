@@ -1,40 +1,425 @@
-
-import os
-import openai
-from dotenv import load_dotenv
-
-load_dotenv()
-
-openai.api_key = os.getenv("GROQ_API_TOKEN")
-openai.api_base = "https://api.groq.com/openai/v1"
-
-
-class BaseAgent:
-    def __init__(self, name: str, system_prompt: str, model: str = "llama-3.3-70b-versatile"):
-        self.name = name
-        self.system_prompt = system_prompt.strip()
-        self.history = []
-        self.model = model
-
-    def _format_messages(self, user_msg: str):
-        messages = [{"role": "system", "content": self.system_prompt}]
-        messages.extend(self.history)
-        messages.append({"role": "user", "content": user_msg})
-        return messages
-
-    def respond(self, user_msg: str, **kwargs) -> str:
-        messages = self._format_messages(user_msg)
-        try:
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=512,
-                **kwargs
-            )
-            reply = response["choices"][0]["message"]["content"].strip()
-        except Exception as e:
-            reply = f"[Error: {str(e)}]"
-        self.history.append({"role": "user", "content": user_msg})
-        self.history.append({"role": "assistant", "content": reply})
-        return reply
+import asyncio
+import copy
+import queue
+import threading
+import time
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from .backends import BackendError, LLMBackend, OpenAIBackend, RateLimitError
+from .llm_cache import ResponseCache
+from .memory import FullHistory, MemoryPolicy
+from .rate_limit import RateLimiter
+from .resilience import RetryPolicy
+from .routing import ModelRouter
+from .tokens import PrefixTracker, count_message_tokens, count_tokens
+from .tracing import Tracer
+from .transcript import private_history
+
+TokenCallback = Callable[[str], None]
+
+
+def _chunk_text(chunk: dict) -> str:
+    choices = chunk.get("choices") or [{}]
+    return (choices[0].get("delta") or {}).get("content") or ""
+
+
+def _chunk_usage(chunk: dict) -> Optional[dict]:
+    # OpenAI puts usage on the last chunk; Groq under "x_groq"
+    return chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+
+
+def _reply_text(response: dict) -> str:
+    return response["choices"][0]["message"]["content"].strip()
+
+
+class _Call:
+    """One logical completion across its attempts: where it goes and what it may cost."""
+
+    __slots__ = ("kind", "tier", "model", "request", "estimate", "reserved", "called", "prefix", "attempt")
+
+    def __init__(self, kind: str, tier: str, model: str, request: dict, estimate: int):
+        self.kind = kind
+        self.tier = tier
+        self.model = model
+        self.request = request
+        self.estimate = estimate
+        self.reserved = estimate + request["max_tokens"]  # drawn from the rate budget per attempt
+        self.called = time.perf_counter()
+        self.prefix = 0
+        self.attempt = 0
+
+
+class _StreamCollector:
+    """Forwards streamed deltas to `on_token` and assembles the full response."""
+
+    def __init__(self, on_token: TokenCallback, estimate: int, started: float):
+        self.on_token = on_token
+        self.estimate = estimate
+        self.started = started
+        self.parts = []
+        self.usage = None
+        self.ttft = None
+
+    def feed(self, chunk: dict):
+        text = _chunk_text(chunk)
+        if text:
+            if self.ttft is None:
+                self.ttft = time.perf_counter() - self.started
+            self.parts.append(text)
+            self.on_token(text)
+        self.usage = _chunk_usage(chunk) or self.usage
+
+    def failed(self, error: BackendError) -> BackendError:
+        # Tokens already reached the caller; the call must not be retried as if nothing happened
+        if self.parts:
+            return BackendError(f"Stream broke off: {error}", status=error.status, retryable=False)
+        return error
+
+    def response(self) -> dict:
+        text = "".join(self.parts)
+        usage = self.usage
+        if not usage:
+            completion = count_tokens(text)
+            usage = {"prompt_tokens": self.estimate, "completion_tokens": completion,
+                     "total_tokens": self.estimate + completion}
+        return {"choices": [{"message": {"content": text}}], "usage": dict(usage)}
+
+
+class BaseAgent:
+    # Transport for every completion; swap in a FakeBackend for offline runs
+    backend: LLMBackend = OpenAIBackend()
+    # Shared across every agent; the batch runner installs one to respect provider quotas
+    rate_limiter: Optional[RateLimiter] = None
+    # Which failed provider calls are retried and with what backoff; a call that still fails raises
+    retry_policy: RetryPolicy = RetryPolicy()
+    # Optional shared response cache consulted before every provider call
+    cache: Optional[ResponseCache] = None
+    # Optional per-call-type model selection (cheap tier for procedural calls)
+    router: Optional[ModelRouter] = None
+    # Optional per-call trace and metrics sink
+    tracer: Optional[Tracer] = None
+    # Prototype copied into every new agent; swap in a bounded policy to cap prompt growth
+    default_memory: MemoryPolicy = FullHistory()
+
+    def __init__(self, name: str, system_prompt: str, model: str = "llama-3.3-70b-versatile"):
+        self.name = name
+        self.system_prompt = system_prompt.strip()
+        # Own record until a TrialManager attaches the agent to the shared trial transcript
+        self.history = private_history(self.name)
+        self.model = model
+        self.memory = copy.deepcopy(self.default_memory)
+        self.usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cache_hits": 0}
+        self.calls = []  # per-call token accounting, in call order
+        self.case_context = None  # optional CaseContext supplying relevant case passages per call
+        self._prefixes = {}  # model -> PrefixTracker over the requests sent to it, for `prefix_reuse`
+
+    def _context_query(self, user_msg: str) -> str:
+        recent = [m["content"] for m in self.history[-2:]]
+        return " ".join(recent + [user_msg])
+
+    def _format_messages(self, user_msg: str):
+        # Fixed order so consecutive prompts share a byte-identical prefix that servers with
+        # prefix (KV) caching reuse: persona and case brief, the history, then the current turn
+        system_prompt = self.system_prompt
+        turn = user_msg
+        if self.case_context:
+            system_prompt += self.case_context.header
+            passages = self.case_context.render(self._context_query(user_msg))
+            if passages:
+                # Query-dependent, so kept out of the prefix; the history records `user_msg` only
+                turn = f"{passages}\n\n{user_msg}"
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend(self.memory.select(self.history))
+        messages.append({"role": "user", "content": turn})
+        return messages
+
+    def _request(self, messages: list[dict], model: Optional[str] = None, **kwargs) -> dict:
+        request = dict(model=model or self.model, messages=messages, temperature=0.7, max_tokens=512)
+        request.update(kwargs)
+        return request
+
+    def _backoff(self, error: BackendError, attempt: int) -> float:
+        """Seconds to wait before retrying; a 429 pauses every caller through the shared rate limiter instead."""
+        if isinstance(error, RateLimitError) and self.rate_limiter:
+            self.rate_limiter.penalize(error.retry_after)
+            return 0.0
+        return self.retry_policy.delay(error, attempt)
+
+    def _route(self, kind: str, escalate: bool = False) -> tuple[str, str]:
+        if self.router is None:
+            return "default", self.model
+        return self.router.route(kind, self.model, escalate)
+
+    def _can_escalate(self, kind: str) -> bool:
+        return self.router is not None and self.router.can_escalate(kind)
+
+    def _shared_prefix(self, model: str, messages: list[dict]) -> int:
+        return self._prefixes.setdefault(model, PrefixTracker()).observe(messages)
+
+    def _account(self, kind: str, tier: str, estimate: int, reserved: int, response: dict,
+                 latency: float = 0.0, cached: bool = False, ttft: Optional[float] = None,
+                 prefix: int = 0):
+        usage = response.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens") or estimate
+        completion_tokens = usage.get("completion_tokens") or 0
+        self.calls.append({
+            "kind": kind,
+            "tier": tier,
+            "estimated_prompt_tokens": estimate,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_s": round(latency, 4),
+            # Streamed calls: when the first token arrived; otherwise the whole reply did
+            "ttft_s": round(latency if ttft is None else ttft, 4),
+            # Estimated leading prompt tokens this agent already sent to the model (see PrefixTracker)
+            "shared_prefix_tokens": prefix,
+            "cached": cached,
+        })
+        if cached:
+            # Served locally: nothing was billed or drawn from the rate budget
+            self.usage["cache_hits"] += 1
+            return
+        self.usage["calls"] += 1
+        self.usage["prompt_tokens"] += prompt_tokens
+        self.usage["completion_tokens"] += completion_tokens
+        if self.rate_limiter:
+            self.rate_limiter.settle(reserved, usage.get("total_tokens"))
+        if self.router:
+            self.router.record(tier, latency, prompt_tokens, completion_tokens)
+
+    def _trace(self, kind: str, tier: str, model: str, called: float, retries: int = 0,
+               error: Optional[Exception] = None):
+        if self.tracer is None:
+            return
+        call = self.calls[-1] if error is None else {}
+        self.tracer.record_call(
+            agent=self.name, kind=kind, tier=tier, model=model,
+            wall_s=time.perf_counter() - called,
+            latency_s=call.get("latency_s"),
+            ttft_s=call.get("ttft_s"),
+            prompt_tokens=call.get("prompt_tokens", 0),
+            completion_tokens=call.get("completion_tokens", 0),
+            retries=retries, cached=call.get("cached", False),
+            error=None if error is None else str(error),
+        )
+
+    def _begin(self, messages: list[dict], kind: str, escalate: bool, **kwargs) -> "_Call":
+        tier, model = self._route(kind, escalate)
+        request = self._request(messages, model=model, **kwargs)
+        return _Call(kind, tier, model, request, count_message_tokens(messages))
+
+    def _cached(self, call: "_Call", on_token: Optional[TokenCallback]) -> Optional[str]:
+        response = self.cache.get(call.request) if self.cache else None
+        if response is None:
+            return None
+        self._account(call.kind, call.tier, call.estimate, 0, response, cached=True)
+        self._trace(call.kind, call.tier, call.model, call.called)
+        reply = _reply_text(response)
+        if on_token:
+            on_token(reply)
+        return reply
+
+    def _retry_delay(self, call: "_Call", error: Exception, stream: Optional[_StreamCollector]) -> float:
+        """Seconds to wait before the next attempt; raises `error` when it is not retried."""
+        if self.rate_limiter:
+            self.rate_limiter.refund(call.reserved)
+        if isinstance(error, BackendError):
+            error = stream.failed(error) if stream else error
+            if self.retry_policy.should_retry(error, call.attempt):
+                call.attempt += 1
+                return self._backoff(error, call.attempt - 1)
+        self._trace(call.kind, call.tier, call.model, call.called, retries=call.attempt, error=error)
+        raise error
+
+    def _finish(self, call: "_Call", response: dict, reply: str, started: float,
+                stream: Optional[_StreamCollector]) -> str:
+        self._account(call.kind, call.tier, call.estimate, call.reserved, response,
+                      time.perf_counter() - started, ttft=stream.ttft if stream else None, prefix=call.prefix)
+        if self.cache:
+            self.cache.put(call.request, response)
+        self._trace(call.kind, call.tier, call.model, call.called, retries=call.attempt)
+        return reply
+
+    def _complete(self, messages: list[dict], kind: str = "turn", escalate: bool = False,
+                  on_token: Optional[TokenCallback] = None, **kwargs) -> str:
+        call = self._begin(messages, kind, escalate, **kwargs)
+        cached = self._cached(call, on_token)
+        if cached is not None:
+            return cached
+        call.prefix = self._shared_prefix(call.model, messages)
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire(call.reserved)
+            started = time.perf_counter()
+            stream = _StreamCollector(on_token, call.estimate, started) if on_token else None
+            try:
+                if stream:
+                    for chunk in self.backend.stream(call.request):
+                        stream.feed(chunk)
+                    response = stream.response()
+                else:
+                    response = self.backend.create(call.request)
+                reply = _reply_text(response)
+            except Exception as e:
+                time.sleep(self._retry_delay(call, e, stream))
+                continue
+            return self._finish(call, response, reply, started, stream)
+
+    async def _acomplete(self, messages: list[dict], kind: str = "turn", escalate: bool = False,
+                         on_token: Optional[TokenCallback] = None, **kwargs) -> str:
+        call = self._begin(messages, kind, escalate, **kwargs)
+        cached = self._cached(call, on_token)
+        if cached is not None:
+            return cached
+        call.prefix = self._shared_prefix(call.model, messages)
+        while True:
+            if self.rate_limiter:
+                await self.rate_limiter.aacquire(call.reserved)
+            started = time.perf_counter()
+            stream = _StreamCollector(on_token, call.estimate, started) if on_token else None
+            try:
+                if stream:
+                    async for chunk in self.backend.astream(call.request):
+                        stream.feed(chunk)
+                    response = stream.response()
+                else:
+                    response = await self.backend.acreate(call.request)
+                reply = _reply_text(response)
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(call, e, stream))
+                continue
+            return self._finish(call, response, reply, started, stream)
+
+    def _summary_request(self) -> tuple[list[dict], list[dict]]:
+        turns = self.memory.pending(self.history)
+        return turns, self.memory.summary_messages(turns) if turns else []
+
+    def _summary_failed(self, error: BackendError):
+        # Condensing is an optimization: the turns stay verbatim and are folded on a later call
+        print(f"⚠️ {self.name}: history summary skipped ({error})")
+
+    def _summarize(self):
+        turns, messages = self._summary_request()
+        if turns:
+            try:
+                summary = self._complete(messages, kind="summary", max_tokens=self.memory.max_summary_tokens)
+            except BackendError as e:
+                return self._summary_failed(e)
+            self.memory.absorb(summary, len(turns))
+
+    async def _asummarize(self):
+        turns, messages = self._summary_request()
+        if turns:
+            try:
+                summary = await self._acomplete(messages, kind="summary", max_tokens=self.memory.max_summary_tokens)
+            except BackendError as e:
+                return self._summary_failed(e)
+            self.memory.absorb(summary, len(turns))
+
+    def _record(self, user_msg: str, reply: str, kind: str = "turn") -> str:
+        self.history.add(user_msg, reply, kind)
+        return reply
+
+    def prefix_reuse(self) -> dict:
+        """How much of each prompt repeated a prefix this agent had sent before (provider calls only)."""
+        calls = [c for c in self.calls if not c.get("cached")]
+        estimated = sum(c["estimated_prompt_tokens"] for c in calls)
+        shared = sum(c.get("shared_prefix_tokens", 0) for c in calls)
+        return {"calls": len(calls), "prompt_tokens": estimated, "shared_prefix_tokens": shared,
+                "ratio": shared / estimated if estimated else 0.0}
+
+    def state_dict(self) -> dict:
+        return {
+            "history": list(self.history),
+            "memory": self.memory.state_dict(),
+            "usage": dict(self.usage),
+            "calls": list(self.calls),
+        }
+
+    def load_state_dict(self, state: dict):
+        if "history" in state:  # absent when the trial transcript holds it
+            self.history = private_history(self.name)
+            self.history.load(state["history"])
+        self.memory.load_state_dict(state["memory"])
+        self.usage.update(state["usage"])
+        self.calls = list(state["calls"])
+
+    def commit(self, user_msg: str, reply: str, kind: str = "turn") -> str:
+        """Add an exchange obtained with `commit=False` to the history."""
+        return self._record(user_msg, reply, kind)
+
+    def respond(self, user_msg: str, commit: bool = True, kind: str = "turn",
+                validate: Optional[Callable[[str], bool]] = None,
+                on_token: Optional[TokenCallback] = None, **kwargs) -> str:
+        """`kind` names the call type for routing and accounting; if `validate` rejects a
+        cheap-tier reply, the call is repeated once on the large tier.
+
+        `on_token` receives the reply as it is generated. A reply that may still be
+        escalated is not streamed; it is passed to `on_token` in one piece once final.
+
+        Raises BackendError when the call fails after `retry_policy`'s retries; nothing
+        is recorded in the history then.
+        """
+        self._summarize()
+        messages = self._format_messages(user_msg)
+        may_escalate = validate is not None and self._can_escalate(kind)
+        reply = self._complete(messages, kind, on_token=None if may_escalate else on_token, **kwargs)
+        if may_escalate:
+            if not validate(reply):
+                reply = self._complete(messages, kind, escalate=True, **kwargs)
+            if on_token:
+                on_token(reply)
+        return self._record(user_msg, reply, kind) if commit else reply
+
+    async def arespond(self, user_msg: str, commit: bool = True, kind: str = "turn",
+                       validate: Optional[Callable[[str], bool]] = None,
+                       on_token: Optional[TokenCallback] = None, **kwargs) -> str:
+        await self._asummarize()
+        messages = self._format_messages(user_msg)
+        may_escalate = validate is not None and self._can_escalate(kind)
+        reply = await self._acomplete(messages, kind, on_token=None if may_escalate else on_token, **kwargs)
+        if may_escalate:
+            if not validate(reply):
+                reply = await self._acomplete(messages, kind, escalate=True, **kwargs)
+            if on_token:
+                on_token(reply)
+        return self._record(user_msg, reply, kind) if commit else reply
+
+    def stream(self, user_msg: str, **kwargs) -> Iterator[str]:
+        """`respond` as an iterator of reply fragments (the exchange is committed at the end)."""
+        fragments = queue.Queue()
+        done = object()
+
+        failure = []
+
+        def run():
+            try:
+                self.respond(user_msg, on_token=fragments.put, **kwargs)
+            except BaseException as e:
+                failure.append(e)
+            finally:
+                fragments.put(done)
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        while (fragment := fragments.get()) is not done:
+            yield fragment
+        worker.join()
+        if failure:
+            raise failure[0]
+
+    async def astream(self, user_msg: str, **kwargs) -> AsyncIterator[str]:
+        """`arespond` as an async iterator of reply fragments."""
+        fragments = asyncio.Queue()
+        done = object()
+
+        async def run():
+            try:
+                await self.arespond(user_msg, on_token=fragments.put_nowait, **kwargs)
+            finally:
+                fragments.put_nowait(done)
+
+        task = asyncio.ensure_future(run())
+        while (fragment := await fragments.get()) is not done:
+            yield fragment
+        await task
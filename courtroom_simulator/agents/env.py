@@ -0,0 +1,14 @@
+# Settings from the environment; a .env file is read on first use, not at import
+
+_loaded = False
+
+
+def load_env():
+    """Read a .env file into the environment, once; called before the first provider call
+    and by the command line before it reads its defaults."""
+    global _loaded
+    if not _loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _loaded = True
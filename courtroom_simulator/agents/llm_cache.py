@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+CACHE_MODES = ("readwrite", "replay")
+
+
+class CacheMiss(KeyError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def cache_key(request: dict) -> str:
+    # Everything that changes the completion; other kwargs (timeouts etc.) do not
+    payload = {k: request.get(k) for k in ("model", "messages", "temperature", "max_tokens")}
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+class SQLiteCache:
+    """On-disk tier; evicts least recently used rows once the stored payloads exceed `max_bytes`."""
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Sharded runs open the same file from several processes; wait out their write locks
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return row[0]
+
+    def put(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._size += size - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        while self._size > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._size -= size
+                if self._size <= self.max_bytes:
+                    break
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ResponseCache:
+    """Content-addressed cache of chat completions: in-memory LRU in front of SQLite.
+
+    In "replay" mode a miss raises `CacheMiss` instead of reaching the provider, so a
+    recorded batch can be re-run offline and any divergence shows up immediately.
+    """
+
+    def __init__(self, path: Optional[str] = None, mode: str = "readwrite",
+                 max_entries: int = 1024, max_bytes: int = 256 * 1024 * 1024):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {mode!r}; expected one of {CACHE_MODES}")
+        self.mode = mode
+        self.memory = LRUCache(max_entries)
+        self.disk = SQLiteCache(path, max_bytes) if path else None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, request: dict) -> Optional[dict]:
+        key = cache_key(request)
+        value = self.memory.get(key)
+        if value is None and self.disk:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+        if value is None:
+            self.misses += 1
+            if self.mode == "replay":
+                raise CacheMiss(f"No recorded response for request {key[:12]} (model {request.get('model')})")
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def put(self, request: dict, response: dict):
+        # Keep only what BaseAgent reads back, not the provider's full response object
+        value = json.dumps({
+            "choices": [{"message": {"content": response["choices"][0]["message"]["content"]}}],
+            "usage": dict(response.get("usage") or {}),
+        }, ensure_ascii=False)
+        key = cache_key(request)
+        self.memory.put(key, value)
+        if self.disk:
+            self.disk.put(key, value)
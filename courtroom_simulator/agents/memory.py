@@ -0,0 +1,110 @@
+from .tokens import count_message_tokens
+
+SUMMARY_PROMPT = """
+You keep the running record of a courtroom trial for one participant.
+Merge the earlier summary (if any) with the new exchanges into a concise summary in the third person.
+Keep names, claims, admissions, objections and rulings; drop pleasantries and repetition.
+Reply with the summary only.
+"""
+
+
+class MemoryPolicy:
+    """Decides which part of an agent's history is resent on each call.
+
+    The base policy resends everything. Policies that condense older turns return
+    them from `pending` and receive the condensed text through `absorb`.
+    """
+
+    def select(self, history: list[dict]) -> list[dict]:
+        return list(history)
+
+    def pending(self, history: list[dict]) -> list[dict]:
+        return []
+
+    def absorb(self, summary: str, folded: int):
+        pass
+
+    def state_dict(self) -> dict:
+        return dict(vars(self))
+
+    def load_state_dict(self, state: dict):
+        vars(self).update(state)
+
+
+class FullHistory(MemoryPolicy):
+    pass
+
+
+class SlidingWindow(MemoryPolicy):
+    """Only the last `max_turns` user/assistant exchanges."""
+
+    def __init__(self, max_turns: int = 6):
+        self.max_turns = max_turns
+
+    def select(self, history: list[dict]) -> list[dict]:
+        return list(history[-2 * self.max_turns:]) if self.max_turns else []
+
+
+class TokenBudget(MemoryPolicy):
+    """As many of the most recent exchanges as fit in `max_tokens`."""
+
+    def __init__(self, max_tokens: int = 1500):
+        self.max_tokens = max_tokens
+
+    def select(self, history: list[dict]) -> list[dict]:
+        start, used = len(history), 0
+        while start >= 2:
+            cost = count_message_tokens(history[start - 2:start])
+            if used + cost > self.max_tokens:
+                break
+            used += cost
+            start -= 2
+        return list(history[start:])
+
+
+class RollingSummary(MemoryPolicy):
+    """Keeps the last `keep_turns` exchanges verbatim and a summary of everything older.
+
+    Once `fold_every` exchanges have fallen out of the verbatim window they are handed
+    back to the agent to be condensed into the summary, so the resent history stays
+    between `keep_turns` and `keep_turns + fold_every` exchanges plus one summary.
+    """
+
+    def __init__(self, keep_turns: int = 4, fold_every: int = 4, max_summary_tokens: int = 300):
+        self.keep_turns = keep_turns
+        self.fold_every = fold_every
+        self.max_summary_tokens = max_summary_tokens
+        self.summary = ""
+        self.folded = 0  # number of history messages covered by the summary
+
+    def select(self, history: list[dict]) -> list[dict]:
+        recent = list(history[self.folded:])
+        if not self.summary:
+            return recent
+        return [{"role": "system", "content": f"Summary of the earlier proceedings:\n{self.summary}"}] + recent
+
+    def pending(self, history: list[dict]) -> list[dict]:
+        older = history[self.folded:len(history) - 2 * self.keep_turns]
+        return list(older) if len(older) >= 2 * self.fold_every else []
+
+    def summary_messages(self, turns: list[dict]) -> list[dict]:
+        lines = [f"Earlier summary:\n{self.summary or '(none)'}", "New exchanges:"]
+        lines += [f"{m['role']}: {m['content']}" for m in turns]
+        return [
+            {"role": "system", "content": SUMMARY_PROMPT.strip()},
+            {"role": "user", "content": "\n".join(lines)},
+        ]
+
+    def absorb(self, summary: str, folded: int):
+        self.summary = summary
+        self.folded += folded
+
+
+def build_memory(kind: str, **kwargs) -> MemoryPolicy:
+    policies = {
+        "full": FullHistory,
+        "window": SlidingWindow,
+        "budget": TokenBudget,
+        "summary": RollingSummary,
+    }
+    return policies[kind](**kwargs)
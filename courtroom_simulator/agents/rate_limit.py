@@ -0,0 +1,95 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to `capacity` units per `period` seconds."""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` units and return how many seconds to wait before using them.
+
+        The bucket may go negative; later callers queue up behind the debt. An amount
+        larger than the whole bucket is charged in full but only waits for a full bucket,
+        so it can go out at all; its excess is debt for the callers after it.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            shortfall = -self.tokens - max(0.0, amount - self.capacity)
+            return max(0.0, shortfall / self.rate)
+
+    def adjust(self, amount: float):
+        """Give back (positive) or charge extra (negative) units after the fact."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budget shared by every agent call.
+
+    Callers `acquire` before a request, `settle` with the real usage afterwards (or
+    `refund` the reservation when the request failed) and `penalize` when the provider
+    answers 429, which pauses all callers with exponential backoff (or the server's
+    Retry-After) instead of a fixed sleep.
+    """
+
+    def __init__(self, requests_per_minute: float = 30, tokens_per_minute: float = 6000,
+                 max_backoff: float = 60.0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_backoff = max_backoff
+        self._blocked_until = 0.0
+        self._strikes = 0
+        self._lock = threading.Lock()
+
+    def _delay(self, estimated_tokens: int) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        return time.monotonic() + wait
+
+    def _remaining(self, ready_at: float) -> float:
+        return max(ready_at, self._blocked_until) - time.monotonic()
+
+    def acquire(self, estimated_tokens: int):
+        ready_at = self._delay(estimated_tokens)
+        while (delay := self._remaining(ready_at)) > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, estimated_tokens: int):
+        ready_at = self._delay(estimated_tokens)
+        while (delay := self._remaining(ready_at)) > 0:
+            await asyncio.sleep(delay)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        if actual_tokens is not None:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+        with self._lock:
+            self._strikes = 0
+
+    def refund(self, estimated_tokens: int):
+        """Give back the tokens reserved for a request that failed instead of answering."""
+        self.tokens.adjust(estimated_tokens)
+
+    def penalize(self, retry_after: Optional[float] = None) -> float:
+        """Record a 429 and block every caller until the backoff expires."""
+        with self._lock:
+            self._strikes += 1
+            if retry_after is None:
+                backoff = min(self.max_backoff, 2 ** self._strikes)
+                retry_after = backoff / 2 + random.uniform(0, backoff / 2)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            return retry_after
@@ -0,0 +1,256 @@
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures import wait
+from typing import AsyncIterator, Iterator, Optional
+
+from .backends import BackendError, BackendTimeout, LLMBackend
+from .rate_limit import RateLimiter
+from .tokens import count_message_tokens
+
+
+class CircuitOpenError(BackendError):
+    """The endpoint failed repeatedly; calls are refused until the breaker lets one through."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message, retry_after=retry_after, retryable=True)
+
+
+class RetryPolicy:
+    """Which failed calls to retry and how long to wait first.
+
+    Only `BackendError`s marked retryable (429, 408, 5xx, timeouts, dropped connections)
+    are retried. The wait is the server's Retry-After when it sent one, otherwise
+    exponential backoff with full jitter: uniform(0, min(max_delay, base_delay * 2**attempt)).
+    """
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        return attempt < self.max_retries and isinstance(error, BackendError) and error.retryable
+
+    def delay(self, error: BackendError, attempt: int) -> float:
+        if error.retry_after is not None:
+            return min(self.max_delay, error.retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Stops calling an endpoint after `failure_threshold` consecutive failures.
+
+    While open, calls fail fast with `CircuitOpenError`; after `reset_after` seconds one
+    trial call is let through (half-open) and its outcome closes or re-opens the breaker.
+    Rate limiting (429) and client errors say nothing about the endpoint's health and
+    are not counted.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_after else "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+            wait_s = max(0.0, self.opened_at + self.reset_after - time.monotonic())
+        raise CircuitOpenError(f"Circuit open after {self.failures} consecutive failures", retry_after=wait_s or 1.0)
+
+    def record(self, error: Optional[Exception]):
+        counts = isinstance(error, BackendError) and error.status != 429 and (
+            error.status is None or error.status >= 500)
+        with self._lock:
+            self.trial_in_flight = False
+            if error is None:
+                self.failures = 0
+                self.opened_at = None
+            elif counts:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self.opened_at = time.monotonic()
+
+
+class ResilientBackend(LLMBackend):
+    """Wraps a backend with per-call timeouts, a circuit breaker and optional hedging.
+
+    - `timeout`: seconds a call may take (for streams: to each chunk) before it fails
+      with a retryable `BackendTimeout`.
+    - `hedge_after`: if a non-streamed call has not answered after this many seconds, the
+      same request is sent once more and the first success wins; the other is abandoned.
+      Hedges cost an extra request against the provider's quota, so it is off by default;
+      each one is paid for from `rate_limiter`, the budget its caller draws on.
+
+    Retries are left to the caller (BaseAgent and its RetryPolicy), which also owns the
+    shared rate limiter. Blocking calls run on a small thread pool so they can time out
+    and be hedged like the async ones.
+    """
+
+    def __init__(self, backend: LLMBackend, timeout: Optional[float] = 60.0,
+                 hedge_after: Optional[float] = None, breaker: Optional[CircuitBreaker] = None,
+                 max_workers: int = 32, rate_limiter: Optional[RateLimiter] = None):
+        self.backend = backend
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.max_workers = max_workers
+        self.stats = Counter()
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def http_pool(self, max_connections: int = 100):
+        return self.backend.http_pool(max_connections)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="llm-call")
+            return self._pool
+
+    def _finish(self, error: Optional[Exception] = None):
+        self.breaker.record(error)
+        if isinstance(error, BackendTimeout):
+            self.stats["timeouts"] += 1
+        if error is not None:
+            raise error
+
+    def _timeout_error(self) -> BackendTimeout:
+        return BackendTimeout(f"No response within {self.timeout:g}s")
+
+    def _hedge_cost(self, request: dict) -> int:
+        return count_message_tokens(request["messages"]) + request.get("max_tokens", 0)
+
+    def _hedge(self, request: dict) -> dict:
+        cost = self._hedge_cost(request)
+        if self.rate_limiter:
+            self.rate_limiter.acquire(cost)
+        try:
+            return self.backend.create(request)
+        except Exception:
+            if self.rate_limiter:
+                self.rate_limiter.refund(cost)
+            raise
+
+    async def _ahedge(self, request: dict) -> dict:
+        cost = self._hedge_cost(request)
+        if self.rate_limiter:
+            await self.rate_limiter.aacquire(cost)
+        try:
+            return await self._acall(request)
+        except Exception:
+            if self.rate_limiter:
+                self.rate_limiter.refund(cost)
+            raise
+
+    def create(self, request: dict) -> dict:
+        self.breaker.before_call()
+        pool = self._executor()
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        calls = [pool.submit(self.backend.create, request)]
+        try:
+            if self.hedge_after is not None:
+                done, _ = wait(calls, timeout=self.hedge_after)
+                if not done:
+                    self.stats["hedges"] += 1
+                    calls.append(pool.submit(self._hedge, request))
+            pending, error = set(calls), None
+            while pending:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done:
+                    raise FutureTimeout
+                for call in done:
+                    if call.exception() is None:
+                        self.stats["hedge_wins"] += call is not calls[0]
+                        response = call.result()
+                        self._finish()
+                        return response
+                    error = call.exception()
+            raise error
+        except FutureTimeout:
+            self._finish(self._timeout_error())
+        except Exception as e:
+            self._finish(e)
+        finally:
+            for call in calls:
+                call.cancel()
+
+    async def _acall(self, request: dict) -> dict:
+        return await asyncio.wait_for(self.backend.acreate(request), self.timeout)
+
+    async def acreate(self, request: dict) -> dict:
+        self.breaker.before_call()
+        calls = [asyncio.ensure_future(self._acall(request))]
+        try:
+            if self.hedge_after is not None:
+                done, _ = await asyncio.wait(calls, timeout=self.hedge_after)
+                if not done:
+                    self.stats["hedges"] += 1
+                    calls.append(asyncio.ensure_future(self._ahedge(request)))
+            pending, error = set(calls), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for call in done:
+                    if call.exception() is None:
+                        self.stats["hedge_wins"] += call is not calls[0]
+                        response = call.result()
+                        self._finish()
+                        return response
+                    error = call.exception()
+            raise error
+        except asyncio.TimeoutError:
+            self._finish(self._timeout_error())
+        except Exception as e:
+            self._finish(e)
+        finally:
+            for call in calls:
+                call.cancel()
+
+    def stream(self, request: dict) -> Iterator[dict]:
+        # A blocking iterator cannot be interrupted between chunks; the transport's own
+        # timeout (e.g. OpenAIBackend's) bounds each read instead
+        self.breaker.before_call()
+        try:
+            yield from self.backend.stream(request)
+        except Exception as e:
+            self._finish(e)
+        self._finish()
+
+    async def astream(self, request: dict) -> AsyncIterator[dict]:
+        self.breaker.before_call()
+        chunks = self.backend.astream(request).__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        except asyncio.TimeoutError:
+            self._finish(self._timeout_error())
+        except Exception as e:
+            self._finish(e)
+        finally:
+            if hasattr(chunks, "aclose"):
+                await chunks.aclose()
+        self._finish()
@@ -0,0 +1,80 @@
+import threading
+from typing import Optional
+
+DEFAULT_TIERS = {
+    "small": "llama-3.1-8b-instant",
+    "large": "llama-3.3-70b-versatile",
+}
+
+# Call types (the `kind` passed to BaseAgent.respond) that are short procedural decisions.
+# Anything not listed runs on the agent's own model, reported as the "large" tier.
+DEFAULT_ROUTES = {
+    "case_type": "small",
+    "objection_check": "small",
+    "objection_ruling": "small",
+    "objection_review": "small",
+    "objection_rulings": "small",
+    "verdict_label": "small",
+    "summary": "small",
+}
+
+
+class ModelRouter:
+    """Picks a model tier per call type and keeps per-tier latency and token totals.
+
+    A cheap-tier reply that fails the caller's validator is retried once on the large
+    tier (counted as an escalation), so ambiguous procedural answers still resolve.
+    """
+
+    def __init__(self, tiers: Optional[dict] = None, routes: Optional[dict] = None, escalate: bool = True):
+        self.tiers = dict(DEFAULT_TIERS, **(tiers or {}))
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.escalate = escalate
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def route(self, kind: str, default_model: str, escalate: bool = False) -> tuple[str, str]:
+        if escalate:
+            self._bump("large", "escalations")
+            return "large", self.tiers["large"]
+        tier = self.routes.get(kind)
+        if tier is None:
+            return "large", default_model
+        return tier, self.tiers[tier]
+
+    def can_escalate(self, kind: str) -> bool:
+        return self.escalate and self.routes.get(kind, "large") != "large"
+
+    def _tier_stats(self, tier: str) -> dict:
+        return self.stats.setdefault(tier, {
+            "calls": 0, "escalations": 0, "latency_s": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+        })
+
+    def _bump(self, tier: str, key: str):
+        with self._lock:
+            self._tier_stats(tier)[key] += 1
+
+    def record(self, tier: str, latency: float, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            stats = self._tier_stats(tier)
+            stats["calls"] += 1
+            stats["latency_s"] += latency
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+
+    def report(self) -> dict:
+        with self._lock:
+            report = {}
+            for tier, stats in self.stats.items():
+                report[tier] = dict(stats, model=self.tiers.get(tier),
+                                    avg_latency_s=stats["latency_s"] / stats["calls"] if stats["calls"] else 0.0)
+            return report
+
+
+def parse_routes(spec: str) -> dict:
+    """"objection_check=small,summary=large" -> routing table on top of the defaults."""
+    routes = dict(DEFAULT_ROUTES)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        kind, _, tier = item.partition("=")
+        routes[kind.strip()] = tier.strip()
+    return routes
@@ -0,0 +1,48 @@
+# Cheap, dependency-free token estimates. Actual counts come back in each response's
+# `usage`; these are only used to budget a request before it is sent.
+
+import os
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD = 4
+
+
+def count_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def count_message_tokens(messages: list[dict]) -> int:
+    return sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+
+
+class PrefixTracker:
+    """Estimates how much of each prompt a server with prefix (KV) caching can reuse.
+
+    Like those servers, it remembers every prefix it has seen (as chained hashes at
+    message boundaries), so a prompt reuses its longest run of leading messages sent
+    before, plus the common start of the next message with the previous request's.
+    """
+
+    def __init__(self):
+        self.seen = set()
+        self.previous = []         # messages of the last request
+        self.previous_hashes = []  # their chained prefix hashes
+
+    def observe(self, messages: list[dict]) -> int:
+        """Record a request; returns its estimated reused prefix in tokens."""
+        shared, chained, hashes, reusing = 0, 0, [], True
+        for i, message in enumerate(messages):
+            chained = hash((chained, message["role"], message["content"]))
+            hashes.append(chained)
+            if reusing and chained in self.seen:
+                shared += count_tokens(message["content"]) + MESSAGE_OVERHEAD
+                continue
+            if reusing:
+                reusing = False
+                previous = self.previous[i] if i < len(self.previous) else None
+                if previous and previous["role"] == message["role"] and hashes[:i] == self.previous_hashes[:i]:
+                    shared += len(os.path.commonprefix([previous["content"], message["content"]])) // CHARS_PER_TOKEN
+            self.seen.add(chained)
+        self.previous, self.previous_hashes = messages, hashes
+        return shared
@@ -0,0 +1,181 @@
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Optional
+
+# Fields attached to every event emitted in the current task/thread (case id, phase)
+_context = contextvars.ContextVar("trace_context", default={})
+
+QUANTILES = (0.5, 0.95)
+COUNTERS = ("calls", "cache_hits", "retries", "errors", "prompt_tokens", "completion_tokens")
+
+
+@contextmanager
+def trace_context(**fields):
+    """Tag every call traced inside this block (and tasks started from it) with `fields`."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered), max(1, math.ceil(q * len(ordered)))) - 1]
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+class Tracer:
+    """Structured trace of every LLM call and trial phase, with latency percentiles.
+
+    Each event is one JSON line in `path` (if given). Totals are kept in memory for
+    `summary()` and for `write_metrics()`, which writes Prometheus text exposition
+    format so a node-exporter textfile collector (or a plain `cat`) can pick it up.
+    """
+
+    def __init__(self, path: Optional[str] = None, metrics_path: Optional[str] = None):
+        self.path = path
+        self.metrics_path = metrics_path
+        self._file = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        # (dimension, value) -> latencies; dimension is "agent", "kind" or "phase"
+        self.latencies = defaultdict(list)
+        self.ttft = defaultdict(list)
+        # (agent, kind, tier) -> counters
+        self.counters = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    def _emit(self, event: dict):
+        event = {"ts": round(time.time(), 3), **_context.get(), **event}
+        if self._file:
+            self._file.write(json.dumps(event) + "\n")
+
+    def record_call(self, agent: str, kind: str, tier: str, model: str, wall_s: float,
+                    latency_s: Optional[float] = None, ttft_s: Optional[float] = None,
+                    prompt_tokens: int = 0, completion_tokens: int = 0, retries: int = 0,
+                    cached: bool = False, error: Optional[str] = None):
+        """One `respond` round trip; `wall_s` includes rate-limit waits and retries."""
+        with self._lock:
+            self._emit({
+                "type": "call", "agent": agent, "kind": kind, "tier": tier, "model": model,
+                "wall_s": round(wall_s, 4), "latency_s": latency_s, "ttft_s": ttft_s,
+                "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "retries": retries, "cached": cached, "error": error,
+            })
+            counters = self.counters[(agent, kind, tier)]
+            counters["calls"] += not cached
+            counters["cache_hits"] += cached
+            counters["retries"] += retries
+            counters["errors"] += error is not None
+            counters["prompt_tokens"] += prompt_tokens if not cached else 0
+            counters["completion_tokens"] += completion_tokens if not cached else 0
+            # Cache hits are counted above but kept out of the percentiles: they take no model time
+            if error is None and not cached:
+                self.latencies[("agent", agent)].append(wall_s)
+                self.latencies[("kind", kind)].append(wall_s)
+                if ttft_s is not None:
+                    self.ttft[("agent", agent)].append(ttft_s)
+
+    @contextmanager
+    def span(self, phase: str, **fields):
+        """Time a trial phase; calls made inside are tagged with `phase`."""
+        started = time.perf_counter()
+        error = None
+        try:
+            with trace_context(phase=phase, **fields):
+                yield
+        except BaseException as e:
+            error = repr(e)
+            raise
+        finally:
+            wall_s = time.perf_counter() - started
+            with self._lock:
+                self._emit({"type": "phase", "phase": phase, **fields,
+                            "wall_s": round(wall_s, 4), "error": error})
+                self.latencies[("phase", phase)].append(wall_s)
+
+    def summary(self) -> dict:
+        """{"phase"|"agent"|"kind": {name: {count, p50_s, p95_s, total_s}}, "ttft": ..., "totals": ...}"""
+        with self._lock:
+            report = {"phase": {}, "agent": {}, "kind": {}, "ttft": {}}
+            for (dimension, name), values in self.latencies.items():
+                report[dimension][name] = self._stats(values)
+            for (_, name), values in self.ttft.items():
+                report["ttft"][name] = self._stats(values)
+            totals = dict.fromkeys(COUNTERS, 0)
+            for counters in self.counters.values():
+                for key, value in counters.items():
+                    totals[key] += value
+            report["totals"] = totals
+            return report
+
+    @staticmethod
+    def _stats(values: list[float]) -> dict:
+        return {
+            "count": len(values),
+            "p50_s": round(percentile(values, 0.5), 4),
+            "p95_s": round(percentile(values, 0.95), 4),
+            "total_s": round(sum(values), 4),
+        }
+
+    def metrics(self) -> str:
+        """Current totals in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for counter in COUNTERS:
+                name = f"courtroom_llm_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                for (agent, kind, tier), counters in sorted(self.counters.items()):
+                    lines.append(f"{name}{_labels(agent=agent, kind=kind, tier=tier)} {counters[counter]}")
+            for dimension, name in (("agent", "courtroom_llm_latency_seconds"),
+                                    ("phase", "courtroom_phase_duration_seconds")):
+                lines.append(f"# TYPE {name} summary")
+                for (key, value), values in sorted(self.latencies.items()):
+                    if key != dimension:
+                        continue
+                    for q in QUANTILES:
+                        labels = _labels(**{dimension: value, "quantile": q})
+                        lines.append(f"{name}{labels} {percentile(values, q):.6f}")
+                    lines.append(f"{name}_sum{_labels(**{dimension: value})} {sum(values):.6f}")
+                    lines.append(f"{name}_count{_labels(**{dimension: value})} {len(values)}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path: Optional[str] = None):
+        path = path or self.metrics_path
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.metrics())
+        os.replace(tmp_path, path)  # scrapers never see a half-written file
+
+    def flush(self):
+        with self._lock:
+            if self._file:
+                self._file.flush()
+
+    def close(self):
+        self.write_metrics()
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
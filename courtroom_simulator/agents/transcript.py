@@ -0,0 +1,139 @@
+import sys
+from collections.abc import Sequence
+from typing import Iterator, Optional
+
+
+class Exchange:
+    """One prompt/reply pair, in the order it entered the trial record."""
+
+    __slots__ = ("speaker", "prompt", "reply", "phase", "kind")
+
+    def __init__(self, speaker: int, prompt: str, reply: str, phase: Optional[str], kind: str):
+        self.speaker = speaker
+        self.prompt = prompt
+        self.reply = reply
+        self.phase = phase
+        self.kind = kind
+
+
+class Transcript:
+    """Append-only record of every committed exchange in a trial, shared by its agents.
+
+    A question stored as the lawyer's reply and again as the witness's prompt is the
+    one string object handed between them. Only speaker names and kinds are interned;
+    prompts and replies are not, since interned strings are never freed. Each agent
+    reads its own history through a `HistoryView`, a list of indexes into `events`;
+    nothing is copied per agent.
+    """
+
+    def __init__(self):
+        self.speakers = []  # speaker id -> agent name
+        self.events = []
+        self.phase = None  # stamped on new exchanges; the trial manager keeps it current
+        self._indexes = []  # speaker id -> positions in `events`
+
+    def add_speaker(self, name: str) -> int:
+        self.speakers.append(sys.intern(name))
+        self._indexes.append([])
+        return len(self.speakers) - 1
+
+    def append(self, speaker: int, prompt: str, reply: str, kind: str = "turn"):
+        self._indexes[speaker].append(len(self.events))
+        self.events.append(Exchange(speaker, prompt, reply, self.phase, sys.intern(kind)))
+
+    def truncate(self, length: int):
+        """Drop every exchange after the first `length`, e.g. those of a step that failed."""
+        del self.events[length:]
+        for positions in self._indexes:
+            while positions and positions[-1] >= length:
+                positions.pop()
+
+    def view(self, speaker: int) -> "HistoryView":
+        return HistoryView(self, speaker)
+
+    def attach(self, agent):
+        """Move `agent`'s history into this transcript and point the agent at a view of it."""
+        speaker = self.add_speaker(agent.name)
+        for event in agent.history.exchanges():
+            self.append(speaker, event.prompt, event.reply, event.kind)
+        agent.history = self.view(speaker)
+
+    def chronological(self) -> Iterator[dict]:
+        """Every exchange in order, for display and export."""
+        for event in self.events:
+            yield {"speaker": self.speakers[event.speaker], "phase": event.phase, "kind": event.kind,
+                   "prompt": event.prompt, "reply": event.reply}
+
+    def state_dict(self) -> dict:
+        return {
+            "speakers": list(self.speakers),
+            "events": [[e.speaker, e.prompt, e.reply, e.phase, e.kind] for e in self.events],
+        }
+
+    def load_state_dict(self, state: dict):
+        """Restore events onto the speakers already attached, matched by name in order."""
+        free = list(range(len(self.speakers)))
+        slots = []
+        for name in state["speakers"]:
+            slot = next((i for i in free if self.speakers[i] == name), None)
+            if slot is None:
+                slot = self.add_speaker(name)  # an agent this trial no longer has; keep its lines
+            else:
+                free.remove(slot)
+            slots.append(slot)
+        phase = self.phase
+        self.events = []
+        self._indexes = [[] for _ in self.speakers]
+        for speaker, prompt, reply, event_phase, kind in state["events"]:
+            self.phase = event_phase
+            self.append(slots[speaker], prompt, reply, kind)
+        self.phase = phase
+
+
+class HistoryView(Sequence):
+    """One agent's history as the user/assistant message list BaseAgent and the memory
+    policies expect, materialized from the shared transcript on access."""
+
+    def __init__(self, transcript: Transcript, speaker: int):
+        self.transcript = transcript
+        self.speaker = speaker
+
+    @property
+    def _positions(self) -> list[int]:
+        return self.transcript._indexes[self.speaker]
+
+    def __len__(self) -> int:
+        return 2 * len(self._positions)
+
+    def _message(self, i: int) -> dict:
+        event = self.transcript.events[self._positions[i // 2]]
+        if i % 2:
+            return {"role": "assistant", "content": event.reply}
+        return {"role": "user", "content": event.prompt}
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._message(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("history index out of range")
+        return self._message(i)
+
+    def exchanges(self) -> Iterator[Exchange]:
+        for position in self._positions:
+            yield self.transcript.events[position]
+
+    def add(self, prompt: str, reply: str, kind: str = "turn"):
+        self.transcript.append(self.speaker, prompt, reply, kind)
+
+    def load(self, messages: list[dict]):
+        """Append user/assistant message pairs (the legacy per-agent history format)."""
+        for user, assistant in zip(messages[::2], messages[1::2]):
+            self.add(user["content"], assistant["content"])
+
+
+def private_history(name: str) -> HistoryView:
+    """A standalone agent's history: a transcript with a single speaker."""
+    transcript = Transcript()
+    return transcript.view(transcript.add_speaker(name))
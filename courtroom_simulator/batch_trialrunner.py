@@ -0,0 +1,383 @@
+# batch_trialrunner.py — optimized for speed and Groq token limits
+#
+#   courtroom run-batch --cases 50 --resume
+#
+# Only what parsing and planning need is imported up front; the trial machinery, the
+# event loop and the provider client load when trials actually run.
+
+import os
+import re
+import sys
+import copy
+import glob
+import time
+import argparse
+from typing import Optional
+from .agents.env import load_env
+from .journal import CheckpointStore, ResultsJournal, merge_journals, read_journal
+from .sharding import in_shard, parse_shard, shard_name
+from .case_store import open_cases
+
+# === Load Data ===
+DATA_PATH = "cases.csv"
+STORE_PATH = "cases_store"  # written by preprocess.py; preferred when present
+submission_path = "submission.csv"
+
+
+# Defaults read from the environment (and .env) once the arguments are parsed
+ENV_DEFAULTS = {
+    "concurrency": ("TRIAL_CONCURRENCY", int, 16),
+    "rpm": ("GROQ_RPM", float, 30),
+    "tpm": ("GROQ_TPM", float, 6000),
+    "cache": ("LLM_CACHE_PATH", str, ".cache/llm_responses.sqlite"),
+    "routes": ("MODEL_ROUTES", str, ""),
+}
+
+
+def apply_env_defaults(args):
+    load_env()
+    for key, (variable, convert, default) in ENV_DEFAULTS.items():
+        if getattr(args, key) is None:
+            setattr(args, key, convert(os.getenv(variable, default)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="courtroom run-batch", description="Run simulated trials over cases.csv")
+    parser.add_argument("--data", default=STORE_PATH if os.path.isdir(STORE_PATH) else DATA_PATH,
+                        help="preprocessed case store directory or raw cases CSV")
+    parser.add_argument("--cases", type=int, default=50, help="number of cases to process")
+    parser.add_argument("--offset", type=int, default=0, help="position of the first case to process")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="trials running at the same time (default: $TRIAL_CONCURRENCY or 16)")
+    parser.add_argument("--rpm", type=float, default=None,
+                        help="provider requests-per-minute budget (default: $GROQ_RPM or 30)")
+    parser.add_argument("--tpm", type=float, default=None,
+                        help="provider tokens-per-minute budget (default: $GROQ_TPM or 6000)")
+    parser.add_argument("--memory", choices=["full", "window", "budget", "summary"], default="summary",
+                        help="how much of each agent's history is resent per call")
+    parser.add_argument("--full-case-text", action="store_true",
+                        help="paste the whole judgment into every prompt instead of retrieved passages")
+    parser.add_argument("--cache", default=None,
+                        help="SQLite file for recorded LLM responses (default: $LLM_CACHE_PATH or "
+                             ".cache/llm_responses.sqlite)")
+    parser.add_argument("--no-cache", action="store_true", help="always call the provider")
+    parser.add_argument("--replay", action="store_true",
+                        help="serve every call from the cache and fail on a miss (offline re-runs)")
+    parser.add_argument("--speculative", action="store_true",
+                        help="request witness answers alongside the objection check")
+    parser.add_argument("--compact", action="store_true",
+                        help="several decisions per call as JSON: questions in batches, objections "
+                             "and rulings on all of them at once, both sides' statements in one step")
+    parser.add_argument("--routing", action="store_true",
+                        help="send short procedural calls (objection checks, rulings, labels) to a small model")
+    parser.add_argument("--routes", default=None,
+                        help="override the routing table, e.g. 'objection_ruling=large,question=small'")
+    parser.add_argument("--no-escalate", action="store_true",
+                        help="keep small-tier replies even when they fail validation")
+    parser.add_argument("--max-questions", type=int, default=10, help="questions per witness and side")
+    parser.add_argument("--max-objections", type=int, default=5, help="objections put to the judge per phase")
+    parser.add_argument("--max-calls", type=int, default=150,
+                        help="provider calls per trial before skipping to the verdict")
+    parser.add_argument("--max-tokens", type=int, default=None,
+                        help="prompt+completion tokens per trial before skipping to the verdict")
+    parser.add_argument("--fake-llm", action="store_true",
+                        help="answer every call from the seeded offline fake backend (no provider calls, "
+                             "no --rpm/--tpm pacing)")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="seconds a provider call may take before it is abandoned and retried")
+    parser.add_argument("--max-retries", type=int, default=5,
+                        help="retries of a failed provider call (429, 5xx, timeouts) before the trial step fails")
+    parser.add_argument("--hedge-after", type=float, default=None,
+                        help="send a slow call a second time after this many seconds and keep the first "
+                             "answer (costs extra requests)")
+    parser.add_argument("--trace", action="store_true",
+                        help="write a per-call JSONL trace and Prometheus metrics into the run directory")
+    parser.add_argument("--run-dir", default="runs/latest",
+                        help="directory for the results journal, checkpoints and transcripts")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip cases already in the journal and continue interrupted trials")
+    parser.add_argument("--shard", default=None,
+                        help="run only shard i/N of the cases (by case id), e.g. 0/4; results go to "
+                             "<run-dir>/shard-i-of-N, combine them afterwards with --merge")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes, each running one shard with its own share of the "
+                             "rate budget (0 = one per CPU core); API keys listed in GROQ_API_TOKENS "
+                             "(comma-separated) are spread across the workers")
+    parser.add_argument("--merge", action="store_true",
+                        help="only combine the shard journals under --run-dir into submission.csv "
+                             "(those of the --workers N split, if several are there)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print what would run (cases, shards, rate budgets) without running any trial")
+    args = parser.parse_args(argv)
+    if args.shard and args.workers != 1:
+        parser.error("--shard and --workers are exclusive; each worker already runs one shard")
+    if args.shard:
+        try:
+            parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    apply_env_defaults(args)
+    return args
+
+
+def print_trace_summary(summary: dict):
+    totals = summary["totals"]
+    print(f"\n📊 {totals['calls']} calls, {totals['cache_hits']} cache hits, {totals['retries']} retries, "
+          f"{totals['errors']} errors, {totals['prompt_tokens']} prompt / "
+          f"{totals['completion_tokens']} completion tokens")
+    for dimension in ("phase", "agent", "kind"):
+        for name, stats in sorted(summary[dimension].items(), key=lambda item: -item[1]["total_s"]):
+            print(f"   {dimension:<6} {name:<20} n={stats['count']:<5} "
+                  f"p50={stats['p50_s']:.2f}s p95={stats['p95_s']:.2f}s total={stats['total_s']:.1f}s")
+
+
+def api_keys() -> list[str]:
+    return [key.strip() for key in os.getenv("GROQ_API_TOKENS", "").split(",") if key.strip()]
+
+
+def shard_run_dir(args, shard) -> str:
+    return os.path.join(args.run_dir, shard_name(shard)) if shard else args.run_dir
+
+
+def shard_cases(args, shard, source=None) -> list[dict]:
+    # Stream only the requested slice; the rest of the dataset is never parsed. Every shard
+    # sees the same slice and keeps the ids that hash to it, so shards never overlap.
+    source = source or open_cases(args.data)
+    return [case for case in source.iter_cases(offset=args.offset, limit=args.cases)
+            if shard is None or in_shard(case["id"], shard)]
+
+
+def run_batch(args) -> int:
+    """Run the whole batch, or one shard of it; returns the number of rows in its submission."""
+    import asyncio
+
+    from .agents.backends import FakeBackend, OpenAIBackend
+    from .agents.base_agent import BaseAgent
+    from .agents.memory import build_memory
+    from .agents.rate_limit import RateLimiter
+    from .agents.resilience import ResilientBackend, RetryPolicy
+    from .budget import TrialBudget
+    from .scheduler import TrialScheduler
+    from .trial_factory import abuild_trial
+
+    shard = parse_shard(args.shard) if args.shard else None
+    run_dir = shard_run_dir(args, shard)
+    output_path = os.path.join(run_dir, "submission.csv") if shard else submission_path
+    source = open_cases(args.data)
+    cases = shard_cases(args, shard, source)
+
+    journal = ResultsJournal(os.path.join(run_dir, "journal.jsonl"), resume=args.resume)
+    checkpoints = CheckpointStore(os.path.join(run_dir, "checkpoints"))
+    transcripts = CheckpointStore(os.path.join(run_dir, "transcripts"))
+    if not args.resume:
+        checkpoints.clear()
+    done_ids = journal.completed_ids()
+
+    # One budget for every agent in every trial; 429s back off instead of fixed sleeps.
+    # The fake backend has no provider quota to respect, so it runs unpaced
+    BaseAgent.rate_limiter = None if args.fake_llm else RateLimiter(requests_per_minute=args.rpm,
+                                                                     tokens_per_minute=args.tpm)
+    BaseAgent.default_memory = build_memory(args.memory)
+    if args.fake_llm:
+        backend = FakeBackend()
+    elif getattr(args, "api_key_index", None) is not None:
+        backend = OpenAIBackend(api_key=api_keys()[args.api_key_index], timeout=args.timeout)
+    else:
+        backend = OpenAIBackend(timeout=args.timeout)
+    # Timeouts, circuit breaking and hedging around every call; a call that still fails after
+    # its retries fails the trial step, which resumes from its last checkpoint
+    BaseAgent.backend = ResilientBackend(backend, timeout=args.timeout, hedge_after=args.hedge_after,
+                                         rate_limiter=BaseAgent.rate_limiter)
+    BaseAgent.retry_policy = RetryPolicy(max_retries=args.max_retries)
+    if not args.no_cache:
+        from .agents.llm_cache import ResponseCache
+
+        BaseAgent.cache = ResponseCache(args.cache, mode="replay" if args.replay else "readwrite")
+    if args.routing:
+        from .agents.routing import ModelRouter, parse_routes
+
+        BaseAgent.router = ModelRouter(routes=parse_routes(args.routes), escalate=not args.no_escalate)
+    if args.trace:
+        from .agents.tracing import Tracer
+
+        BaseAgent.tracer = Tracer(os.path.join(run_dir, "trace.jsonl"),
+                                  metrics_path=os.path.join(run_dir, "metrics.prom"))
+    scheduler = TrialScheduler(max_concurrent_trials=args.concurrency)
+
+    jobs = [
+        (case["id"], lambda case_id=case["id"], case_text=case["text"]: abuild_trial(
+            case_text, args.full_case_text, checkpoints.load(case_id), speculative=args.speculative,
+            compact=args.compact,
+            budget=TrialBudget(args.max_questions, args.max_objections, args.max_calls, args.max_tokens)))
+        for case in cases
+        if case["id"] not in done_ids
+    ]
+    if done_ids:
+        print(f"⏩ Skipping {len(cases) - len(jobs)} cases already in the journal")
+    print(f"🧾 {f'[{args.shard}] ' if shard else ''}Starting {len(jobs)} trials, {args.concurrency} at a time "
+          f"({args.rpm:g} req/min, {args.tpm:g} tokens/min)")
+
+    done = 0
+    started = time.perf_counter()
+
+    def on_step(case_id, trial):
+        if not trial.ended:
+            checkpoints.save(case_id, trial.state_dict())
+
+    def on_complete(case_id, trial, elapsed):
+        nonlocal done
+        done += 1
+        usage = trial.token_usage()
+        journal.append({
+            "id": str(case_id),
+            "label": trial.verdict_label or "",
+            "case_type": trial.case_type,
+            "verdict": trial.verdict,
+            "transcript": transcripts.save(case_id, trial.state_dict()),
+            "usage": usage,
+            "tiers": trial.tier_usage(),
+            "prefix_reuse": trial.prefix_reuse(),
+            "speculation": trial.speculation_report() if args.speculative else None,
+            "steps": trial.steps_completed,
+            "phase_calls": trial.phase_calls,
+            "budget_events": trial.budget.events,
+            "elapsed_s": round(elapsed, 3),
+            "finished_at": time.time(),
+        })
+        checkpoints.discard(case_id)
+        if BaseAgent.tracer:
+            BaseAgent.tracer.flush()
+            BaseAgent.tracer.write_metrics()
+        print(f"✅ Trial {done}/{len(jobs)} for Case ID {case_id} finished in {elapsed:.1f}s "
+              f"({usage['calls']} calls, {usage['prompt_tokens']} prompt / "
+              f"{usage['completion_tokens']} completion tokens, {usage['cache_hits']} cached)")
+        reuse = trial.prefix_reuse()["total"]
+        print(f"   🔁 Shared prompt prefix: {reuse['ratio']:.0%} of {reuse['prompt_tokens']} prompt tokens")
+        context = trial.judge.case_context
+        if context:
+            saved = context.savings()
+            print(f"   📉 Case context: {saved['injected_tokens']} tokens injected vs "
+                  f"{saved['full_text_tokens']} with full text "
+                  f"({saved['saved_tokens']} saved, {saved['saved_pct']:.0f}%)")
+        if args.routing:
+            for tier, stats in sorted(trial.tier_usage().items()):
+                print(f"   🔀 {tier}: {stats['calls']} calls, {stats['latency_s']:.1f}s, "
+                      f"{stats['prompt_tokens']} prompt tokens")
+        if args.speculative:
+            spec = trial.speculation_report()
+            print(f"   🔮 Speculation: {spec['hits']}/{spec['attempts']} answers kept "
+                  f"({spec['hit_rate']:.0%}), {spec['wasted_tokens']} tokens wasted")
+
+    try:
+        asyncio.run(scheduler.arun(jobs, on_complete=on_complete, on_step=on_step))
+    finally:
+        # Duplicates folded by preprocessing get the label of the case they duplicate
+        rows = journal.write_submission(output_path, source.aliases)
+        journal.close()
+        if BaseAgent.tracer:
+            BaseAgent.tracer.close()
+    print(f"\n✅ All trials complete in {time.perf_counter() - started:.1f}s. "
+          f"{rows} results saved to {output_path}")
+    if BaseAgent.router:
+        for tier, stats in sorted(BaseAgent.router.report().items()):
+            print(f"🔀 {tier} ({stats['model']}): {stats['calls']} calls, "
+                  f"{stats['avg_latency_s']:.2f}s avg, {stats['prompt_tokens']} prompt / "
+                  f"{stats['completion_tokens']} completion tokens, {stats['escalations']} escalations")
+    client = BaseAgent.backend.stats
+    if client:
+        print(f"🛡️ Client: {client['timeouts']} timeouts, {client['hedges']} hedged calls "
+              f"({client['hedge_wins']} won by the hedge), circuit {BaseAgent.backend.breaker.state}")
+    if BaseAgent.tracer:
+        print_trace_summary(BaseAgent.tracer.summary())
+    return rows
+
+
+def merge_shards(run_dir: str, count: Optional[int] = None, aliases: Optional[dict] = None) -> int:
+    """Combine the journals of one N-way split: `count` shards, or the only split under `run_dir`.
+
+    Shard directories left by a run with a different N cover other id sets and are ignored.
+    Exits with an error, leaving submission.csv untouched, when no shard journal is found.
+    """
+    if count is None:
+        counts = {int(re.search(r"-of-(\d+)$", path).group(1))
+                  for path in glob.glob(os.path.join(run_dir, "shard-*-of-*"))}
+        if len(counts) > 1:
+            sys.exit(f"{run_dir} holds shards of {', '.join(map(str, sorted(counts)))}-way runs; "
+                     "pass --workers N to merge one")
+        count = counts.pop() if counts else 0
+    paths = sorted(glob.glob(os.path.join(run_dir, shard_name(("*", count)), "journal.jsonl")))
+    if not paths:
+        # Nothing to merge; an existing submission is left as it is
+        sys.exit(f"No shard journals found in {run_dir}"
+                 f"{f' for a {count}-way run' if count else ''}; {submission_path} was not written")
+    rows = merge_journals(paths, submission_path, aliases)
+    print(f"🧩 Merged {len(paths)} shard journals: {rows} results saved to {submission_path}")
+    return rows
+
+
+def split_workers(args) -> list:
+    """Arguments for each worker's shard; a shared API key's rate budget is split between its workers."""
+    workers = args.workers or os.cpu_count() or 1
+    keys = api_keys()
+    worker_args = []
+    for i in range(workers):
+        sharing = len(range(i % len(keys), workers, len(keys))) if keys else workers
+        shard_args = copy.copy(args)
+        shard_args.shard = f"{i}/{workers}"
+        shard_args.rpm = args.rpm / sharing
+        shard_args.tpm = args.tpm / sharing
+        shard_args.api_key_index = i % len(keys) if keys else None
+        worker_args.append(shard_args)
+    return worker_args
+
+
+def run_workers(args) -> int:
+    """One process per shard."""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from multiprocessing import get_context
+
+    worker_args = split_workers(args)
+    print(f"🧵 Running {len(worker_args)} shards in worker processes ({len(api_keys()) or 1} API key(s))")
+    # spawn: workers start clean instead of inheriting the parent's event loop and sockets
+    with ProcessPoolExecutor(max_workers=len(worker_args), mp_context=get_context("spawn")) as pool:
+        futures = {pool.submit(run_batch, shard_args): shard_args.shard for shard_args in worker_args}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                # The shard's journal keeps what it finished; rerun it with --shard ... --resume
+                print(f"❌ Shard {futures[future]} failed: {e}")
+    return merge_shards(args.run_dir, len(worker_args), open_cases(args.data).aliases)
+
+
+def dry_run(args):
+    """Print what the batch would run; no trial is built and no provider client is loaded."""
+    runs = split_workers(args) if args.workers != 1 else [args]
+    print(f"🗺️ Plan: {args.cases} cases from {args.data} starting at {args.offset}, "
+          f"{'fake LLM' if args.fake_llm else 'provider calls'}, results in {args.run_dir}")
+    for run in runs:
+        shard = parse_shard(run.shard) if run.shard else None
+        cases = shard_cases(run, shard)
+        journal_path = os.path.join(shard_run_dir(run, shard), "journal.jsonl")
+        done = set(read_journal(journal_path)) if run.resume and os.path.exists(journal_path) else set()
+        pending = sum(str(case["id"]) not in done for case in cases)
+        print(f"   {f'[{run.shard}] ' if shard else ''}{len(cases)} cases, {pending} to run, "
+              f"{len(cases) - pending} already done; {run.concurrency} at a time, "
+              f"{run.rpm:g} req/min, {run.tpm:g} tokens/min")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.dry_run:
+        dry_run(args)
+    elif args.merge:
+        merge_shards(args.run_dir, None if args.workers == 1 else args.workers or os.cpu_count() or 1,
+                     open_cases(args.data).aliases)
+    elif args.workers != 1:
+        run_workers(args)
+    else:
+        run_batch(args)
+
+
+if __name__ == "__main__":
+    main()
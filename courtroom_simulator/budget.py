@@ -0,0 +1,84 @@
+from typing import Optional
+
+from .case_context import tokenize
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard overlap of content words; 1.0 for the same question reworded trivially."""
+    a_terms, b_terms = set(tokenize(a)), set(tokenize(b))
+    if not a_terms or not b_terms:
+        return 0.0
+    return len(a_terms & b_terms) / len(a_terms | b_terms)
+
+
+class TrialBudget:
+    """Upper bounds on how long a trial may run, and the log of every bound that was hit.
+
+    - `max_questions_per_witness`: the lawyer moves on to the next witness afterwards.
+    - `max_duplicate_questions`: questions at least `duplicate_threshold` similar to an
+      earlier one to the same witness; past this many the examination has converged.
+    - `max_objections_per_phase`: later objections in the phase are not put to the judge.
+    - `max_calls` / `max_tokens`: provider calls and prompt+completion tokens per trial;
+      once spent, the trial skips straight to the verdict (which is still delivered).
+    """
+
+    def __init__(self, max_questions_per_witness: Optional[int] = 10, max_objections_per_phase: Optional[int] = 5,
+                 max_calls: Optional[int] = 150, max_tokens: Optional[int] = None,
+                 duplicate_threshold: float = 0.8, max_duplicate_questions: int = 2):
+        self.max_questions_per_witness = max_questions_per_witness
+        self.max_objections_per_phase = max_objections_per_phase
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.max_duplicate_questions = max_duplicate_questions
+        self.questions = {}   # "phase/witness" -> questions asked so far
+        self.duplicates = {}  # "phase/witness" -> near-duplicate questions seen
+        self.objections = {}  # phase -> objections put to the judge
+        self.events = []      # {"step", "phase", "reason", "detail"} for each limit hit
+
+    def record(self, step: int, phase: str, reason: str, detail: str = "") -> str:
+        self.events.append({"step": step, "phase": phase, "reason": reason, "detail": detail})
+        print(f"⏱️ Budget: {reason} in {phase}{f' ({detail})' if detail else ''}")
+        return reason
+
+    def questions_exhausted(self, key: str) -> bool:
+        limit = self.max_questions_per_witness
+        return limit is not None and len(self.questions.get(key, [])) >= limit
+
+    def questions_left(self, key: str) -> Optional[int]:
+        limit = self.max_questions_per_witness
+        return None if limit is None else max(0, limit - len(self.questions.get(key, [])))
+
+    def add_question(self, key: str, question: str) -> bool:
+        """Remember `question`; True once the examination of this witness has converged."""
+        asked = self.questions.setdefault(key, [])
+        if any(similarity(question, earlier) >= self.duplicate_threshold for earlier in asked):
+            self.duplicates[key] = self.duplicates.get(key, 0) + 1
+        asked.append(question)
+        return self.duplicates.get(key, 0) >= self.max_duplicate_questions
+
+    def allow_objection(self, phase: str) -> bool:
+        limit = self.max_objections_per_phase
+        if limit is not None and self.objections.get(phase, 0) >= limit:
+            return False
+        self.objections[phase] = self.objections.get(phase, 0) + 1
+        return True
+
+    def exhausted(self, usage: dict) -> Optional[str]:
+        """"max_calls" / "max_tokens" when the trial's spend has reached a limit."""
+        if self.max_calls is not None and usage["calls"] >= self.max_calls:
+            return "max_calls"
+        if self.max_tokens is not None and usage["prompt_tokens"] + usage["completion_tokens"] >= self.max_tokens:
+            return "max_tokens"
+        return None
+
+    def state_dict(self) -> dict:
+        return {"questions": {key: list(asked) for key, asked in self.questions.items()},
+                "duplicates": dict(self.duplicates), "objections": dict(self.objections),
+                "events": list(self.events)}
+
+    def load_state_dict(self, state: dict):
+        self.questions = dict(state["questions"])
+        self.duplicates = dict(state["duplicates"])
+        self.objections = dict(state["objections"])
+        self.events = list(state["events"])
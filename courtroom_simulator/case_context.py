@@ -0,0 +1,110 @@
+import math
+import re
+from collections import Counter
+
+from .agents.tokens import count_tokens
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have he her his i in is it its of on or she that the their
+them they this to was were which with you your what who whom will would shall should could not no
+""".split())
+
+CASE_HEADER = "\nThis is the case under trial:\n"
+
+
+def tokenize(text: str) -> list[str]:
+    return [w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS]
+
+
+def chunk_text(text: str, chunk_words: int = 120, overlap: int = 20) -> list[str]:
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, chunk_words - overlap)
+    return [" ".join(words[i:i + chunk_words]) for i in range(0, max(len(words) - overlap, 1), step)]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of passages, built once per case."""
+
+    def __init__(self, passages: list[str], k1: float = 1.5, b: float = 0.75):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokenize(p)) for p in passages]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        doc_freq = Counter(term for tf in self.term_freqs for term in tf)
+        n = len(passages)
+        self.idf = {t: math.log(1 + (n - df + 0.5) / (df + 0.5)) for t, df in doc_freq.items()}
+
+    def scores(self, query: str) -> list[float]:
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        scores = []
+        for tf, length in zip(self.term_freqs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            scores.append(sum(self.idf[t] * tf[t] * (self.k1 + 1) / (tf[t] + norm) for t in terms if t in tf))
+        return scores
+
+    def search(self, query: str, k: int = 3) -> list[int]:
+        scores = self.scores(query)
+        ranked = sorted((i for i, s in enumerate(scores) if s > 0), key=lambda i: -scores[i])
+        return ranked[:k]
+
+
+class CaseContext:
+    """Compact, query-dependent view of one case shared by every agent in a trial.
+
+    The case is chunked and indexed once. Every call carries the same `header` (the
+    opening of the judgment as a brief), which belongs in the stable part of the prompt,
+    plus the top-k passages for the current question from `render`, which belong in the
+    current turn. `savings()` compares the tokens injected against full-text injection.
+    With `full_text=True` the header is the whole judgment and nothing is retrieved.
+    """
+
+    def __init__(self, case_text: str, brief_words: int = 150, chunk_words: int = 120,
+                 overlap: int = 20, top_k: int = 3, full_text: bool = False):
+        words = case_text.split()
+        if full_text or len(words) <= brief_words + top_k * chunk_words:
+            # Short judgments are cheaper to send whole than to retrieve from
+            brief_words = len(words)
+        self.brief = " ".join(words[:brief_words])
+        self.passages = chunk_text(" ".join(words[brief_words:]), chunk_words, overlap)
+        self.index = BM25Index(self.passages)
+        self.top_k = top_k
+        self.header = f"{CASE_HEADER}{case_text}" if full_text else f"{CASE_HEADER}Case brief: {self.brief}"
+        self.header_tokens = count_tokens(self.header)
+        self.full_text_tokens = count_tokens(CASE_HEADER + case_text)
+        self.calls = 0
+        self.injected_tokens = 0
+
+    def relevant_passages(self, query: str) -> list[str]:
+        if not self.passages:
+            return []
+        hits = self.index.search(query, self.top_k)
+        if not hits:
+            # Generic prompts ("present your opening statement") fall back to the facts up front
+            hits = range(min(self.top_k, len(self.passages)))
+        return [self.passages[i] for i in sorted(hits)]
+
+    def render(self, query: str) -> str:
+        """Passages relevant to `query` for the current turn; "" when there are none."""
+        passages = self.relevant_passages(query)
+        text = ""
+        if passages:
+            text = "\n".join(["Relevant passages from the judgment:"]
+                             + [f"[{n}] ... {p} ..." for n, p in enumerate(passages, 1)])
+        self.calls += 1
+        self.injected_tokens += self.header_tokens + count_tokens(text)
+        return text
+
+    def savings(self) -> dict:
+        full = self.full_text_tokens * self.calls
+        return {
+            "calls": self.calls,
+            "full_text_tokens": full,
+            "injected_tokens": self.injected_tokens,
+            "saved_tokens": full - self.injected_tokens,
+            "saved_pct": 100.0 * (full - self.injected_tokens) / full if full else 0.0,
+        }
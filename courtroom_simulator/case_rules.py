@@ -0,0 +1,115 @@
+import re
+from typing import Optional, Tuple
+
+# === Case type from the judgment header ===
+# (pattern, weight): the jurisdiction line of the header is decisive, body mentions only hint
+CIVIL_SIGNALS = [
+    (r"civil appellate jurisdiction", 5),
+    (r"civil original jurisdiction", 5),
+    (r"\bcivil (?:appeal|appeals|writ|suit|revision|misc)", 3),
+    (r"\bslp\W+civil|special leave petition\W+civil", 3),
+    (r"\b(?:original|money|title) suit\b", 2),
+    (r"\bwrit petitions?\b|\barticle 32\b|\bart\. ?32\b|\barticle 226\b", 2),
+    (r"\b(?:income-tax|income tax|sales tax|estate duty|excise)\b", 2),
+    (r"\b(?:plaintiff|decree|tenant|landlord|arbitration|compensation|damages)s?\b", 1),
+]
+CRIMINAL_SIGNALS = [
+    (r"criminal appellate jurisdiction", 5),
+    (r"criminal original jurisdiction", 5),
+    (r"\bcriminal (?:appeal|appeals|writ|revision|misc)", 3),
+    (r"\bslp\W+crl|special leave petition\W+criminal", 3),
+    (r"\bwrit petitions?\W+criminal", 5),
+    (r"\bhabeas (?:corpus|companypus)\b", 2),
+    (r"\b(?:sessions case|sessions trial|penal code|ipc|cr\.? ?p\.? ?c)\b", 2),
+    (r"\b(?:accused|murder|convicted|conviction|acquittal|prosecution)\b", 1),
+]
+HEADER_CHARS = 600
+BODY_CHARS = 4000
+
+
+def _score(text: str, signals: list) -> int:
+    header, body = text[:HEADER_CHARS], text[HEADER_CHARS:BODY_CHARS]
+    score = 0
+    for pattern, weight in signals:
+        if re.search(pattern, header):
+            score += weight
+        elif weight == 1 and len(re.findall(pattern, body)) >= 3:
+            score += weight
+    return score
+
+
+def classify_case_type(case_text: str) -> Tuple[Optional[str], float]:
+    """Return ("civil" | "criminal" | None, confidence in [0, 1]) from the judgment's opening."""
+    text = " ".join(case_text[:BODY_CHARS].lower().split())
+    civil, criminal = _score(text, CIVIL_SIGNALS), _score(text, CRIMINAL_SIGNALS)
+    if civil == criminal:
+        return None, 0.0
+    label = "civil" if civil > criminal else "criminal"
+    margin = abs(civil - criminal)
+    return label, min(1.0, margin / 5)
+
+
+# === Verdict label from the judge's ruling ===
+VERDICT_LABELS = ("guilty", "not guilty", "liable", "not liable")
+# The findings open to the court in each kind of case
+CASE_VERDICT_LABELS = {"criminal": ("guilty", "not guilty"), "civil": ("liable", "not liable")}
+_FINDING_RE = re.compile(
+    r"\b(?P<label>not guilty|not liable|guilty|liable|acquit(?:ted)?|convict(?:ed)?|innocent"
+    r"|not (?:held )?responsible|no liability)\b"
+)
+_SYNONYMS = {
+    "acquit": "not guilty",
+    "acquitted": "not guilty",
+    "innocent": "not guilty",
+    "convict": "guilty",
+    "convicted": "guilty",
+    "no liability": "not liable",
+    "not responsible": "not liable",
+    "not held responsible": "not liable",
+}
+_OPPOSITE = {"guilty": "not guilty", "not guilty": "guilty", "liable": "not liable", "not liable": "liable"}
+# The judge is told to "conclude with 'I find the defendant [guilty/not guilty]'"; echoes of
+# that template ("guilty/not guilty", "[liable/not liable]") are not findings
+_TEMPLATE_RE = re.compile(r"\[[^\]]*\]|\b(?:not )?(?:guilty|liable)\s*/\s*(?:not )?(?:guilty|liable)\b")
+# A negated verb ahead of a finding in the same clause: "I do not find ... guilty",
+# "cannot be held liable", "was not found guilty"
+_NEGATION_RE = re.compile(
+    r"\b(?:cannot|never|\w+n't|(?:do|does|did|can|could|would|will|shall|should|must|is|are|was|were|be|been)"
+    r" not)\b"
+)
+_CLAUSE_END_RE = re.compile(r"[.;:!?,]|\b(?:and|but|so|therefore|hence|thus|however|although|because|whereas)\b")
+
+
+def _negated(text: str, start: int) -> bool:
+    """True if the clause ending at `start` negates what follows it."""
+    ends = [m.end() for m in _CLAUSE_END_RE.finditer(text, 0, start)]
+    return _NEGATION_RE.search(text, ends[-1] if ends else 0, start) is not None
+
+
+def parse_verdict(verdict: Optional[str], case_type: Optional[str] = None) -> Optional[str]:
+    """Map the judge's free text to one of VERDICT_LABELS, or None if it states no finding.
+
+    With `case_type`, a finding that does not belong to that kind of case (a civil
+    defendant found "guilty") also counts as none.
+    """
+    if not verdict:
+        return None
+    text = _TEMPLATE_RE.sub(" ", " ".join(verdict.lower().replace("*", "").split()))
+    matches = list(_FINDING_RE.finditer(text))
+    if not matches:
+        return None
+    # Prefer the first finding after the last "I find ..."; otherwise the conclusion comes last
+    for find in reversed(list(re.finditer(r"\bfinds?\b", text))):
+        sentence_end = text.find(".", find.end())
+        match = _FINDING_RE.search(text, find.end(), sentence_end if sentence_end != -1 else len(text))
+        if match:
+            break
+    else:
+        match = matches[-1]
+    label = match.group("label")
+    label = _SYNONYMS.get(label, label)
+    if _negated(text, match.start()):
+        label = _OPPOSITE[label]
+    if case_type in CASE_VERDICT_LABELS and label not in CASE_VERDICT_LABELS[case_type]:
+        return None
+    return label
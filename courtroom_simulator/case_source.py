@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+import os
+import sys
+from typing import Iterator, Optional
+
+# Full judgments are far longer than the csv module's default 128 KiB field limit
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+def _iter_records(f, start: int = 0) -> Iterator[tuple[int, bytes]]:
+    """Yield (byte offset, raw bytes) for each CSV record from `start`.
+
+    Records may span lines (judgments contain newlines inside quotes); a line ends a
+    record only when the quotes seen so far are balanced. Escaped quotes ("") keep
+    the parity, so no CSV parsing is needed to find boundaries.
+    """
+    f.seek(start)
+    offset = start
+    record = []
+    in_quotes = False
+    record_start = offset
+    for line in f:
+        if not record:
+            record_start = offset
+        record.append(line)
+        offset += len(line)
+        if line.count(b'"') % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            yield record_start, b"".join(record)
+            record = []
+    if record:
+        yield record_start, b"".join(record)
+
+
+def _parse(raw: bytes, columns: list[str]) -> dict:
+    values = next(csv.reader(io.StringIO(raw.decode("utf-8"))))
+    return dict(zip(columns, values))
+
+
+class CaseSource:
+    """Lazy reader for cases.csv: streams rows and fetches single cases by id in O(1).
+
+    The first lookup by id or position scans record boundaries once and stores a
+    byte-offset index next to the CSV (`<path>.idx.json`); it is rebuilt automatically
+    when the CSV changes. Plain iteration from the start needs no index at all.
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None):
+        self.path = path
+        self.index_path = index_path or f"{path}.idx.json"
+        with open(path, "rb") as f:
+            header = f.readline()
+            self._data_start = len(header)
+        self.columns = next(csv.reader([header.decode("utf-8-sig")]))
+        self._offsets = None
+        self._positions = None
+        self.aliases = {}  # as CaseStore's; only preprocessing folds duplicate cases
+
+    # === Index ===
+    def _fingerprint(self) -> dict:
+        stat = os.stat(self.path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def _load_index(self):
+        if self._offsets is not None:
+            return
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index["fingerprint"] != self._fingerprint():
+                index = None
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            index = None
+        if index is None:
+            index = self.build_index()
+        self._offsets = index["offsets"]
+        self._positions = {case_id: i for i, case_id in enumerate(index["ids"])}
+
+    def build_index(self) -> dict:
+        offsets, ids = [], []
+        id_column = self.columns.index("id")
+        with open(self.path, "rb") as f:
+            for offset, raw in _iter_records(f, self._data_start):
+                # The id sits before the long text column, so only the record's first line is parsed
+                first_line = raw.split(b"\n", 1)[0].decode("utf-8")
+                offsets.append(offset)
+                ids.append(next(csv.reader([first_line]))[id_column])
+        index = {"fingerprint": self._fingerprint(), "offsets": offsets, "ids": ids}
+        try:
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+        except OSError:
+            pass  # read-only dataset directory; keep the index in memory only
+        return index
+
+    # === Access ===
+    def __len__(self) -> int:
+        self._load_index()
+        return len(self._offsets)
+
+    def ids(self) -> list[str]:
+        self._load_index()
+        return list(self._positions)
+
+    def get(self, case_id) -> dict:
+        self._load_index()
+        position = self._positions.get(str(case_id))
+        if position is None:
+            raise KeyError(f"Unknown case id {case_id!r}")
+        return self.at(position)
+
+    def at(self, position: int) -> dict:
+        self._load_index()
+        with open(self.path, "rb") as f:
+            _, raw = next(_iter_records(f, self._offsets[position]))
+        return _parse(raw, self.columns)
+
+    def iter_cases(self, offset: int = 0, limit: Optional[int] = None,
+                   start_id: Optional[str] = None) -> Iterator[dict]:
+        """Stream cases from position `offset` (or from case `start_id`), at most `limit` of them."""
+        if start_id is not None:
+            self._load_index()
+            offset = self._positions[str(start_id)]
+        start = self._data_start
+        if offset:
+            self._load_index()
+            if offset >= len(self._offsets):
+                return
+            start = self._offsets[offset]
+        with open(self.path, "rb") as f:
+            for n, (_, raw) in enumerate(_iter_records(f, start)):
+                if limit is not None and n >= limit:
+                    break
+                yield _parse(raw, self.columns)
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter_cases()
@@ -0,0 +1,101 @@
+import json
+import mmap
+import os
+from typing import Iterator, Optional
+
+from .agents.tokens import count_tokens
+from .case_source import CaseSource
+
+TEXTS_FILE = "texts.bin"
+INDEX_FILE = "index.json"
+
+
+class CaseStoreWriter:
+    """Writes normalized cases one at a time: UTF-8 texts back to back plus a small index."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.entries = []  # [id, byte offset, byte length, token count]
+        self.aliases = {}  # duplicate id -> id of the stored case with the same text
+        self._texts = open(os.path.join(directory, TEXTS_FILE), "wb")
+        self._offset = 0
+
+    def add(self, case_id: str, text: str):
+        data = text.encode("utf-8")
+        self._texts.write(data)
+        self.entries.append([case_id, self._offset, len(data), count_tokens(text)])
+        self._offset += len(data)
+
+    def alias(self, case_id: str, canonical_id: str):
+        """Record `case_id` as a duplicate of the already stored `canonical_id`."""
+        self.aliases[case_id] = canonical_id
+
+    def close(self, report: Optional[dict] = None):
+        self._texts.close()
+        with open(os.path.join(self.directory, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump({"cases": self.entries, "aliases": self.aliases, "report": report or {}}, f)
+
+
+class CaseStore:
+    """Read side of the preprocessed store; same interface as CaseSource.
+
+    Texts are memory-mapped, so opening the store costs one small index read and each
+    case is a slice of the mapping. Token counts are precomputed per case. Duplicates
+    are stored once: `aliases` maps each dropped id to its stored case, and `get`
+    resolves them.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+        self.report = index["report"]
+        self._entries = index["cases"]
+        self.aliases = index.get("aliases", {})
+        self._positions = {entry[0]: i for i, entry in enumerate(self._entries)}
+        self._file = open(os.path.join(directory, TEXTS_FILE), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ids(self) -> list[str]:
+        return [entry[0] for entry in self._entries]
+
+    def _position(self, case_id) -> Optional[int]:
+        case_id = str(case_id)
+        return self._positions.get(self.aliases.get(case_id, case_id))
+
+    def tokens(self, case_id) -> int:
+        return self._entries[self._position(case_id)][3]
+
+    def get(self, case_id) -> dict:
+        position = self._position(case_id)
+        if position is None:
+            raise KeyError(f"Unknown case id {case_id!r}")
+        return self.at(position)
+
+    def at(self, position: int) -> dict:
+        case_id, offset, length, tokens = self._entries[position]
+        text = self._data[offset:offset + length].decode("utf-8")
+        return {"id": case_id, "text": text, "tokens": tokens}
+
+    def iter_cases(self, offset: int = 0, limit: Optional[int] = None,
+                   start_id: Optional[str] = None) -> Iterator[dict]:
+        if start_id is not None:
+            offset = self._positions[str(start_id)]
+        end = len(self._entries) if limit is None else min(len(self._entries), offset + limit)
+        for position in range(offset, end):
+            yield self.at(position)
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter_cases()
+
+
+def open_cases(path: str):
+    """A CaseStore for a preprocessed store directory, otherwise a lazy CaseSource over the CSV."""
+    if os.path.isdir(path):
+        return CaseStore(path)
+    return CaseSource(path)
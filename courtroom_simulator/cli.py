@@ -0,0 +1,54 @@
+# cli.py — the `courtroom` command
+#
+#   courtroom run-batch --cases 50 --resume
+#   courtroom serve --server.port 8501
+#   courtroom preprocess cases.csv cases_store
+#
+# Each command's module is imported only when that command runs, so `courtroom --help`
+# loads nothing but argparse.
+
+import argparse
+import os
+import sys
+
+COMMANDS = {
+    "run-batch": "run simulated trials over a case file (see `courtroom run-batch --help`)",
+    "serve": "start the Streamlit trial simulator; further arguments go to `streamlit run`",
+    "preprocess": "normalize cases.csv into a compact case store",
+}
+
+
+def serve(argv: list[str]):
+    try:
+        from streamlit.web import cli as streamlit_cli
+    except ImportError:
+        sys.exit("courtroom serve needs Streamlit: pip install 'courtroom-simulator[ui]'")
+
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+    sys.argv = ["streamlit", "run", app, *argv]
+    sys.exit(streamlit_cli.main())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="courtroom", description="Courtroom trial simulator",
+        epilog="\n".join(f"  {name:<12} {help}" for name, help in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=COMMANDS, metavar="command", help="one of: " + ", ".join(COMMANDS))
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.command == "run-batch":
+        from .batch_trialrunner import main as run_batch
+
+        run_batch(args.args)
+    elif args.command == "serve":
+        serve(args.args)
+    elif args.command == "preprocess":
+        from .preprocess import main as preprocess
+
+        preprocess(args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import csv
+import json
+import os
+import threading
+from typing import Iterable, Optional
+
+
+def _atomic_write_json(path: str, payload: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_journal(path: str) -> dict:
+    """Latest record per case id in a journal file; a torn last line is skipped."""
+    records = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[str(record["id"])] = record
+    return records
+
+
+def write_submission(records: dict, path: str, aliases: Optional[dict] = None) -> int:
+    """One `id,label` row per record, plus one per duplicate id (`aliases`: duplicate id ->
+    case id) whose case has a record."""
+    rows = [(case_id, record.get("label", "")) for case_id, record in records.items()]
+    rows += [(alias, records[case_id].get("label", "")) for alias, case_id in (aliases or {}).items()
+             if case_id in records]
+    with open(path, mode="w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "label"])  # CSV header
+        writer.writerows(rows)
+    return len(rows)
+
+
+def merge_journals(paths: Iterable[str], submission_path: str, aliases: Optional[dict] = None) -> int:
+    """Combine per-shard journals into one submission; a case found twice keeps its newest record."""
+    records = {}
+    for path in paths:
+        for case_id, record in read_journal(path).items():
+            previous = records.get(case_id)
+            if previous is None or record.get("finished_at", 0) >= previous.get("finished_at", 0):
+                records[case_id] = record
+    return write_submission(records, submission_path, aliases)
+
+
+class ResultsJournal:
+    """Append-only JSONL record of finished trials, flushed and fsynced per case.
+
+    A torn last line from a crash is ignored on read, so the journal is always safe
+    to resume from. `write_submission` derives submission.csv from it.
+    """
+
+    def __init__(self, path: str, resume: bool = True):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def records(self) -> dict:
+        """Latest record per case id."""
+        return read_journal(self.path)
+
+    def completed_ids(self) -> set:
+        return set(self.records())
+
+    def append(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def write_submission(self, path: str, aliases: Optional[dict] = None) -> int:
+        return write_submission(self.records(), path, aliases)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class CheckpointStore:
+    """One JSON file per case, replaced atomically so a crash never leaves a torn checkpoint."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def path(self, case_id) -> str:
+        return os.path.join(self.directory, f"{case_id}.json")
+
+    def save(self, case_id, state: dict) -> str:
+        path = self.path(case_id)
+        _atomic_write_json(path, state)
+        return path
+
+    def load(self, case_id) -> Optional[dict]:
+        try:
+            with open(self.path(case_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def discard(self, case_id):
+        try:
+            os.remove(self.path(case_id))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,149 @@
+# preprocess.py — normalize cases.csv once into a compact store the runners read from
+#
+#   courtroom preprocess cases.csv cases_store
+
+import argparse
+import hashlib
+import re
+from collections import Counter
+from typing import Optional
+
+from .agents.tokens import count_tokens
+from .case_source import CaseSource
+from .case_store import CaseStoreWriter
+
+WORD_RE = re.compile(r"[a-z]+")
+TRAILING_FRAGMENT_RE = re.compile(r"([a-z]+)(-?)$")
+LEADING_FRAGMENT_RE = re.compile(r"^[a-z]+")
+# How much of a paragraph `reflow` looks back on; no real word runs longer
+_RECENT_CHARS = 64
+SPACES_RE = re.compile(r"[ \t]+")
+# A word hard-wrapped and then hyphenated across the next line: "discipl\ni-\nnary"
+DOUBLE_SPLIT_RE = re.compile(r"([a-z]+)\n([a-z]+)-\n[ \t]*([a-z]+)")
+
+# "... for the appellant. <name> for the respondents. the judgment of the court was delivered by"
+DELIVERY_RE = re.compile(r"the judgment of the (?:court|companyrt) was delivered by")
+APPEARANCE_RE = re.compile(
+    r"\bfor (?:the )?(?:appellants?|respondents?|petitioners?|state|interveners?|caveators?|complainants?)\b"
+)
+CITATION_RE = re.compile(r"\bnumber\s+[\w./-]+(?:\s+of\s+\d{2,4})?\s*\.?")
+
+
+def build_vocabulary(texts) -> Counter:
+    """Word counts from line interiors only, where hard wraps cannot have split a word."""
+    vocab = Counter()
+    for text in texts:
+        for line in text.split("\n"):
+            words = WORD_RE.findall(line)
+            vocab.update(words[1:-1])
+    return vocab
+
+
+def _should_join(left: str, right: str, vocab: Counter) -> bool:
+    joined = vocab.get(left + right, 0)
+    if not joined:
+        return False
+    # "in\nto" stays two words: both halves are far more common than "into"
+    return joined >= min(vocab.get(left, 0), vocab.get(right, 0))
+
+
+def reflow(text: str, vocab: Counter) -> str:
+    """Undo hard wraps: rejoin split words ("t\\nhe", "discipl\\ni-\\nnary") and re-flow lines.
+
+    Blank lines are kept as paragraph breaks; every other newline becomes either
+    nothing (inside a word) or a single space.
+    """
+    def join_double_split(match):
+        word = "".join(match.groups())
+        return word if vocab.get(word) else match.group(0)
+
+    text = DOUBLE_SPLIT_RE.sub(join_double_split, text)
+    paragraphs = []
+    for block in re.split(r"\n\s*\n", text):
+        parts = []
+        recent = ""  # the end of the paragraph so far
+        for line in block.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            sep = " " if parts else ""
+            tail = TRAILING_FRAGMENT_RE.search(recent)
+            head = LEADING_FRAGMENT_RE.match(line)
+            if tail and head:
+                left, hyphen, right = tail.group(1), tail.group(2), head.group(0)
+                if hyphen:
+                    # "al-\nlowed" -> "allowed", but "attorney-\ngeneral" keeps its hyphen
+                    if vocab.get(left + right):
+                        parts[-1] = parts[-1][:-1]
+                        recent = recent[:-1]
+                    sep = ""
+                elif _should_join(left, right, vocab):
+                    sep = ""
+            parts.append(sep + line)
+            recent = (recent + sep + line)[-_RECENT_CHARS:]
+        if parts:
+            paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+def strip_appearances(text: str) -> str:
+    """Drop the counsel appearance block and the delivery formula from the case header."""
+    delivery = DELIVERY_RE.search(text, 0, 4000)
+    if not delivery:
+        return text
+    header = text[:delivery.start()]
+    first_appearance = APPEARANCE_RE.search(header)
+    if not first_appearance:
+        return text[:delivery.start()] + text[delivery.end():].lstrip()
+    citations = list(CITATION_RE.finditer(header, 0, first_appearance.start()))
+    if not citations:
+        return text[:delivery.start()] + text[delivery.end():].lstrip()
+    return header[:citations[-1].end()].rstrip() + " " + text[delivery.end():].lstrip()
+
+
+def normalize_text(text: str, vocab: Counter) -> str:
+    text = reflow(text, vocab)
+    text = SPACES_RE.sub(" ", text)
+    text = strip_appearances(text)
+    return text.strip()
+
+
+def preprocess(source: CaseSource, store_dir: str, limit: Optional[int] = None) -> dict:
+    vocab = build_vocabulary(case["text"] for case in source.iter_cases(limit=limit))
+    seen = {}
+    writer = CaseStoreWriter(store_dir)
+    report = {"cases": 0, "duplicates": 0, "raw_tokens": 0, "tokens": 0}
+    for case in source.iter_cases(limit=limit):
+        report["cases"] += 1
+        report["raw_tokens"] += count_tokens(case["text"])
+        text = normalize_text(case["text"], vocab)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        if digest in seen:
+            # Not stored again; its label is the stored case's
+            report["duplicates"] += 1
+            writer.alias(case["id"], seen[digest])
+            continue
+        seen[digest] = case["id"]
+        report["tokens"] += count_tokens(text)
+        writer.add(case["id"], text)
+    writer.close(report)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="courtroom preprocess", description="Normalize cases.csv into a compact case store")
+    parser.add_argument("source", nargs="?", default="cases.csv")
+    parser.add_argument("store", nargs="?", default="cases_store")
+    parser.add_argument("--limit", type=int, default=None, help="only preprocess the first N cases")
+    args = parser.parse_args(argv)
+
+    report = preprocess(CaseSource(args.source), args.store, args.limit)
+    saved = report["raw_tokens"] - report["tokens"]
+    print(f"🧹 {report['cases']} cases, {report['duplicates']} duplicates stored once (listed as aliases)")
+    print(f"📉 Tokens: {report['raw_tokens']} -> {report['tokens']} "
+          f"({saved} saved, {100.0 * saved / max(report['raw_tokens'], 1):.1f}%)")
+    print(f"💾 Store written to {args.store}")
+
+
+if __name__ == "__main__":
+    main()
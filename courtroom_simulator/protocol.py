@@ -0,0 +1,137 @@
+import json
+import re
+from typing import Optional
+
+# === Compact protocol: one JSON reply carries several trial decisions ===
+# Schemas use a small subset of JSON Schema (type, properties, required, items,
+# enum, minimum, maxItems), checked by `conforms` without a schema library.
+
+# Questions the examining lawyer may put in one reply
+MAX_QUESTIONS_PER_CALL = 3
+
+QUESTIONS_SCHEMA = {
+    "type": "object",
+    "required": ["questions", "done"],
+    "properties": {
+        "questions": {"type": "array", "items": {"type": "string"}},
+        "done": {"type": "boolean"},
+    },
+}
+OBJECTIONS_SCHEMA = {
+    "type": "object",
+    "required": ["objections"],
+    "properties": {
+        "objections": {"type": "array", "items": {
+            "type": "object",
+            "required": ["question", "grounds"],
+            "properties": {"question": {"type": "integer", "minimum": 1}, "grounds": {"type": "string"}},
+        }},
+    },
+}
+RULINGS_SCHEMA = {
+    "type": "object",
+    "required": ["rulings"],
+    "properties": {
+        "rulings": {"type": "array", "items": {
+            "type": "object",
+            "required": ["question", "ruling"],
+            "properties": {"question": {"type": "integer", "minimum": 1},
+                           "ruling": {"type": "string", "enum": ["sustained", "overruled"]},
+                           "reason": {"type": "string"}},
+        }},
+    },
+}
+ANSWERS_SCHEMA = {
+    "type": "object",
+    "required": ["answers"],
+    "properties": {"answers": {"type": "array", "items": {"type": "string"}}},
+}
+
+_TYPES = {"object": dict, "array": list, "string": str, "boolean": bool, "integer": int}
+_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def conforms(value, schema: dict) -> bool:
+    """True if `value` satisfies `schema`."""
+    expected = _TYPES[schema["type"]]
+    if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+        return False
+    if "enum" in schema and value not in schema["enum"]:
+        return False
+    if "minimum" in schema and value < schema["minimum"]:
+        return False
+    if expected is dict:
+        if any(key not in value for key in schema.get("required", ())):
+            return False
+        return all(conforms(value[key], sub) for key, sub in schema.get("properties", {}).items() if key in value)
+    if expected is list:
+        if len(value) > schema.get("maxItems", len(value)):
+            return False
+        return all(conforms(item, schema["items"]) for item in value)
+    return True
+
+
+def parse_decision(reply: str, schema: dict) -> Optional[dict]:
+    """The JSON object in `reply` (code fences and surrounding prose are ignored) if it
+    matches `schema`, else None."""
+    match = _JSON_RE.search(reply)
+    if not match:
+        return None
+    try:
+        value = json.loads(match.group())
+    except ValueError:
+        return None
+    return value if conforms(value, schema) else None
+
+
+def _numbered(questions: list[str]) -> str:
+    return "\n".join(f"{i}. {question}" for i, question in enumerate(questions, 1))
+
+
+# === Prompts ===
+def questions_prompt(witness: str, limit: int) -> str:
+    return (f"Ask {witness} up to {limit} relevant questions, in the order you would put them.\n"
+            'Reply with JSON only: {"questions": ["..."], "done": false}. Set "done" to true if '
+            "these are your last questions for this witness (the list may then be empty).")
+
+
+def objections_prompt(lawyer: str, witness: str, questions: list[str]) -> str:
+    return (f"The {lawyer} asked {witness}:\n{_numbered(questions)}\n"
+            "Should you object to any of these questions?\n"
+            'Reply with JSON only: {"objections": [{"question": 1, "grounds": "..."}]}, '
+            "with an empty list if you do not object.")
+
+
+def rulings_prompt(by: str, objections: list[tuple[int, str, str]]) -> str:
+    """`objections`: (question number, question, grounds)."""
+    lines = "\n".join(f'{number}. "{question}" (grounds: {grounds})' for number, question, grounds in objections)
+    return (f"{by} objected to these questions:\n{lines}\n"
+            "Rule on each objection.\n"
+            'Reply with JSON only: {"rulings": [{"question": 1, "ruling": "sustained", "reason": "..."}]}, '
+            'where "ruling" is "sustained" or "overruled".')
+
+
+def answers_prompt(questions: list[str]) -> str:
+    return (f"Answer each of these questions in turn:\n{_numbered(questions)}\n"
+            'Reply with JSON only: {"answers": ["..."]}, one answer per question, in order.')
+
+
+def retry_prompt(prompt: str) -> str:
+    """`prompt` again, after a reply that did not match its JSON format."""
+    return f"{prompt}\nYour previous reply did not follow this format. Reply with the JSON object only."
+
+
+# === Readable forms, for the transcript ===
+def render_questions(decision: dict) -> str:
+    return "\n".join(decision["questions"] + (["No further questions."] if decision["done"] else []))
+
+
+def render_objections(decision: dict) -> str:
+    if not decision["objections"]:
+        return "No objection."
+    return "\n".join(f"Objection to question {o['question']}: {o['grounds']}" for o in decision["objections"])
+
+
+def render_rulings(decision: dict) -> str:
+    return "\n".join(f"Question {r['question']}: {r['ruling'].capitalize()}. {r.get('reason', '')}".rstrip()
+                     for r in decision["rulings"])
@@ -0,0 +1,67 @@
+import asyncio
+import inspect
+import time
+import traceback
+from typing import Awaitable, Callable, Hashable, Iterable, Optional, Tuple, Union
+
+from .agents.base_agent import BaseAgent
+from .agents.tracing import trace_context
+from .trial_manager import TrialManager
+
+TrialFactory = Callable[[], Union[TrialManager, Awaitable[TrialManager]]]
+StepCallback = Callable[[Hashable, TrialManager], None]
+
+
+class TrialScheduler:
+    """Runs many trials at once; pacing is left to the shared `BaseAgent.rate_limiter`.
+
+    Each trial is driven step by step as a task on one event loop, so the number of calls
+    in flight is bounded by `max_concurrent_trials` and by the request/token budget, not
+    by fixed sleeps.
+    """
+
+    def __init__(self, max_concurrent_trials: int = 8):
+        self.max_concurrent_trials = max_concurrent_trials
+
+    async def _arun_trial(self, case_id: Hashable, factory: TrialFactory,
+                          on_step: Optional[StepCallback]) -> Tuple[TrialManager, float]:
+        started = time.perf_counter()
+        with trace_context(case_id=str(case_id)):
+            trial = factory()
+            if inspect.isawaitable(trial):
+                trial = await trial
+            while not trial.ended:
+                await trial.arun_next_step()
+                if on_step:
+                    on_step(case_id, trial)
+        return trial, time.perf_counter() - started
+
+    async def arun(self, jobs: Iterable[Tuple[Hashable, TrialFactory]],
+                   on_complete: Optional[Callable[[Hashable, TrialManager, float], None]] = None,
+                   on_step: Optional[StepCallback] = None) -> dict:
+        """Run every (case_id, factory) job and return {case_id: TrialManager or exception}.
+
+        Every trial shares this event loop and one pooled HTTP session; `on_step` is called
+        after every completed step (e.g. to checkpoint the trial).
+
+        Factories may return a TrialManager or an awaitable of one (e.g. `TrialManager.acreate`).
+        """
+        results = {}
+        slots = asyncio.Semaphore(self.max_concurrent_trials)
+
+        async def guarded(case_id, factory):
+            async with slots:
+                try:
+                    trial, elapsed = await self._arun_trial(case_id, factory, on_step)
+                except Exception as e:
+                    print(f"❌ Trial for case {case_id} failed: {e}")
+                    traceback.print_exc()
+                    results[case_id] = e
+                    return
+            results[case_id] = trial
+            if on_complete:
+                on_complete(case_id, trial, elapsed)
+
+        async with BaseAgent.backend.http_pool(max_connections=self.max_concurrent_trials * 2):
+            await asyncio.gather(*(guarded(case_id, factory) for case_id, factory in jobs))
+        return results
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .journal import CheckpointStore
+from .trial_factory import build_trial, restore_trial, witness_specs
+from .trial_manager import TrialManager
+
+
+def trial_bytes(trial: TrialManager, case_chars: int) -> int:
+    """Rough resident size of a trial: its transcript text plus the indexed case."""
+    text = sum(len(e.prompt) + len(e.reply) for e in trial.transcript.events)
+    # The case text, its passages and their BM25 term counts
+    return text + 3 * case_chars
+
+
+class _Entry:
+    __slots__ = ("case_id", "case_chars", "trial", "size", "last_used", "leases")
+
+    def __init__(self, case_id: str, case_chars: int, trial: Optional[TrialManager]):
+        self.case_id = case_id
+        self.case_chars = case_chars
+        self.trial = trial  # None while spilled to disk
+        self.size = 0
+        self.last_used = time.monotonic()
+        self.leases = 0
+
+
+class TrialStore:
+    """Every UI session's trials in one process, under a memory cap.
+
+    Trials are keyed by (session, case) and kept in least-recently-used order. When the
+    resident trials exceed `max_trials` or an estimated `max_bytes`, or one has been idle
+    for `idle_s`, it is spilled to `spill_dir` as a checkpoint and rebuilt from the case
+    store on its next access. A trial that is leased (running a step) is never spilled.
+
+    A spilled trial left unused for `expire_s` belongs to an abandoned session and is
+    dropped along with its file. Spill files from an earlier process are unreachable,
+    so `spill_dir` is emptied on startup.
+    """
+
+    def __init__(self, cases, spill_dir: str, max_trials: int = 32, max_bytes: int = 256 * 2 ** 20,
+                 idle_s: float = 1800.0, expire_s: Optional[float] = 24 * 3600.0, full_text: bool = False):
+        self.cases = cases
+        self.spill = CheckpointStore(spill_dir)
+        self.spill.clear()
+        self.max_trials = max_trials
+        self.max_bytes = max_bytes
+        self.idle_s = idle_s
+        self.expire_s = expire_s
+        self.full_text = full_text
+        self.stats = {"created": 0, "spilled": 0, "restored": 0, "expired": 0}
+        self._entries = OrderedDict()  # key -> _Entry, least recently used first
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(session_id: str, case_id) -> str:
+        """File-name safe key; case ids may contain anything."""
+        return f"{session_id}-{hashlib.sha1(str(case_id).encode('utf-8')).hexdigest()[:16]}"
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def create(self, key: str, case_id, **options) -> TrialManager:
+        """Start a new trial for `case_id` under `key`, replacing any earlier one."""
+        case_text = self.cases.get(case_id)["text"]
+        trial = build_trial(case_text, self.full_text, **options)  # may ask the judge; done unlocked
+        with self._lock:
+            self.spill.discard(key)
+            entry = self._entries[key] = _Entry(str(case_id), len(case_text), trial)
+            entry.size = trial_bytes(trial, entry.case_chars)
+            self._entries.move_to_end(key)
+            self.stats["created"] += 1
+            self._enforce()
+        return trial
+
+    def get(self, key: str) -> Optional[TrialManager]:
+        """The trial under `key`, restored from disk if it was spilled; None if there is none."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.trial is None:
+                self._restore(key, entry)
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(key)
+            self._enforce()
+            return entry.trial
+
+    @contextmanager
+    def lease(self, key: str) -> Iterator[TrialManager]:
+        """Hold the trial in memory while it runs; its size is re-measured afterwards."""
+        with self._lock:
+            trial = self.get(key)
+            if trial is None:
+                raise KeyError(f"No trial under {key!r}")
+            entry = self._entries[key]
+            entry.leases += 1
+        try:
+            yield trial
+        finally:
+            with self._lock:
+                entry.leases -= 1
+                entry.last_used = time.monotonic()
+                entry.size = trial_bytes(trial, entry.case_chars)
+                self._enforce()
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+            self.spill.discard(key)
+
+    def resident(self) -> dict:
+        """Trials and estimated bytes currently held in memory."""
+        with self._lock:
+            held = [e for e in self._entries.values() if e.trial is not None]
+            return {"trials": len(held), "bytes": sum(e.size for e in held), "spilled": len(self._entries) - len(held)}
+
+    def _restore(self, key: str, entry: _Entry):
+        record = self.spill.load(key)
+        case_text = self.cases.get(entry.case_id)["text"]
+        entry.trial = restore_trial(case_text, record["state"], self.full_text,
+                                    witnesses=[tuple(w) for w in record["witnesses"]],
+                                    speculative=record["speculative"], compact=record.get("compact", False))
+        entry.size = trial_bytes(entry.trial, entry.case_chars)
+        self.stats["restored"] += 1
+
+    def _spill(self, key: str, entry: _Entry):
+        trial = entry.trial
+        self.spill.save(key, {"case_id": entry.case_id, "witnesses": witness_specs(trial),
+                              "speculative": trial.speculative, "compact": trial.compact,
+                              "state": trial.state_dict()})
+        entry.trial = None
+        entry.size = 0
+        self.stats["spilled"] += 1
+
+    def _enforce(self):
+        now = time.monotonic()
+        newest = next(reversed(self._entries), None)  # the trial just touched stays, even alone over the cap
+        held = [(key, e) for key, e in self._entries.items()
+                if e.trial is not None and not e.leases and key != newest]
+        usage = self.resident()
+        # Least recently used first: everything idle, then whatever it takes to fit
+        for key, entry in held:
+            idle = now - entry.last_used > self.idle_s
+            if idle or usage["trials"] > self.max_trials or usage["bytes"] > self.max_bytes:
+                usage["trials"] -= 1
+                usage["bytes"] -= entry.size
+                self._spill(key, entry)
+        if self.expire_s is None:
+            return
+        expired = [key for key, e in self._entries.items()
+                   if e.trial is None and not e.leases and now - e.last_used > self.expire_s]
+        for key in expired:
+            del self._entries[key]
+            self.spill.discard(key)
+            self.stats["expired"] += 1
+
+
+def remove_stale_spill_dirs(root: str):
+    """Delete `root/<pid>` spill directories whose server process has exited."""
+    if not os.path.isdir(root):
+        return
+    for name in os.listdir(root):
+        if not name.isdigit() or int(name) == os.getpid():
+            continue
+        try:
+            os.kill(int(name), 0)
+        except ProcessLookupError:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        except PermissionError:
+            pass  # alive, run by another user
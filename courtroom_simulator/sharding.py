@@ -0,0 +1,28 @@
+import zlib
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """"2/8" -> (2, 8); shards are numbered 0..N-1."""
+    index, _, count = spec.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Shard must look like 'i/N', got {spec!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in 0..{count - 1}, got {spec!r}")
+    return index, count
+
+
+def shard_of(case_id, count: int) -> int:
+    """Stable across processes, machines and Python versions (unlike `hash`)."""
+    return zlib.crc32(str(case_id).encode("utf-8")) % count
+
+
+def in_shard(case_id, shard: tuple[int, int]) -> bool:
+    index, count = shard
+    return shard_of(case_id, count) == index
+
+
+def shard_name(shard: tuple[int, int]) -> str:
+    index, count = shard
+    return f"shard-{index}-of-{count}"
@@ -1,68 +1,133 @@
-# streamlit_app.py — Groq-compatible trial interface
-
-import streamlit as st
-import pandas as pd
-from agents.defendant import DefendantAgent
-from agents.judge import JudgeAgent
-from agents.lawyer import DefenseAgent, ProsecutionAgent
-from agents.witness import WitnessAgent
-from trial_manager import TrialManager
-from agents.base_agent import BaseAgent
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Load the case data
-CASE_DATA = pd.read_csv("data.csv")
-st.set_page_config("Courtroom Simulator", layout="wide")
-st.title("⚖️ Courtroom Trial Simulator")
-
-# --- Select a Case ---
-st.sidebar.header("🔍 Select a Case")
-case_index = st.sidebar.selectbox("Choose a case to simulate:", CASE_DATA.index)
-selected_case = CASE_DATA.loc[case_index, "text"]
-st.sidebar.markdown("---")
-st.sidebar.code(selected_case[:500] + ("..." if len(selected_case) > 500 else ""))
-
-# --- Session State Init ---
-if "trial" not in st.session_state:
-    judge = JudgeAgent()
-    defense = DefenseAgent()
-    prosecution = ProsecutionAgent()
-    defendant = DefendantAgent()
-    witnesses = [WitnessAgent()]
-    trial = TrialManager(judge, defense, prosecution, defendant, witnesses)
-    st.session_state.trial = trial
-
-# --- Add New Witness Dynamically ---
-st.sidebar.header("➕ Add Witness")
-with st.sidebar.form("new_witness_form"):
-    witness_name = st.text_input("Witness name")
-    witness_prompt = st.text_area("Witness background")
-    submitted = st.form_submit_button("Add Witness")
-    if submitted and witness_name:
-        agent_prompt = f"You are {witness_name}. {witness_prompt}\nRefer to this case:\n{selected_case}"
-        new_witness = BaseAgent(witness_name, agent_prompt)
-        st.session_state.trial.witnesses.append(new_witness)
-        st.success(f"Witness '{witness_name}' added.")
-
-# --- Run Next Trial Phase ---
-st.markdown("## 🧑‍⚖️ Trial Transcript")
-if st.button("▶️ Run Next Phase"):
-    st.session_state.trial.run_next_step()
-    st.rerun()
-
-# --- Display Transcript ---
-for agent in [
-    st.session_state.trial.judge,
-    st.session_state.trial.defense,
-    st.session_state.trial.prosecution,
-    st.session_state.trial.defendant,
-    *st.session_state.trial.witnesses
-]:
-    with st.expander(f"{agent.name} - Transcript"):
-        for entry in agent.history:
-            role = entry["role"].capitalize()
-            content = entry["content"]
-            st.markdown(f"**{role}**: {content}")
\ No newline at end of file
+# streamlit_app.py — Groq-compatible trial interface
+
+# Run with `courtroom serve`; Streamlit executes this file as a script, so it imports the
+# installed package rather than its neighbours
+import streamlit as st
+from courtroom_simulator.agents.backends import BackendError
+from courtroom_simulator.agents.env import load_env
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.batch_trialrunner import DATA_PATH as CASES_CSV, STORE_PATH
+from courtroom_simulator.case_store import open_cases
+from courtroom_simulator.sessions import TrialStore, remove_stale_spill_dirs
+import os
+import uuid
+
+load_env()
+
+# Same default as `courtroom run-batch --data`: the preprocessed store if present, else the raw CSV
+DATA_PATH = os.environ.get("COURTROOM_DATA", STORE_PATH if os.path.isdir(STORE_PATH) else CASES_CSV)
+SESSIONS_DIR = ".sessions"
+SPILL_DIR = os.environ.get("COURTROOM_SPILL_DIR", os.path.join(SESSIONS_DIR, str(os.getpid())))
+MAX_TRIALS = int(os.environ.get("COURTROOM_MAX_TRIALS", "32"))
+MAX_TRIAL_MB = int(os.environ.get("COURTROOM_MAX_TRIAL_MB", "256"))
+
+
+# Loaded once per server process and shared by every session: the case index and the
+# home of all sessions' trials (least recently used ones are spilled to disk)
+@st.cache_resource
+def load_cases():
+    return open_cases(DATA_PATH)
+
+
+@st.cache_resource
+def trial_store() -> TrialStore:
+    # Servers that exited (or crashed) leave their per-process spill directory behind
+    remove_stale_spill_dirs(SESSIONS_DIR)
+    return TrialStore(load_cases(), SPILL_DIR, max_trials=MAX_TRIALS, max_bytes=MAX_TRIAL_MB * 2 ** 20)
+
+
+CASE_DATA = load_cases()
+TRIALS = trial_store()
+st.set_page_config("Courtroom Simulator", layout="wide")
+st.title("⚖️ Courtroom Trial Simulator")
+
+# --- Select a Case ---
+st.sidebar.header("🔍 Select a Case")
+case_id = st.sidebar.selectbox("Choose a case to simulate:", CASE_DATA.ids())
+selected_case = CASE_DATA.get(case_id)["text"]
+st.sidebar.markdown("---")
+st.sidebar.code(selected_case[:500] + ("..." if len(selected_case) > 500 else ""))
+
+# --- Session State Init: a trial is built only when the user starts one for the selected case ---
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+trial_key = TrialStore.key(session_id, case_id)
+if trial_key not in TRIALS:
+    if st.button("⚖️ Start Trial"):
+        with st.spinner("Preparing the case..."):
+            TRIALS.create(trial_key, case_id)
+        st.rerun()
+    st.stop()
+trial = TRIALS.get(trial_key)
+
+# --- Add New Witness Dynamically ---
+st.sidebar.header("➕ Add Witness")
+with st.sidebar.form("new_witness_form"):
+    witness_name = st.text_input("Witness name")
+    witness_prompt = st.text_area("Witness background")
+    submitted = st.form_submit_button("Add Witness")
+    if submitted and witness_name:
+        # The case reaches the witness through the trial's case context, like every other agent
+        new_witness = BaseAgent(witness_name, f"You are {witness_name}. {witness_prompt}")
+        with TRIALS.lease(trial_key) as trial:
+            trial.add_witness(new_witness)
+        st.success(f"Witness '{witness_name}' added.")
+
+if st.sidebar.button("🔄 Restart Trial"):
+    TRIALS.discard(trial_key)
+    st.rerun()
+
+# --- Run Next Trial Phase ---
+st.markdown("## 🧑‍⚖️ Trial Transcript")
+run_step = st.button("▶️ Run Next Phase")
+
+
+def render_entry(speaker: str, text: str, prompt: str = ""):
+    with st.chat_message("assistant", avatar="⚖️" if speaker == "Judge" else None):
+        st.markdown(f"**{speaker}**: {text}")
+        if prompt:
+            st.caption(prompt)
+
+
+if "step_error" in st.session_state:
+    st.error(st.session_state.pop("step_error"))
+
+# --- Display Transcript (chronological, from the trial's shared record) ---
+phase = None
+for entry in trial.transcript.chronological():
+    if entry["phase"] != phase:
+        phase = entry["phase"]
+        st.markdown(f"### {(phase or 'not_started').replace('_', ' ').title()}")
+    render_entry(entry["speaker"], entry["reply"], entry["prompt"])
+
+# --- Live step: stream each speaker's reply below the transcript as it is generated ---
+if run_step:
+    live = st.container()
+    turns = {}  # turn id -> [placeholder, speaker, text so far]
+
+    def on_event(event: dict):
+        if event["event"] == "phase":
+            live.markdown(f"### {event['phase'].replace('_', ' ').title()}")
+        elif event["event"] == "turn_start":
+            turns[event["turn"]] = [live.empty(), event["speaker"], ""]
+        elif event["event"] == "token":
+            turn = turns[event["turn"]]
+            turn[2] += event["text"]
+            with turn[0].container():
+                render_entry(turn[1], turn[2] + " ▌")
+        elif event["event"] == "turn_end":
+            turn = turns[event["turn"]]
+            with turn[0].container():
+                render_entry(turn[1], event["text"])
+        elif event["event"] == "retract" and event["turn"] in turns:
+            turns[event["turn"]][0].empty()  # speculative answer to a sustained objection
+
+    with TRIALS.lease(trial_key) as trial:
+        trial.on_event = on_event
+        try:
+            trial.run_next_step()
+        except BackendError as e:
+            # The step was rolled back; the user can simply run it again
+            st.session_state.step_error = f"The model could not be reached, please try again: {e}"
+        finally:
+            trial.on_event = None
+    st.rerun()
@@ -0,0 +1,61 @@
+from typing import Optional
+
+from .agents.base_agent import BaseAgent
+from .agents.defendant import DefendantAgent
+from .agents.judge import JudgeAgent
+from .agents.lawyer import DefenseAgent, ProsecutionAgent
+from .agents.witness import WitnessAgent
+from .case_context import CaseContext
+from .trial_manager import TrialManager
+
+
+def build_agents(case_text: str, full_text: bool = False,
+                 witnesses: Optional[list[tuple[str, str]]] = None) -> tuple:
+    """The cast of one trial, each agent wired to the case.
+
+    `witnesses` is a list of (name, system prompt) pairs, as saved by `witness_specs`;
+    by default the trial has one standard witness.
+    """
+    judge = JudgeAgent()
+    defense = DefenseAgent()
+    prosecution = ProsecutionAgent()
+    defendant = DefendantAgent()
+    if witnesses is None:
+        witnesses = [WitnessAgent(name=f"Witness {i+1}") for i in range(1)]
+    else:
+        witnesses = [BaseAgent(name, prompt) for name, prompt in witnesses]
+    agents = [judge, defense, prosecution, defendant, *witnesses]
+
+    # One index per case; each call gets the brief (or the whole case with `full_text`)
+    # after the persona, plus the passages relevant to the current turn
+    context = CaseContext(case_text, full_text=full_text)
+    for agent in agents:
+        agent.case_context = context
+
+    return judge, defense, prosecution, defendant, witnesses
+
+
+def witness_specs(trial: TrialManager) -> list[tuple[str, str]]:
+    """(name, system prompt) for each witness, enough to rebuild them with `build_agents`."""
+    return [(w.name, w.system_prompt) for w in trial.witnesses]
+
+
+def build_trial(case_text: str, full_text: bool = False, **options) -> TrialManager:
+    return TrialManager(*build_agents(case_text, full_text), case_text=case_text, **options)
+
+
+def restore_trial(case_text: str, checkpoint: dict, full_text: bool = False,
+                  witnesses: Optional[list[tuple[str, str]]] = None, **options) -> TrialManager:
+    """Rebuild a trial from `TrialManager.state_dict()` with the witnesses it was saved with."""
+    agents = build_agents(case_text, full_text, witnesses)
+    trial = TrialManager(*agents, case_type=checkpoint["case_type"], **options)
+    trial.load_state_dict(checkpoint)
+    return trial
+
+
+async def abuild_trial(case_text: str, full_text: bool = False, checkpoint: dict = None,
+                      **options) -> TrialManager:
+    if checkpoint:
+        # Continue an interrupted trial from its last completed step
+        return restore_trial(case_text, checkpoint, full_text, **options)
+    return await TrialManager.acreate(*build_agents(case_text, full_text), case_text=case_text, **options)
@@ -1,210 +1,758 @@
-from typing import Optional, Union, Tuple
-from agents.judge import JudgeAgent
-from agents.lawyer import DefenseAgent, ProsecutionAgent
-from agents.defendant import DefendantAgent
-from agents.witness import WitnessAgent
-from agents.plaintiff import PlaintiffAgent
-
-class TrialManager:
-    def __init__(self, judge: JudgeAgent, defense: DefenseAgent, prosecution: ProsecutionAgent,
-                 defendant: DefendantAgent, witnesses: list[WitnessAgent]):
-        self.judge = judge
-        self.defense = defense
-        self.prosecution = prosecution
-        self.defendant = defendant
-        self.witnesses = witnesses
-        self.ended = False
-        self.current_phase = "not_started"  # opening, examination, closing, ended
-        self.current_witness_index = -1
-        
-        self.case_type = self._determine_case_type()
-        self.plaintiff = PlaintiffAgent() if self.case_type == "civil" else None
-        
-        # Track which side is currently presenting
-        self.current_presenting_side = None  # prosecution/plaintiff or defense
-        
-        # Track objections
-        self.pending_objection = None
-        
-        # Phases in order
-        self.phases = [
-            "opening_statements",
-            "prosecution_case",
-            "defense_case",
-            "closing_arguments",
-            "verdict"
-        ]
-        self.current_phase_index = -1
-        
-    def _determine_case_type(self) -> str:
-        response = self.judge.respond("Is this a criminal or civil case? Just reply 'civil' or 'criminal'.")
-        return "civil" if "civil" in response.strip().lower() else "criminal"
-    
-    def _next_phase(self):
-        self.current_phase_index += 1
-        if self.current_phase_index >= len(self.phases):
-            self.ended = True
-            return
-        
-        self.current_phase = self.phases[self.current_phase_index]
-        
-        if self.current_phase == "opening_statements":
-            self.current_presenting_side = "prosecution" if self.case_type == "criminal" else "plaintiff"
-        elif self.current_phase == "prosecution_case":
-            self.current_presenting_side = "prosecution" if self.case_type == "criminal" else "plaintiff"
-            self.current_witness_index = 0
-        elif self.current_phase == "defense_case":
-            self.current_presenting_side = "defense"
-            self.current_witness_index = 0
-        elif self.current_phase == "closing_arguments":
-            self.current_presenting_side = "prosecution" if self.case_type == "criminal" else "plaintiff"
-    
-    def _get_current_lawyer(self) -> Union[ProsecutionAgent, DefenseAgent, PlaintiffAgent]:
-        if self.current_presenting_side == "defense":
-            return self.defense
-        elif self.current_presenting_side == "prosecution":
-            return self.prosecution
-        elif self.current_presenting_side == "plaintiff":
-            return self.plaintiff
-        return None
-    
-    def _switch_presenting_side(self):
-        if self.current_presenting_side == "defense":
-            self.current_presenting_side = "prosecution" if self.case_type == "criminal" else "plaintiff"
-        else:
-            self.current_presenting_side = "defense"
-    
-    def _handle_objection(self, message: str, by_agent_name: str) -> Tuple[bool, str]:
-        """Returns (was_there_objection, ruling)"""
-        if "objection" in message.lower():
-            self.pending_objection = (message, by_agent_name)
-            return True, None
-        return False, None
-    
-    def _process_objection(self) -> str:
-        if not self.pending_objection:
-            return None
-            
-        message, by_agent_name = self.pending_objection
-        self.pending_objection = None
-        
-        ruling = self.judge.respond(
-            f"{by_agent_name} raised an objection: {message}\n"
-            "Please rule with 'sustained' or 'overruled' and briefly explain."
-        )
-        print(f"👨‍⚖️ Judge rules on objection: {ruling}")
-        return ruling
-    
-    def _check_end_condition(self, statement: str) -> bool:
-        endings = [
-            "no further questions", 
-            "rest my case", 
-            "nothing further",
-            "conclude my presentation"
-        ]
-        statement_lower = statement.lower()
-        return any(phrase in statement_lower for phrase in endings)
-    
-    def run_next_step(self):
-        if self.ended:
-            print("⚖️ Trial has concluded.")
-            return
-        
-        # Handle any pending objections first
-        if self.pending_objection:
-            self._process_objection()
-            return
-        
-        # Move to next phase if needed
-        if self.current_phase_index == -1 or self.current_phase == "ended":
-            self._next_phase()
-            return
-        
-        # Execute current phase
-        if self.current_phase == "opening_statements":
-            self._run_opening_statements()
-        elif self.current_phase in ["prosecution_case", "defense_case"]:
-            self._run_examination()
-        elif self.current_phase == "closing_arguments":
-            self._run_closing_arguments()
-        elif self.current_phase == "verdict":
-            self._run_verdict()
-    
-    def _run_opening_statements(self):
-        lawyer = self._get_current_lawyer()
-        side = "Prosecution" if self.case_type == "criminal" else "Plaintiff" if self.current_presenting_side == "plaintiff" else "Defense"
-        
-        print(f"\n📢 {side} Opening Statement:")
-        statement = lawyer.respond("Present your opening statement to the court.")
-        print(statement)
-        
-        # Check for objections in the statement
-        self._handle_objection(statement, f"{side} during opening")
-        
-        # Switch sides or move to next phase
-        if self.current_presenting_side == "defense":
-            self._next_phase()  # Move to examination phase
-        else:
-            self._switch_presenting_side()
-    
-    def _run_examination(self):
-        # Check if we've examined all witnesses for this side
-        if self.current_witness_index >= len(self.witnesses):
-            self._next_phase()
-            return
-        
-        witness = self.witnesses[self.current_witness_index]
-        lawyer = self._get_current_lawyer()
-        opposing_lawyer = self.defense if lawyer == self.prosecution or lawyer == self.plaintiff else self.prosecution if self.case_type == "criminal" else self.plaintiff
-        
-        # Direct examination
-        print(f"\n🔍 {lawyer.__class__.__name__} examining {witness.name}:")
-        question = lawyer.respond(f"Ask {witness.name} a relevant question.")
-        print(f"Q: {question}")
-        
-        # Check for objection from opposing counsel
-        objection = opposing_lawyer.respond(
-            f"The {lawyer.__class__.__name__} asked: '{question}'\n"
-            "Should you object? If so, state 'Objection' and the reason. Otherwise say 'No objection'."
-        )
-        
-        if "no objection" not in objection.lower():
-            obj_raised, _ = self._handle_objection(objection, opposing_lawyer.__class__.__name__)
-            if obj_raised:
-                return  # Stop here to process objection next step
-        
-        # If no objection or it was overruled, witness answers
-        answer = witness.respond(question)
-        print(f"A: {answer}")
-        
-        # Check if lawyer is done with this witness
-        if self._check_end_condition(question):
-            self.current_witness_index += 1
-    
-    def _run_closing_arguments(self):
-        lawyer = self._get_current_lawyer()
-        side = "Prosecution" if self.case_type == "criminal" else "Plaintiff" if self.current_presenting_side == "plaintiff" else "Defense"
-        
-        print(f"\n🖚 {side} Closing Argument:")
-        statement = lawyer.respond("Present your closing argument to the court.")
-        print(statement)
-        
-        # Check for objections
-        self._handle_objection(statement, f"{side} during closing")
-        
-        # Switch sides or move to verdict
-        if self.current_presenting_side == "defense":
-            self._next_phase()  # Move to verdict
-        else:
-            self._switch_presenting_side()
-    
-    def _run_verdict(self):
-        print("\n⚖️ Judge deliberating...")
-        verdict = self.judge.respond(
-            "Based on all evidence and arguments presented, "
-            "please deliver your verdict. Explain your reasoning "
-            "and conclude with 'I find the defendant [guilty/not guilty]' "
-            "or '[liable/not liable]' as appropriate."
-        )
-        print("🧑‍⚖️ Judge's Verdict:", verdict)
-        self.ended = True
+import asyncio
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Union, Tuple
+from .agents.base_agent import BaseAgent
+from .agents.judge import JudgeAgent
+from .agents.lawyer import DefenseAgent, ProsecutionAgent
+from .agents.defendant import DefendantAgent
+from .agents.witness import WitnessAgent
+from .agents.plaintiff import PlaintiffAgent
+from .agents.transcript import Transcript
+from .budget import TrialBudget
+from .case_rules import CASE_VERDICT_LABELS, VERDICT_LABELS, classify_case_type, parse_verdict
+from .protocol import (ANSWERS_SCHEMA, MAX_QUESTIONS_PER_CALL, OBJECTIONS_SCHEMA, QUESTIONS_SCHEMA, RULINGS_SCHEMA,
+                      answers_prompt, objections_prompt, parse_decision, questions_prompt, render_objections,
+                      render_questions, render_rulings, retry_prompt, rulings_prompt)
+
+CASE_TYPE_QUESTION = "Is this a criminal or civil case? Just reply 'civil' or 'criminal'."
+VERDICT_LABEL_QUESTION = "State your finding using exactly one of: {labels}."
+# Below this the header rules are unsure and the judge is asked instead
+CASE_TYPE_CONFIDENCE = 0.6
+
+
+def _parse_case_type(response: str) -> str:
+    return "civil" if "civil" in response.strip().lower() else "criminal"
+
+
+# Validators for cheap-tier procedural answers; a reply that fails is escalated
+def _states_case_type(reply: str) -> bool:
+    reply = reply.lower()
+    return ("civil" in reply) != ("criminal" in reply)
+
+
+def _states_objection(reply: str) -> bool:
+    return "objection" in reply.lower()
+
+
+def _states_ruling(reply: str) -> bool:
+    reply = reply.lower()
+    return ("sustained" in reply) != ("overruled" in reply)
+
+
+def _is_overruled(ruling: str) -> bool:
+    ruling = ruling.lower()
+    return "overruled" in ruling and "sustained" not in ruling
+
+
+def _raises_objection(reply: str) -> bool:
+    reply = reply.lower()
+    return "objection" in reply and "no objection" not in reply
+
+
+def _local_case_type(case_text: Optional[str]) -> Optional[str]:
+    if not case_text:
+        return None
+    label, confidence = classify_case_type(case_text)
+    return label if confidence >= CASE_TYPE_CONFIDENCE else None
+
+
+# Trial progress restored by `load_state_dict` (and by a step's rollback)
+_PROGRESS_KEYS = ("ended", "current_phase", "current_phase_index", "current_witness_index",
+                  "current_presenting_side", "steps_completed", "verdict", "verdict_label",
+                  "speculative_answer", "speculation_stats")
+
+
+def _span(agent, phase: str):
+    """Trace a trial phase when the agents have a tracer installed."""
+    return agent.tracer.span(phase) if agent.tracer else nullcontext()
+
+
+async def _pooled(coro):
+    # The calls of one synchronous step share a connection pool, as `TrialScheduler.arun`'s do
+    async with BaseAgent.backend.http_pool():
+        return await coro
+
+
+def _run_sync(coro):
+    """Drive a coroutine from synchronous code, even if an event loop is already running."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_pooled(coro))
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, _pooled(coro)).result()
+
+
+class TrialManager:
+    def __init__(self, judge: JudgeAgent, defense: DefenseAgent, prosecution: ProsecutionAgent,
+                 defendant: DefendantAgent, witnesses: list[WitnessAgent],
+                 case_type: Optional[str] = None, case_text: Optional[str] = None,
+                 speculative: bool = False, budget: Optional[TrialBudget] = None, compact: bool = False):
+        self.judge = judge
+        self.defense = defense
+        self.prosecution = prosecution
+        self.defendant = defendant
+        self.witnesses = witnesses
+        self.ended = False
+        self.current_phase = "not_started"  # opening, examination, closing, ended
+        self.current_witness_index = -1
+        
+        self.case_type = case_type or _local_case_type(case_text) or self._determine_case_type()
+        self.plaintiff = PlaintiffAgent() if self.case_type == "civil" else None
+        if self.plaintiff:
+            self.plaintiff.case_context = judge.case_context
+
+        # One chronological record of the trial; every agent's history is a view into it
+        self.transcript = Transcript()
+        self.transcript.phase = self.current_phase
+        for agent in self._agents_by_role().values():
+            self.transcript.attach(agent)
+        
+        # Track which side is currently presenting
+        self.current_presenting_side = None  # prosecution/plaintiff or defense
+        
+        # Track objections
+        self.pending_objection = None
+
+        self.steps_completed = 0
+        self.verdict = None
+        self.verdict_label = None
+
+        # Speculative witness answers: requested alongside the objection check and kept
+        # only if there is no objection or it is overruled
+        self.speculative = speculative
+        self.speculative_answer = None
+        self.speculation_stats = {"attempts": 0, "hits": 0, "wasted_calls": 0, "wasted_tokens": 0}
+
+        # Compact protocol: several decisions per call as JSON (see `_arun_compact_examination`),
+        # and both sides' opening and closing statements in one step. Speculation does not
+        # apply to compact examinations: objections are ruled on in the same step
+        self.compact = compact
+
+        # Provider calls made in each phase's steps, failed steps included
+        self.phase_calls = {}
+
+        # Bounds on questions, objections and spend; every limit hit is logged in budget.events
+        self.budget = budget or TrialBudget()
+
+        # Optional live listener for step events (see `_emit`), e.g. a UI rendering tokens
+        self.on_event: Optional[Callable[[dict], None]] = None
+        self._turns = 0
+        
+        # Phases in order
+        self.phases = [
+            "opening_statements",
+            "prosecution_case",
+            "defense_case",
+            "closing_arguments",
+            "verdict"
+        ]
+        self.current_phase_index = -1
+
+    @classmethod
+    async def acreate(cls, judge: JudgeAgent, defense: DefenseAgent, prosecution: ProsecutionAgent,
+                      defendant: DefendantAgent, witnesses: list[WitnessAgent],
+                      case_text: Optional[str] = None, **options) -> "TrialManager":
+        """Async constructor: asks the judge for the case type (only if the header rules
+        cannot decide) without blocking the event loop."""
+        case_type = _local_case_type(case_text)
+        if not case_type:
+            with _span(judge, "case_type"):
+                case_type = _parse_case_type(await judge.arespond(
+                    CASE_TYPE_QUESTION, kind="case_type", validate=_states_case_type))
+        return cls(judge, defense, prosecution, defendant, witnesses, case_type=case_type, **options)
+        
+    def add_witness(self, witness: WitnessAgent):
+        witness.case_context = witness.case_context or self.judge.case_context
+        self.witnesses.append(witness)
+        self.transcript.attach(witness)
+
+    def _determine_case_type(self) -> str:
+        return _parse_case_type(self.judge.respond(
+            CASE_TYPE_QUESTION, kind="case_type", validate=_states_case_type))
+    
+    def token_usage(self) -> dict:
+        """Calls and tokens summed over every agent in this trial."""
+        totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cache_hits": 0}
+        for agent in self._agents_by_role().values():
+            for key in totals:
+                totals[key] += agent.usage[key]
+        return totals
+
+    def tier_usage(self) -> dict:
+        """Provider calls, latency and tokens per model tier for this trial."""
+        tiers = {}
+        for agent in self._agents_by_role().values():
+            for call in agent.calls:
+                if call.get("cached"):
+                    continue
+                stats = tiers.setdefault(call.get("tier", "default"), {
+                    "calls": 0, "latency_s": 0.0, "prompt_tokens": 0, "completion_tokens": 0})
+                stats["calls"] += 1
+                stats["latency_s"] += call.get("latency_s", 0.0)
+                stats["prompt_tokens"] += call["prompt_tokens"]
+                stats["completion_tokens"] += call["completion_tokens"]
+        return tiers
+
+    def prefix_reuse(self) -> dict:
+        """Shared-prefix ratio of each agent's prompts across this trial, plus the total."""
+        report = {agent.name: agent.prefix_reuse() for agent in self._agents_by_role().values()}
+        estimated = sum(r["prompt_tokens"] for r in report.values())
+        shared = sum(r["shared_prefix_tokens"] for r in report.values())
+        report["total"] = {"calls": sum(r["calls"] for r in report.values()), "prompt_tokens": estimated,
+                           "shared_prefix_tokens": shared, "ratio": shared / estimated if estimated else 0.0}
+        return report
+
+    def _agents_by_role(self) -> dict:
+        agents = {
+            "judge": self.judge,
+            "defense": self.defense,
+            "prosecution": self.prosecution,
+            "defendant": self.defendant,
+        }
+        agents.update({f"witness_{i}": witness for i, witness in enumerate(self.witnesses)})
+        if self.plaintiff:
+            agents["plaintiff"] = self.plaintiff
+        return agents
+
+    def state_dict(self) -> dict:
+        """Everything needed to resume this trial after its last completed step."""
+        return {
+            "case_type": self.case_type,
+            "ended": self.ended,
+            "current_phase": self.current_phase,
+            "current_phase_index": self.current_phase_index,
+            "current_witness_index": self.current_witness_index,
+            "current_presenting_side": self.current_presenting_side,
+            "pending_objection": self.pending_objection,
+            "steps_completed": self.steps_completed,
+            "verdict": self.verdict,
+            "verdict_label": self.verdict_label,
+            "speculative_answer": self.speculative_answer,
+            "speculation_stats": self.speculation_stats,
+            "phase_calls": self.phase_calls,
+            "budget": self.budget.state_dict(),
+            "transcript": self.transcript.state_dict(),
+            # Histories live once, in the transcript
+            "agents": {role: {key: value for key, value in agent.state_dict().items() if key != "history"}
+                       for role, agent in self._agents_by_role().items()},
+        }
+
+    def load_state_dict(self, state: dict):
+        """Restore a checkpoint; build the trial with the same witnesses and `case_type=state["case_type"]`."""
+        for key in _PROGRESS_KEYS:
+            setattr(self, key, state[key])
+        self.pending_objection = tuple(state["pending_objection"]) if state["pending_objection"] else None
+        self.phase_calls = dict(state.get("phase_calls", {}))
+        if "budget" in state:
+            self.budget.load_state_dict(state["budget"])
+        agents = self._agents_by_role()
+        for role, agent_state in state["agents"].items():
+            agents[role].load_state_dict(agent_state)
+        if "transcript" in state:
+            self.transcript.load_state_dict(state["transcript"])
+        else:
+            # Older checkpoints kept a history per agent; rebuild the shared record from them
+            self.transcript = Transcript()
+            for agent in agents.values():
+                self.transcript.attach(agent)
+        self.transcript.phase = self.current_phase
+
+    def _snapshot(self) -> dict:
+        """What a step may change, cheaply: the transcript is append-only, so its length will do."""
+        progress = {key: getattr(self, key) for key in _PROGRESS_KEYS}
+        progress["speculation_stats"] = dict(self.speculation_stats)  # the only one updated in place
+        return {
+            "progress": progress,
+            "pending_objection": self.pending_objection,
+            "budget": self.budget.state_dict(),
+            "memory": {role: agent.memory.state_dict() for role, agent in self._agents_by_role().items()},
+            "events": len(self.transcript.events),
+        }
+
+    def _rollback(self, snapshot: dict):
+        # Usage is left alone: calls made during the failed step were still spent
+        for key, value in snapshot["progress"].items():
+            setattr(self, key, value)
+        self.pending_objection = snapshot["pending_objection"]
+        self.budget.load_state_dict(snapshot["budget"])
+        for role, agent in self._agents_by_role().items():
+            agent.memory.load_state_dict(snapshot["memory"][role])
+        self.transcript.truncate(snapshot["events"])
+        self.transcript.phase = self.current_phase
+        self._emit("rollback", step=self.steps_completed)
+
+    def _next_phase(self):
+        self.current_phase_index += 1
+        if self.current_phase_index >= len(self.phases):
+            self.ended = True
+            return
+        
+        self.current_phase = self.phases[self.current_phase_index]
+        self.transcript.phase = self.current_phase
+        self._emit("phase")
+        
+        if self.current_phase == "opening_statements":
+            self.current_presenting_side = "prosecution" if self.case_type == "criminal" else "plaintiff"
+        elif self.current_phase == "prosecution_case":
+            self.current_presenting_side = "prosecution" if self.case_type == "criminal" else "plaintiff"
+            self.current_witness_index = 0
+        elif self.current_phase == "defense_case":
+            self.current_presenting_side = "defense"
+            self.current_witness_index = 0
+        elif self.current_phase == "closing_arguments":
+            self.current_presenting_side = "prosecution" if self.case_type == "criminal" else "plaintiff"
+    
+    def _get_current_lawyer(self) -> Union[ProsecutionAgent, DefenseAgent, PlaintiffAgent]:
+        if self.current_presenting_side == "defense":
+            return self.defense
+        elif self.current_presenting_side == "prosecution":
+            return self.prosecution
+        elif self.current_presenting_side == "plaintiff":
+            return self.plaintiff
+        return None
+    
+    def _skip_to_verdict(self, reason: str):
+        """Out of budget: drop whatever is in flight and let the judge rule on the record so far."""
+        self.budget.record(self.steps_completed, self.current_phase, reason)
+        self.pending_objection = None
+        if self.speculative_answer:
+            self._discard_speculation()
+        self.current_phase_index = self.phases.index("verdict")
+        self.current_phase = "verdict"
+        self.transcript.phase = self.current_phase
+
+    def _switch_presenting_side(self):
+        if self.current_presenting_side == "defense":
+            self.current_presenting_side = "prosecution" if self.case_type == "criminal" else "plaintiff"
+        else:
+            self.current_presenting_side = "defense"
+    
+    def _handle_objection(self, message: str, by_agent_name: str) -> Tuple[bool, str]:
+        """Returns (was_there_objection, ruling)"""
+        if "objection" in message.lower():
+            if not self.budget.allow_objection(self.current_phase):
+                self.budget.record(self.steps_completed, self.current_phase, "max_objections", by_agent_name)
+                return False, None
+            self.pending_objection = (message, by_agent_name)
+            return True, None
+        return False, None
+    
+    async def _aprocess_objection(self) -> str:
+        if not self.pending_objection:
+            return None
+            
+        message, by_agent_name = self.pending_objection
+        self.pending_objection = None
+        
+        ruling = await self._rule_on(message, by_agent_name)
+        print(f"👨‍⚖️ Judge rules on objection: {ruling}")
+        self._resolve_speculation(ruling)
+        return ruling
+
+    def _rule_on(self, message: str, by_agent_name: str):
+        return self._say(
+            self.judge,
+            f"{by_agent_name} raised an objection: {message}\n"
+            "Please rule with 'sustained' or 'overruled' and briefly explain.",
+            kind="objection_ruling", validate=_states_ruling
+        )
+
+    def _check_objection(self, lawyer, opposing_lawyer, question: str):
+        return self._say(
+            opposing_lawyer,
+            f"The {lawyer.__class__.__name__} asked: '{question}'\n"
+            "Should you object? If so, state 'Objection' and the reason. Otherwise say 'No objection'.",
+            kind="objection_check", validate=_states_objection
+        )
+
+    async def _aspeculate_answer(self, witness, question: str) -> Tuple[str, int, int]:
+        """Ask the witness without committing the exchange; returns (answer, tokens spent, turn)."""
+        before = witness.usage["prompt_tokens"] + witness.usage["completion_tokens"]
+        turn = self._next_turn()
+        answer = await self._say(witness, question, turn=turn, commit=False, kind="answer")
+        return answer, witness.usage["prompt_tokens"] + witness.usage["completion_tokens"] - before, turn
+
+    def _discard_speculation(self):
+        speculation = self.speculative_answer
+        self.speculative_answer = None
+        self.speculation_stats["wasted_calls"] += 1
+        self.speculation_stats["wasted_tokens"] += speculation["tokens"]
+        self._emit("retract", turn=speculation.get("turn"))
+
+    def _commit_answer(self, witness, question: str, answer: str):
+        witness.commit(question, answer, kind="answer")
+        print(f"A: {answer}")
+        # Check if lawyer is done with this witness
+        if self._check_end_condition(question):
+            self.current_witness_index += 1
+
+    def _resolve_speculation(self, ruling: str):
+        if not self.speculative_answer:
+            return
+        if _is_overruled(ruling):
+            speculation = self.speculative_answer
+            self.speculative_answer = None
+            self.speculation_stats["hits"] += 1
+            witness = self.witnesses[speculation["witness_index"]]
+            self._commit_answer(witness, speculation["question"], speculation["answer"])
+        else:
+            self._discard_speculation()
+
+    def speculation_report(self) -> dict:
+        stats = dict(self.speculation_stats)
+        stats["hit_rate"] = stats["hits"] / stats["attempts"] if stats["attempts"] else 0.0
+        return stats
+    
+    def _check_end_condition(self, statement: str) -> bool:
+        endings = [
+            "no further questions", 
+            "rest my case", 
+            "nothing further",
+            "conclude my presentation"
+        ]
+        statement_lower = statement.lower()
+        return any(phrase in statement_lower for phrase in endings)
+    
+    # === Live events ===
+    def _emit(self, event: str, **fields):
+        """Events: phase, turn_start, token, turn_end, retract (a discarded speculative
+        answer), verdict and step_end; each carries the current phase."""
+        if self.on_event:
+            self.on_event({"event": event, "phase": self.current_phase, **fields})
+
+    def _next_turn(self) -> int:
+        self._turns += 1
+        return self._turns
+
+    async def _say(self, agent, prompt: str, turn: Optional[int] = None, **kwargs) -> str:
+        """`agent.arespond`, streaming the reply to `on_event` when a listener is set."""
+        if not self.on_event:
+            return await agent.arespond(prompt, **kwargs)
+        turn = turn or self._next_turn()
+        self._emit("turn_start", turn=turn, speaker=agent.name, kind=kwargs.get("kind", "turn"))
+        reply = await agent.arespond(prompt, on_token=lambda text: self._emit("token", turn=turn, text=text),
+                                     **kwargs)
+        self._emit("turn_end", turn=turn, speaker=agent.name, text=reply)
+        return reply
+
+    async def _adecide(self, agent, prompt: str, schema: dict, render: Callable[[dict], str], kind: str,
+                       check: Optional[Callable[[dict], bool]] = None, commit: bool = True,
+                       retries: int = 0) -> Tuple[Optional[dict], str]:
+        """One compact-protocol call: (decision, raw reply). The decision is None when the
+        reply does not match `schema` and `check`, even after escalation and `retries` more
+        attempts on the same tier; a valid one is committed (with `commit`) and shown in its
+        readable `render`ed form."""
+        def parse(reply: str) -> Optional[dict]:
+            decision = parse_decision(reply, schema)
+            return decision if decision is not None and (check is None or check(decision)) else None
+
+        turn = self._next_turn()
+        self._emit("turn_start", turn=turn, speaker=agent.name, kind=kind)
+        # Not streamed: partial JSON is no use to a listener
+        reply = await agent.arespond(prompt, commit=False, kind=kind, validate=lambda r: parse(r) is not None)
+        decision = parse(reply)
+        for _ in range(retries):
+            if decision is not None:
+                break
+            reply = await agent.arespond(retry_prompt(prompt), commit=False, kind=kind,
+                                         validate=lambda r: parse(r) is not None)
+            decision = parse(reply)
+        text = render(decision) if decision is not None else reply
+        self._emit("turn_end", turn=turn, speaker=agent.name, text=text)
+        if decision is not None and commit:
+            agent.commit(prompt, text, kind=kind)
+        return decision, reply
+
+    def run_next_step(self):
+        _run_sync(self.arun_next_step())
+
+    def run_to_completion(self):
+        _run_sync(self.arun_to_completion())
+
+    async def arun_to_completion(self):
+        while not self.ended:
+            await self.arun_next_step()
+
+    async def arun_next_step(self):
+        # All or nothing: if a provider call still fails after its retries, the trial goes
+        # back to where the step began and the error propagates; no half-done step is kept
+        snapshot = self._snapshot()
+        phase, calls = self.current_phase, self.token_usage()["calls"]
+        try:
+            await self._astep()
+        except BaseException:
+            self._rollback(snapshot)
+            raise
+        finally:
+            spent = self.token_usage()["calls"] - calls
+            if spent:
+                self.phase_calls[phase] = self.phase_calls.get(phase, 0) + spent
+        self.steps_completed += 1
+        self._emit("step_end", step=self.steps_completed, ended=self.ended)
+
+    async def _astep(self):
+        if self.ended:
+            print("⚖️ Trial has concluded.")
+            return
+
+        # The verdict is always delivered, even past the budget
+        if self.current_phase != "verdict":
+            reason = self.budget.exhausted(self.token_usage())
+            if reason:
+                self._skip_to_verdict(reason)
+                return
+        
+        # Handle any pending objections first
+        if self.pending_objection:
+            with _span(self.judge, "objection"):
+                await self._aprocess_objection()
+            return
+        
+        # Move to next phase if needed
+        if self.current_phase_index == -1 or self.current_phase == "ended":
+            self._next_phase()
+            return
+        
+        # Execute current phase
+        with _span(self.judge, self.current_phase):
+            if self.current_phase == "opening_statements":
+                await self._arun_opening_statements()
+            elif self.current_phase in ["prosecution_case", "defense_case"]:
+                await self._arun_examination()
+            elif self.current_phase == "closing_arguments":
+                await self._arun_closing_arguments()
+            elif self.current_phase == "verdict":
+                await self._arun_verdict()
+    
+    async def _arun_opening_statements(self):
+        if self.compact:
+            await self._arun_both_statements("Present your opening statement to the court.", "opening")
+            return
+        lawyer = self._get_current_lawyer()
+        side = "Prosecution" if self.case_type == "criminal" else "Plaintiff" if self.current_presenting_side == "plaintiff" else "Defense"
+        
+        print(f"\n📢 {side} Opening Statement:")
+        statement = await self._say(lawyer, "Present your opening statement to the court.", kind="opening")
+        print(statement)
+        
+        # Check for objections in the statement
+        self._handle_objection(statement, f"{side} during opening")
+        
+        # Switch sides or move to next phase
+        if self.current_presenting_side == "defense":
+            self._next_phase()  # Move to examination phase
+        else:
+            self._switch_presenting_side()
+    
+    async def _arun_both_statements(self, prompt: str, kind: str):
+        """Compact protocol: both sides' statements in one step, requested together. Neither
+        side hears the other's statement either way; they enter the record in order."""
+        first = self.prosecution if self.case_type == "criminal" else self.plaintiff
+        sides = [("Prosecution" if self.case_type == "criminal" else "Plaintiff", first), ("Defense", self.defense)]
+        statements = await asyncio.gather(*(self._say(lawyer, prompt, commit=False, kind=kind) for _, lawyer in sides))
+        for (side, lawyer), statement in zip(sides, statements):
+            lawyer.commit(prompt, statement, kind=kind)
+            print(f"\n📢 {side} {'Opening Statement' if kind == 'opening' else 'Closing Argument'}:\n{statement}")
+            if not self.pending_objection:
+                self._handle_objection(statement, f"{side} during {kind}")
+        self._next_phase()
+
+    def _examination_target(self) -> Optional[Tuple[WitnessAgent, str]]:
+        """(witness under examination, its budget key); None when the step moved on instead."""
+        # Check if we've examined all witnesses for this side
+        if self.current_witness_index >= len(self.witnesses):
+            self._next_phase()
+            return None
+
+        witness = self.witnesses[self.current_witness_index]
+        budget_key = f"{self.current_phase}/{self.current_witness_index}"
+        if self.budget.questions_exhausted(budget_key):
+            self.budget.record(self.steps_completed, self.current_phase, "max_questions", witness.name)
+            self.current_witness_index += 1
+            return None
+        return witness, budget_key
+
+    def _opposing_lawyer(self, lawyer):
+        return self.defense if lawyer == self.prosecution or lawyer == self.plaintiff else self.prosecution if self.case_type == "criminal" else self.plaintiff
+
+    async def _arun_examination(self):
+        if self.compact:
+            await self._arun_compact_examination()
+            return
+        target = self._examination_target()
+        if not target:
+            return
+        witness, budget_key = target
+        lawyer = self._get_current_lawyer()
+        opposing_lawyer = self._opposing_lawyer(lawyer)
+        
+        # Direct examination
+        print(f"\n🔍 {lawyer.__class__.__name__} examining {witness.name}:")
+        question = await self._say(lawyer, f"Ask {witness.name} a relevant question.", kind="question")
+        print(f"Q: {question}")
+        if self.budget.add_question(budget_key, question):
+            # The lawyer keeps asking the same thing: the examination has converged
+            self.budget.record(self.steps_completed, self.current_phase, "converged", witness.name)
+            self.current_witness_index += 1
+            return
+        
+        # Check for objection from opposing counsel
+        objection_check = self._check_objection(lawyer, opposing_lawyer, question)
+        if self.speculative:
+            # Request the answer at the same time; it is only committed if the question stands
+            self.speculation_stats["attempts"] += 1
+            objection, (answer, tokens, turn) = await asyncio.gather(
+                objection_check, self._aspeculate_answer(witness, question))
+        else:
+            objection = await objection_check
+        
+        if "no objection" not in objection.lower():
+            obj_raised, _ = self._handle_objection(objection, opposing_lawyer.__class__.__name__)
+            if obj_raised:
+                if self.speculative:
+                    self.speculative_answer = {"witness_index": self.current_witness_index,
+                                               "question": question, "answer": answer, "tokens": tokens,
+                                               "turn": turn}
+                return  # Stop here to process objection next step
+        
+        # If no objection or it was overruled, witness answers
+        if self.speculative:
+            self.speculation_stats["hits"] += 1
+        else:
+            answer = await self._say(witness, question, commit=False, kind="answer")
+        self._commit_answer(witness, question, answer)
+
+    async def _arun_compact_examination(self):
+        """A round of questions in four calls at most, whatever its length: the lawyer puts
+        up to MAX_QUESTIONS_PER_CALL questions and says whether they are the last, opposing
+        counsel objects to any of them, the judge rules on those objections, and the
+        witness answers the questions that stand. Each reply is JSON checked against its
+        schema; one that does not conform falls back to the free-text calls it replaces."""
+        target = self._examination_target()
+        if not target:
+            return
+        witness, budget_key = target
+        lawyer = self._get_current_lawyer()
+        left = self.budget.questions_left(budget_key)
+        limit = MAX_QUESTIONS_PER_CALL if left is None else min(MAX_QUESTIONS_PER_CALL, left)
+
+        print(f"\n🔍 {lawyer.__class__.__name__} examining {witness.name}:")
+        prompt = questions_prompt(witness.name, limit)
+        # The question list runs on the lawyer's own model; a malformed one gets a second try there
+        decision, _ = await self._adecide(lawyer, prompt, QUESTIONS_SCHEMA, render_questions, kind="questions",
+                                          retries=1)
+        if decision is None:
+            # The raw reply may be anything (half a JSON object, several questions at once):
+            # ask for a single question in free text, as the plain protocol does
+            question = await self._say(lawyer, f"Ask {witness.name} a relevant question.", kind="question")
+            decision = {"questions": [question], "done": self._check_end_condition(question)}
+
+        questions, done = [], decision["done"] or not decision["questions"]
+        for question in decision["questions"][:limit]:
+            print(f"Q: {question}")
+            if self.budget.add_question(budget_key, question):
+                self.budget.record(self.steps_completed, self.current_phase, "converged", witness.name)
+                done = True
+                break
+            questions.append(question)
+
+        standing = await self._areview_questions(lawyer, witness, questions)
+        await self._aanswer_questions(witness, standing)
+        if done:
+            self.current_witness_index += 1
+
+    async def _areview_questions(self, lawyer, witness, questions: list[str]) -> list[str]:
+        """The questions left once opposing counsel has objected and the judge has ruled."""
+        if not questions:
+            return []
+        opposing_lawyer = self._opposing_lawyer(lawyer)
+        by = opposing_lawyer.__class__.__name__
+        decision, _ = await self._adecide(
+            opposing_lawyer, objections_prompt(lawyer.__class__.__name__, witness.name, questions),
+            OBJECTIONS_SCHEMA, render_objections, kind="objection_review",
+            check=lambda d: all(o["question"] <= len(questions) for o in d["objections"]))
+        if decision is not None:
+            raised = {o["question"]: o["grounds"] for o in decision["objections"]}
+        else:
+            # One after another: each call folds and commits to the same memory, so concurrent
+            # ones would summarize the same turns repeatedly and commit in completion order
+            checks = [await self._check_objection(lawyer, opposing_lawyer, q) for q in questions]
+            raised = {number: reply for number, reply in enumerate(checks, 1) if _raises_objection(reply)}
+
+        objections = {}
+        for number, grounds in sorted(raised.items()):
+            if not self.budget.allow_objection(self.current_phase):
+                self.budget.record(self.steps_completed, self.current_phase, "max_objections", by)
+                break
+            objections[number] = grounds
+        if not objections:
+            return questions
+
+        decision, _ = await self._adecide(
+            self.judge, rulings_prompt(by, [(n, questions[n - 1], grounds) for n, grounds in objections.items()]),
+            RULINGS_SCHEMA, render_rulings, kind="objection_rulings",
+            check=lambda d: {r["question"] for r in d["rulings"]} >= set(objections))
+        if decision is not None:
+            sustained = {r["question"] for r in decision["rulings"] if r["ruling"] == "sustained"}
+        else:
+            rulings = [await self._rule_on(grounds, by) for grounds in objections.values()]
+            sustained = {n for n, ruling in zip(objections, rulings) if not _is_overruled(ruling)}
+        print(f"👨‍⚖️ Judge sustains objections to questions {sorted(sustained)}" if sustained
+              else "👨‍⚖️ Judge overrules the objections")
+        return [q for number, q in enumerate(questions, 1) if number not in sustained]
+
+    async def _aanswer_questions(self, witness, questions: list[str]):
+        """Answer and record each question, all in one reply when there are several."""
+        answers = None
+        if len(questions) > 1:
+            decision, _ = await self._adecide(
+                witness, answers_prompt(questions), ANSWERS_SCHEMA, lambda d: "\n".join(d["answers"]),
+                kind="answers", check=lambda d: len(d["answers"]) == len(questions), commit=False)
+            answers = decision and decision["answers"]
+        for i, question in enumerate(questions):
+            answer = answers[i] if answers else await self._say(witness, question, commit=False, kind="answer")
+            witness.commit(question, answer, kind="answer")
+            print(f"A: {answer}")
+    
+    async def _arun_closing_arguments(self):
+        if self.compact:
+            await self._arun_both_statements("Present your closing argument to the court.", "closing")
+            return
+        lawyer = self._get_current_lawyer()
+        side = "Prosecution" if self.case_type == "criminal" else "Plaintiff" if self.current_presenting_side == "plaintiff" else "Defense"
+        
+        print(f"\n🖚 {side} Closing Argument:")
+        statement = await self._say(lawyer, "Present your closing argument to the court.", kind="closing")
+        print(statement)
+        
+        # Check for objections
+        self._handle_objection(statement, f"{side} during closing")
+        
+        # Switch sides or move to verdict
+        if self.current_presenting_side == "defense":
+            self._next_phase()  # Move to verdict
+        else:
+            self._switch_presenting_side()
+    
+    async def _arun_verdict(self):
+        print("\n⚖️ Judge deliberating...")
+        labels = CASE_VERDICT_LABELS.get(self.case_type, VERDICT_LABELS)
+        verdict = await self._say(
+            self.judge,
+            "Based on all evidence and arguments presented, "
+            "please deliver your verdict. Explain your reasoning "
+            f"and conclude with 'I find the defendant [{'/'.join(labels)}]'.",
+            kind="verdict"
+        )
+        print("🧑‍⚖️ Judge's Verdict:", verdict)
+        self.verdict = verdict
+        self.verdict_label = parse_verdict(verdict, self.case_type)
+        if self.verdict_label is None:
+            # Only when the ruling states no finding open to this kind of case: one short follow-up
+            self.verdict_label = parse_verdict(await self._say(
+                self.judge, VERDICT_LABEL_QUESTION.format(labels=", ".join(labels)), kind="verdict_label",
+                validate=lambda r: parse_verdict(r, self.case_type) is not None, max_tokens=8), self.case_type)
+        self.ended = True
+        self._emit("verdict", label=self.verdict_label, text=verdict)
@@ -0,0 +1,36 @@
+import pytest
+
+from courtroom_simulator.agents.backends import FakeBackend
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.agents.memory import FullHistory
+
+# Shared settings every agent reads from BaseAgent; each test starts from the offline defaults
+_SHARED = ("backend", "rate_limiter", "retry_policy", "cache", "router", "tracer", "default_memory")
+
+
+@pytest.fixture(autouse=True)
+def offline_agents():
+    saved = {name: getattr(BaseAgent, name) for name in _SHARED}
+    BaseAgent.backend = FakeBackend(seed=0)
+    BaseAgent.rate_limiter = BaseAgent.cache = BaseAgent.router = BaseAgent.tracer = None
+    BaseAgent.default_memory = FullHistory()
+    yield
+    for name, value in saved.items():
+        setattr(BaseAgent, name, value)
+
+
+CASE_TEXTS = [
+    "CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. {n} of 1960. The accused was convicted of theft.",
+    "CIVIL APPELLATE JURISDICTION: Civil Appeal No. {n} of 1961. The tenant sued the landlord for damages.",
+]
+
+
+@pytest.fixture
+def run_in_tmp(tmp_path, monkeypatch):
+    """Work in an empty directory holding a six-case cases.csv; batch runs write submission.csv here."""
+    monkeypatch.chdir(tmp_path)
+    with open("cases.csv", "w", encoding="utf-8", newline="") as f:
+        f.write("id,text\n")
+        for n in range(1, 7):
+            f.write(f'{n},"{CASE_TEXTS[n % 2].format(n=n)}"\n')
+    return tmp_path
@@ -0,0 +1,50 @@
+import asyncio
+import contextlib
+import io
+
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.trial_factory import abuild_trial, build_trial
+
+CASE = "CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. 7 of 1960. The accused was convicted of theft."
+
+
+def test_respond_and_arespond_send_the_same_request():
+    sync, concurrent = BaseAgent("Judge", "You are a judge."), BaseAgent("Judge", "You are a judge.")
+    reply = sync.respond("Open the trial.")
+    assert asyncio.run(concurrent.arespond("Open the trial.")) == reply
+    assert sync.history[:] == concurrent.history[:]
+
+
+def test_uncommitted_reply_leaves_the_history_alone():
+    agent = BaseAgent("Judge", "You are a judge.")
+    reply = asyncio.run(agent.arespond("Open the trial.", commit=False))
+    assert len(agent.history) == 0
+    agent.commit("Open the trial.", reply)
+    assert agent.history[-1] == {"role": "assistant", "content": reply}
+
+
+def test_sync_and_async_trials_agree():
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync = build_trial(CASE)
+        sync.run_to_completion()
+
+        async def drive():
+            trial = await abuild_trial(CASE)
+            while not trial.ended:
+                await trial.arun_next_step()
+            return trial
+
+        concurrent = asyncio.run(drive())
+    assert concurrent.verdict_label == sync.verdict_label
+    assert list(concurrent.transcript.chronological()) == list(sync.transcript.chronological())
+
+
+def test_sync_step_inside_a_running_event_loop():
+    async def step_from_async_code():
+        trial = build_trial(CASE)
+        trial.run_next_step()  # e.g. a notebook or a UI callback with its own loop
+        return trial
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        trial = asyncio.run(step_from_async_code())
+    assert trial.steps_completed == 1
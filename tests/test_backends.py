@@ -0,0 +1,94 @@
+import asyncio
+import contextlib
+import io
+import json
+
+import pytest
+
+from courtroom_simulator.agents.backends import BackendError, FakeBackend, RateLimitError
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.agents.resilience import RetryPolicy
+from courtroom_simulator.batch_trialrunner import main
+from courtroom_simulator.scheduler import TrialScheduler
+from courtroom_simulator.trial_factory import abuild_trial
+
+REQUEST = {"model": "m", "messages": [{"role": "user", "content": "Open the trial."}], "max_tokens": 64}
+
+
+def reply(response: dict) -> str:
+    return response["choices"][0]["message"]["content"]
+
+
+def test_replies_depend_only_on_seed_and_request():
+    first, second = FakeBackend(seed=3), FakeBackend(seed=3)
+    assert reply(first.create(REQUEST)) == reply(second.create(REQUEST))
+    assert reply(first.create(REQUEST)) == reply(first.create(REQUEST))
+    assert reply(FakeBackend(seed=4).create(REQUEST)) != reply(first.create(REQUEST))
+    response = first.create(REQUEST)
+    assert response["usage"]["total_tokens"] == response["usage"]["prompt_tokens"] + response["usage"]["completion_tokens"]
+
+
+def test_script_entries_take_precedence_over_the_defaults():
+    backend = FakeBackend(script=[(r"Open the trial", "Court is in session."),
+                                  (r"Adjourn", lambda rng, request: request["model"])])
+    assert reply(backend.create(REQUEST)) == "Court is in session."
+    adjourn = dict(REQUEST, messages=[{"role": "user", "content": "Adjourn."}])
+    assert reply(backend.create(adjourn)) == "m"
+
+
+def test_injected_failures_do_not_change_the_replies_that_get_through():
+    clean = reply(FakeBackend().create(REQUEST))
+    flaky = FakeBackend(rate_limit_rate=0.3, server_error_rate=0.3, retry_after=1.5)
+    replies, rate_limited, server_errors = [], 0, 0
+    for _ in range(50):
+        try:
+            replies.append(reply(flaky.create(REQUEST)))
+        except RateLimitError as e:
+            assert e.retry_after == 1.5
+            rate_limited += 1
+        except BackendError as e:
+            assert e.status == 503
+            server_errors += 1
+    assert set(replies) == {clean}
+    assert (flaky.stats["rate_limited"], flaky.stats["server_errors"]) == (rate_limited, server_errors)
+    assert flaky.stats["requests"] == 50 and rate_limited and server_errors
+
+
+def test_acreate_matches_create():
+    backend = FakeBackend(latency=0.001, jitter=0.001)
+    assert reply(asyncio.run(backend.acreate(REQUEST))) == reply(backend.create(REQUEST))
+
+
+def verdicts(concurrency: int) -> dict:
+    jobs = [(n, lambda n=n: abuild_trial(f"CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. {n}. Theft."))
+            for n in range(4)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(TrialScheduler(max_concurrent_trials=concurrency).arun(jobs))
+    return {n: trial.verdict_label for n, trial in results.items()}
+
+
+def test_results_are_the_same_at_any_concurrency_and_failure_rate():
+    expected = verdicts(1)
+    BaseAgent.backend = FakeBackend(rate_limit_rate=0.1, server_error_rate=0.1, retry_after=0.0)
+    BaseAgent.retry_policy = RetryPolicy(max_retries=20, base_delay=0.0)
+    assert verdicts(4) == expected
+    assert BaseAgent.backend.stats["rate_limited"] and BaseAgent.backend.stats["server_errors"]
+
+
+def test_fake_batch_runs_unpaced(run_in_tmp):
+    with contextlib.redirect_stdout(io.StringIO()):
+        main(["--fake-llm", "--no-cache", "--data", "cases.csv", "--run-dir", "run", "--cases", "2"])
+    assert BaseAgent.rate_limiter is None
+    assert isinstance(BaseAgent.backend.backend, FakeBackend)
+    records = [json.loads(line) for line in (run_in_tmp / "run" / "journal.jsonl").read_text().splitlines()]
+    assert sorted(record["id"] for record in records) == ["1", "2"]
+
+
+def test_transports_without_connections_have_a_no_op_pool():
+    backend = FakeBackend()
+
+    async def pooled():
+        async with backend.http_pool(max_connections=4):
+            return await backend.acreate(REQUEST)
+
+    assert reply(asyncio.run(pooled())) == reply(backend.create(REQUEST))
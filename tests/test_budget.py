@@ -0,0 +1,72 @@
+import contextlib
+import io
+
+from courtroom_simulator.agents.backends import FakeBackend
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.budget import TrialBudget, similarity
+from courtroom_simulator.trial_factory import build_trial
+
+CASE = "CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. 7 of 1960. The accused was convicted of theft."
+
+
+def run_trial(budget: TrialBudget, script=()):
+    BaseAgent.backend = FakeBackend(script=list(script))
+    with contextlib.redirect_stdout(io.StringIO()):
+        trial = build_trial(CASE, budget=budget)
+        trial.run_to_completion()
+    return trial
+
+
+def reasons(trial) -> list[str]:
+    return [event["reason"] for event in trial.budget.events]
+
+
+def test_similarity_ignores_trivial_rewording():
+    assert similarity("Where were you that night?", "Where were you on that night?") >= 0.8
+    assert similarity("Where were you that night?", "Who owns the shop?") < 0.8
+    assert similarity("", "anything") == 0.0
+
+
+def test_repeated_questions_converge():
+    budget = TrialBudget(max_questions_per_witness=None, max_calls=None)
+    trial = run_trial(budget, [(r"Ask .* question", "Where were you that night?"),
+                               (r"Should you object", "No objection.")])
+    assert trial.ended and trial.verdict_label
+    assert "converged" in reasons(trial)
+    assert all(budget.duplicates[key] == budget.max_duplicate_questions for key in budget.duplicates)
+
+
+def test_question_limit_moves_on_to_the_next_witness():
+    budget = TrialBudget(max_questions_per_witness=1, max_calls=None)
+    trial = run_trial(budget)
+    assert trial.ended and trial.verdict_label
+    assert "max_questions" in reasons(trial)
+    assert all(len(asked) <= 1 for asked in budget.questions.values())
+
+
+def test_objections_past_the_limit_are_not_put_to_the_judge():
+    budget = TrialBudget(max_objections_per_phase=1, max_calls=None)
+    trial = run_trial(budget, [(r"Should you object", "Objection, leading the witness."),
+                               (r"raised an objection", "Sustained.")])
+    assert "max_objections" in reasons(trial)
+    assert all(count <= 1 for count in budget.objections.values())
+    rulings = [event for event in trial.transcript.chronological() if event["kind"] == "objection_ruling"]
+    assert len(rulings) == len(budget.objections)
+
+
+def test_call_limit_skips_to_the_verdict():
+    trial = run_trial(TrialBudget(max_calls=5))
+    assert reasons(trial)[-1] == "max_calls"
+    assert trial.ended and trial.verdict_label
+    phases = [event["phase"] for event in trial.transcript.chronological()]
+    assert "closing_arguments" not in phases and phases[-1] == "verdict"
+
+
+def test_state_round_trips():
+    budget = TrialBudget()
+    budget.add_question("prosecution_case/0", "Where were you?")
+    budget.allow_objection("prosecution_case")
+    budget.events.append({"step": 1, "phase": "prosecution_case", "reason": "converged", "detail": ""})
+    restored = TrialBudget()
+    restored.load_state_dict(budget.state_dict())
+    assert restored.state_dict() == budget.state_dict()
@@ -0,0 +1,38 @@
+from courtroom_simulator.case_context import BM25Index, CaseContext, chunk_text
+
+FILLER = " ".join(f"word{i}" for i in range(400))
+CASE = ("The appellant was charged with murder at Nagpur. " + FILLER
+        + " The knife was recovered from the well behind the house. " + FILLER)
+
+
+def test_chunks_overlap_and_cover_the_text():
+    words = [f"w{i}" for i in range(250)]
+    chunks = chunk_text(" ".join(words), chunk_words=100, overlap=20)
+    assert [c.split()[0] for c in chunks] == ["w0", "w80", "w160"]
+    assert chunks[-1].split()[-1] == "w249"
+
+
+def test_bm25_ranks_passages_with_the_query_terms():
+    index = BM25Index(["the knife in the well", "the weather at noon", "a knife and a gun"])
+    assert index.search("where was the knife found", k=2) == [0, 2]
+    assert index.search("unrelated words") == []
+
+
+def test_context_sends_the_brief_and_the_relevant_passages():
+    context = CaseContext(CASE, brief_words=20, chunk_words=60, overlap=10, top_k=1)
+    assert "charged with murder" in context.header
+    rendered = context.render("Where was the knife recovered?")
+    assert "knife was recovered" in rendered
+    assert context.savings()["saved_tokens"] > 0
+
+
+def test_generic_prompts_fall_back_to_the_first_passages():
+    context = CaseContext(CASE, brief_words=20, chunk_words=60, overlap=10, top_k=2)
+    assert context.relevant_passages("Present your opening statement.") == context.passages[:2]
+
+
+def test_short_or_full_text_cases_are_sent_whole():
+    short = CaseContext("A short judgment about a tenancy.")
+    assert short.passages == [] and short.render("tenancy") == ""
+    full = CaseContext(CASE, full_text=True)
+    assert full.header.endswith(CASE) and full.passages == []
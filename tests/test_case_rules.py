@@ -0,0 +1,43 @@
+import pytest
+
+from courtroom_simulator.case_rules import classify_case_type, parse_verdict
+
+
+@pytest.mark.parametrize("verdict, label", [
+    ("Having weighed the evidence, I find the defendant guilty.", "guilty"),
+    ("I find the defendant not guilty of all charges.", "not guilty"),
+    ("The accused is acquitted.", "not guilty"),
+    ("I do not find the defendant guilty.", "not guilty"),
+    ("I don't find the defendant liable.", "not liable"),
+    ("The defendant cannot be held liable.", "not liable"),
+    ("The prosecution did not prove its case, so the accused is acquitted.", "not guilty"),
+    ("The trial court was not persuaded. I find the defendant guilty.", "guilty"),
+    ("I find the defendant [guilty/not guilty]: guilty.", "guilty"),
+    ("The arguments were well presented.", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_verdict(verdict, label):
+    assert parse_verdict(verdict) == label
+
+
+@pytest.mark.parametrize("verdict, case_type, label", [
+    ("I find the defendant liable.", "civil", "liable"),
+    ("I find the defendant guilty.", "civil", None),
+    ("I find the defendant not liable.", "criminal", None),
+    ("I find the defendant not guilty.", "criminal", "not guilty"),
+])
+def test_parse_verdict_keeps_to_the_case_type(verdict, case_type, label):
+    assert parse_verdict(verdict, case_type) == label
+
+
+def test_classify_case_type_from_the_jurisdiction_line():
+    civil = "CIVIL APPELLATE JURISDICTION: Civil Appeal No. 12 of 1961. The tenant sued the landlord."
+    criminal = "CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. 3 of 1959. The accused was convicted."
+    assert classify_case_type(civil)[0] == "civil"
+    assert classify_case_type(criminal)[0] == "criminal"
+    assert classify_case_type(civil)[1] == 1.0
+
+
+def test_classify_case_type_unsure_without_signals():
+    assert classify_case_type("The parties were heard at length.") == (None, 0.0)
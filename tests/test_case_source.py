@@ -0,0 +1,48 @@
+import pytest
+
+from courtroom_simulator.case_source import CaseSource
+
+ROWS = [
+    ("1", 'A judgment over\nseveral lines, with "quoted" words\nand a comma, too.'),
+    ("2", "One line."),
+    ("3", 'Ends in a quote: ""\n'),
+]
+
+
+def write_cases(tmp_path):
+    path = tmp_path / "cases.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("id,text\n")
+        for case_id, text in ROWS:
+            f.write(f'{case_id},"{text.replace(chr(34), chr(34) * 2)}"\n')
+    return str(path)
+
+
+def test_records_span_lines_inside_quotes(tmp_path):
+    source = CaseSource(write_cases(tmp_path))
+    assert [(case["id"], case["text"]) for case in source] == ROWS
+
+
+def test_lookup_by_id_and_position(tmp_path):
+    source = CaseSource(write_cases(tmp_path))
+    assert len(source) == 3
+    assert source.ids() == ["1", "2", "3"]
+    assert source.get(3)["text"] == ROWS[2][1]
+    assert source.at(1)["text"] == "One line."
+    assert [case["id"] for case in source.iter_cases(offset=1, limit=1)] == ["2"]
+
+
+def test_index_is_rebuilt_when_the_csv_changes(tmp_path):
+    path = write_cases(tmp_path)
+    assert len(CaseSource(path)) == 3
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('4,"Added later."\n')
+    assert CaseSource(path).get("4")["text"] == "Added later."
+
+
+def test_streams_from_a_case_id_and_rejects_unknown_ids(tmp_path):
+    source = CaseSource(write_cases(tmp_path))
+    assert [case["id"] for case in source.iter_cases(start_id="2")] == ["2", "3"]
+    assert list(source.iter_cases(offset=5)) == []
+    with pytest.raises(KeyError):
+        source.get("99")
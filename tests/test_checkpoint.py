@@ -0,0 +1,85 @@
+import contextlib
+import csv
+import io
+import json
+import os
+
+import pytest
+
+from courtroom_simulator.batch_trialrunner import main
+from courtroom_simulator.journal import CheckpointStore, ResultsJournal
+from courtroom_simulator.trial_factory import build_trial, restore_trial, witness_specs
+
+CASE = ("CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. 7 of 1960. The accused was convicted "
+        "of theft by the Sessions Judge. The prosecution relied on one witness who saw him at the shop.")
+
+
+def run_quietly(step):
+    with contextlib.redirect_stdout(io.StringIO()):  # trials narrate every turn
+        step()
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_resumed_trial_matches_an_uninterrupted_one(compact):
+    uninterrupted = build_trial(CASE, compact=compact)
+    run_quietly(uninterrupted.run_to_completion)
+
+    trial = build_trial(CASE, compact=compact)
+    for _ in range(4):
+        run_quietly(trial.run_next_step)
+    # Checkpoints are stored as JSON
+    checkpoint = json.loads(json.dumps(trial.state_dict()))
+    resumed = restore_trial(CASE, checkpoint, witnesses=witness_specs(trial), compact=compact)
+    run_quietly(resumed.run_to_completion)
+
+    assert resumed.ended
+    assert resumed.verdict_label == uninterrupted.verdict_label
+    assert list(resumed.transcript.chronological()) == list(uninterrupted.transcript.chronological())
+
+
+def test_journal_keeps_the_latest_record_and_skips_a_torn_line(tmp_path):
+    path = str(tmp_path / "run" / "journal.jsonl")
+    journal = ResultsJournal(path)
+    journal.append({"id": "1", "label": "guilty"})
+    journal.append({"id": "2", "label": "liable"})
+    journal.append({"id": "1", "label": "not guilty"})
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "3", "lab')  # the process died mid-write
+    assert ResultsJournal(path).records() == {"1": {"id": "1", "label": "not guilty"},
+                                              "2": {"id": "2", "label": "liable"}}
+    assert ResultsJournal(path, resume=False).completed_ids() == set()
+
+
+def test_checkpoint_store_round_trip(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    assert store.load("7") is None
+    store.save("7", {"steps_completed": 3})
+    assert store.load("7") == {"steps_completed": 3}
+    store.discard("7")
+    store.discard("7")
+    assert store.load("7") is None
+    store.save("8", {})
+    store.clear()
+    assert os.listdir(store.directory) == []
+
+
+def run_batch(*args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        main(["--fake-llm", "--no-cache", "--data", "cases.csv", "--run-dir", "run", *args])
+
+
+def submission():
+    with open("submission.csv", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_resumed_batch_runs_only_the_missing_cases(run_in_tmp):
+    run_batch("--cases", "3")
+    assert sorted(row["id"] for row in submission()) == ["1", "2", "3"]
+    run_batch("--cases", "5", "--resume")
+    records = ResultsJournal(os.path.join("run", "journal.jsonl")).records()
+    assert sorted(records) == ["1", "2", "3", "4", "5"]
+    assert len(submission()) == 5
+    with open(os.path.join("run", "journal.jsonl"), encoding="utf-8") as f:
+        assert len(f.readlines()) == 5  # cases 1-3 were not run again
@@ -0,0 +1,58 @@
+import pytest
+
+from courtroom_simulator.agents.backends import FakeBackend
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.agents.llm_cache import CacheMiss, LRUCache, ResponseCache, SQLiteCache, cache_key
+
+REQUEST = {"model": "m", "messages": [{"role": "user", "content": "Hi"}], "temperature": 0.7, "max_tokens": 10}
+RESPONSE = {"choices": [{"message": {"content": "Hello."}}], "usage": {"total_tokens": 5}, "id": "x"}
+
+
+def test_key_ignores_transport_options():
+    assert cache_key(REQUEST) == cache_key(dict(REQUEST, request_timeout=5))
+    assert cache_key(REQUEST) != cache_key(dict(REQUEST, max_tokens=11))
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+    assert cache.get("b") is None and cache.get("a") == "1"
+
+
+def test_disk_tier_survives_a_restart_and_evicts_by_size(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path)
+    cache.put(REQUEST, RESPONSE)
+    cache.disk.close()
+    reopened = ResponseCache(path)
+    assert reopened.get(REQUEST) == {"choices": [{"message": {"content": "Hello."}}], "usage": {"total_tokens": 5}}
+
+    small = SQLiteCache(str(tmp_path / "small.sqlite"), max_bytes=10)
+    small.put("a", "123456")
+    small.put("b", "123456")
+    assert small.get("a") is None and small.get("b") == "123456"
+
+
+def test_replay_mode_raises_on_a_miss():
+    cache = ResponseCache(mode="replay")
+    with pytest.raises(CacheMiss):
+        cache.get(REQUEST)
+    cache.put(REQUEST, RESPONSE)
+    assert cache.get(REQUEST)["choices"][0]["message"]["content"] == "Hello."
+    with pytest.raises(ValueError):
+        ResponseCache(mode="record")
+
+
+def test_agents_replay_recorded_calls_without_the_provider():
+    BaseAgent.cache = ResponseCache()
+    first = BaseAgent("Judge", "You are a judge.").respond("Open the trial.")
+    BaseAgent.backend = FakeBackend(server_error_rate=1.0)  # any provider call would now fail
+    BaseAgent.cache.mode = "replay"
+    again = BaseAgent("Judge", "You are a judge.")
+    assert again.respond("Open the trial.") == first
+    assert again.usage["cache_hits"] == 1
+    with pytest.raises(CacheMiss):
+        again.respond("Call the first witness.")
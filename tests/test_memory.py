@@ -0,0 +1,54 @@
+from courtroom_simulator.agents.backends import FakeBackend
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.agents.memory import RollingSummary, SlidingWindow, TokenBudget, build_memory
+from courtroom_simulator.agents.resilience import RetryPolicy
+
+
+def exchanges(n: int) -> list[dict]:
+    history = []
+    for i in range(n):
+        history += [{"role": "user", "content": f"Question {i}?"}, {"role": "assistant", "content": f"Answer {i}."}]
+    return history
+
+
+def test_sliding_window_keeps_the_last_exchanges():
+    assert SlidingWindow(max_turns=2).select(exchanges(5)) == exchanges(5)[-4:]
+    assert SlidingWindow(max_turns=0).select(exchanges(5)) == []
+
+
+def test_token_budget_keeps_whole_exchanges_that_fit():
+    history = exchanges(10)
+    selected = TokenBudget(max_tokens=30).select(history)
+    assert selected == history[-len(selected):]
+    assert len(selected) % 2 == 0 and 0 < len(selected) < len(history)
+
+
+def test_rolling_summary_folds_only_full_batches():
+    memory = RollingSummary(keep_turns=2, fold_every=3)
+    assert memory.pending(exchanges(4)) == []
+    assert memory.pending(exchanges(5)) == exchanges(5)[:6]
+    memory.absorb("Three questions were answered.", 6)
+    selected = memory.select(exchanges(5))
+    assert selected[0]["role"] == "system" and "Three questions" in selected[0]["content"]
+    assert selected[1:] == exchanges(5)[6:]
+
+
+def test_agent_condenses_older_turns_before_a_call():
+    BaseAgent.default_memory = build_memory("summary", keep_turns=2, fold_every=2)
+    agent = BaseAgent("Witness 1", "You are a witness.")
+    agent.history.load(exchanges(4))
+    agent.respond("One more question?")
+    assert agent.memory.folded == 4
+    assert agent.memory.summary
+    assert [call["kind"] for call in agent.calls] == ["summary", "turn"]
+
+
+def test_failed_summary_keeps_the_turns_verbatim():
+    BaseAgent.default_memory = build_memory("summary", keep_turns=2, fold_every=2)
+    BaseAgent.retry_policy = RetryPolicy(max_retries=0)
+    agent = BaseAgent("Witness 1", "You are a witness.")
+    agent.history.load(exchanges(4))
+    BaseAgent.backend = FakeBackend(server_error_rate=1.0)
+    agent._summarize()
+    assert agent.memory.folded == 0
+    assert agent.memory.select(agent.history) == exchanges(4)
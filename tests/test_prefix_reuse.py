@@ -0,0 +1,54 @@
+import contextlib
+import io
+
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.agents.tokens import CHARS_PER_TOKEN, MESSAGE_OVERHEAD, PrefixTracker, count_tokens
+from courtroom_simulator.case_context import CaseContext
+from courtroom_simulator.trial_factory import build_trial
+
+CASE = "CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. 7 of 1960. The accused was convicted of theft."
+SYSTEM = {"role": "system", "content": "You are a judge."}
+
+
+def tokens(message: dict) -> int:
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+
+def test_tracker_reuses_leading_messages_it_has_seen():
+    tracker = PrefixTracker()
+    first = [SYSTEM, {"role": "user", "content": "Open the trial."}]
+    assert tracker.observe(first) == 0
+    assert tracker.observe(first) == tokens(SYSTEM) + tokens(first[1])
+    reply = {"role": "assistant", "content": "Court is in session."}
+    follow_up = first + [reply, {"role": "user", "content": "Call the first witness."}]
+    assert tracker.observe(follow_up) == tokens(SYSTEM) + tokens(first[1])
+
+
+def test_tracker_counts_the_common_start_of_a_changed_message():
+    tracker = PrefixTracker()
+    tracker.observe([SYSTEM, {"role": "user", "content": "Open the trial of case 12."}])
+    shared = tracker.observe([SYSTEM, {"role": "user", "content": "Open the trial of case 34."}])
+    assert shared == tokens(SYSTEM) + len("Open the trial of case ") // CHARS_PER_TOKEN
+    # A different system prompt shares nothing
+    assert PrefixTracker().observe([{"role": "system", "content": "You are a witness."}]) == 0
+
+
+def test_system_message_does_not_depend_on_the_turn():
+    agent = BaseAgent("Judge", "You are a judge.")
+    agent.case_context = CaseContext(CASE + " The knife was recovered from the well.", brief_words=10,
+                                     chunk_words=8, overlap=2, top_k=1)
+    first = agent._format_messages("Where was the knife found?")
+    second = agent._format_messages("Who owned the shop?")
+    assert first[0] == second[0]
+    assert first[-1]["content"].endswith("Where was the knife found?")
+
+
+def test_trial_reports_prefix_reuse_per_agent():
+    with contextlib.redirect_stdout(io.StringIO()):
+        trial = build_trial(CASE)
+        trial.run_to_completion()
+    report = trial.prefix_reuse()
+    total = report.pop("total")
+    assert total["calls"] == sum(r["calls"] for r in report.values()) > 0
+    assert 0.0 < total["ratio"] < 1.0
+    assert all(r["shared_prefix_tokens"] <= r["prompt_tokens"] for r in report.values())
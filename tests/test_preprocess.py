@@ -0,0 +1,73 @@
+import contextlib
+import csv
+import io
+from collections import Counter
+
+from courtroom_simulator.batch_trialrunner import main as run_batch
+from courtroom_simulator.case_source import CaseSource
+from courtroom_simulator.case_store import CaseStore, open_cases
+from courtroom_simulator.preprocess import preprocess, reflow, strip_appearances
+
+VOCAB = Counter({"the": 50, "allowed": 3, "disciplinary": 2, "in": 40, "to": 40, "into": 2, "attorney": 2,
+                 "general": 3})
+
+
+def test_reflow_rejoins_words_split_by_hard_wraps():
+    assert reflow("t\nhe appeal was al-\nlowed", VOCAB) == "the appeal was allowed"
+    assert reflow("a discipl\ni-\nnary inquiry", VOCAB) == "a disciplinary inquiry"
+
+
+def test_reflow_keeps_real_words_and_hyphens_apart():
+    # "in" and "to" are both far more common than "into"
+    assert reflow("he went in\nto the court", VOCAB) == "he went in to the court"
+    assert reflow("the attorney-\ngeneral appeared", VOCAB) == "the attorney-general appeared"
+
+
+def test_reflow_keeps_paragraph_breaks():
+    assert reflow("first line\nsame paragraph\n\n  \nnext one", VOCAB) == "first line same paragraph\nnext one"
+
+
+def test_reflow_is_linear_in_paragraph_length():
+    # Quadratic rescans of the paragraph took seconds on a few thousand lines
+    text = "\n".join(["the appeal was al-", "lowed in", "to the court"] * 5000)
+    assert reflow(text, VOCAB).count("allowed in to the court") == 5000
+
+
+def test_strip_appearances_drops_counsel_and_the_delivery_formula():
+    text = ("civil appeal number 12 of 1961. a. k. sen, for the appellant. r. ganapathy iyer, for the "
+            "respondents. the judgment of the court was delivered by gajendragadkar, j. the facts are these.")
+    assert strip_appearances(text) == "civil appeal number 12 of 1961. gajendragadkar, j. the facts are these."
+    assert strip_appearances("no header here.") == "no header here."
+
+
+def write_cases(rows):
+    with open("cases.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "text"])
+        writer.writerows(rows)
+
+
+def test_duplicates_are_stored_once_and_resolve_to_their_case(run_in_tmp):
+    text = "CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. 1 of 1960. The accused was convicted."
+    write_cases([("1", text), ("2", "A different judgment."), ("3", text.replace(" ", "  "))])
+    report = preprocess(CaseSource("cases.csv"), "store")
+    assert report["duplicates"] == 1
+    store = CaseStore("store")
+    assert store.ids() == ["1", "2"]
+    assert store.aliases == {"3": "1"}
+    assert store.get("3") == store.get("1")
+    assert store.tokens("3") == store.tokens("1")
+    assert open_cases("cases.csv").aliases == {}
+
+
+def test_duplicate_ids_get_their_case_label_in_the_submission(run_in_tmp):
+    with open("cases.csv", encoding="utf-8") as f:
+        rows = list(csv.reader(f))[1:]
+    write_cases(rows + [("7", rows[0][1])])  # a seventh id repeating case 1
+    preprocess(CaseSource("cases.csv"), "store")
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_batch(["--fake-llm", "--no-cache", "--data", "store", "--run-dir", "run", "--cases", "6"])
+    with open("submission.csv", encoding="utf-8") as f:
+        labels = {row["id"]: row["label"] for row in csv.DictReader(f)}
+    assert sorted(labels) == ["1", "2", "3", "4", "5", "6", "7"]
+    assert labels["7"] == labels["1"] != ""
@@ -0,0 +1,95 @@
+import contextlib
+import io
+import json
+import re
+
+from courtroom_simulator.agents.backends import FakeBackend
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.agents.memory import RollingSummary
+from courtroom_simulator.protocol import (ANSWERS_SCHEMA, OBJECTIONS_SCHEMA, QUESTIONS_SCHEMA, RULINGS_SCHEMA,
+                                          conforms, parse_decision)
+from courtroom_simulator.trial_factory import build_trial
+
+CASE = "CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. 7 of 1960. The accused was convicted of theft."
+
+
+def test_conforms_checks_types_and_required_keys():
+    assert conforms({"questions": ["Where were you?"], "done": False}, QUESTIONS_SCHEMA)
+    assert not conforms({"questions": ["Where were you?"]}, QUESTIONS_SCHEMA)
+    assert not conforms({"questions": "Where were you?", "done": False}, QUESTIONS_SCHEMA)
+    assert not conforms({"questions": [1], "done": False}, QUESTIONS_SCHEMA)
+    assert not conforms(["Where were you?"], QUESTIONS_SCHEMA)
+    assert conforms({"answers": []}, ANSWERS_SCHEMA)
+
+
+def test_conforms_checks_enum_and_minimum():
+    assert conforms({"rulings": [{"question": 1, "ruling": "sustained"}]}, RULINGS_SCHEMA)
+    assert not conforms({"rulings": [{"question": 1, "ruling": "granted"}]}, RULINGS_SCHEMA)
+    assert not conforms({"objections": [{"question": 0, "grounds": "Leading."}]}, OBJECTIONS_SCHEMA)
+    # JSON booleans are not question numbers
+    assert not conforms({"objections": [{"question": True, "grounds": "Leading."}]}, OBJECTIONS_SCHEMA)
+
+
+def test_conforms_checks_max_items():
+    schema = {"type": "array", "items": {"type": "string"}, "maxItems": 2}
+    assert conforms(["a", "b"], schema)
+    assert not conforms(["a", "b", "c"], schema)
+
+
+def test_parse_decision_ignores_fences_and_prose():
+    reply = 'Here you go:\n```json\n{"questions": ["Who called you?"], "done": true}\n```'
+    assert parse_decision(reply, QUESTIONS_SCHEMA) == {"questions": ["Who called you?"], "done": True}
+    assert parse_decision('{"questions": ["Who', QUESTIONS_SCHEMA) is None
+    assert parse_decision("Who called you?", QUESTIONS_SCHEMA) is None
+
+
+QUESTIONS = ["Where were you that night?", "Who else was in the shop?", "When did you call the police?"]
+
+
+def run_compact_trial(script):
+    BaseAgent.backend = FakeBackend(script=script)
+    with contextlib.redirect_stdout(io.StringIO()):
+        trial = build_trial(CASE, compact=True)
+        trial.run_to_completion()
+    return trial
+
+
+def calls(trial, kind: str) -> int:
+    return sum(call["kind"] == kind for agent in trial._agents_by_role().values() for call in agent.calls)
+
+
+def test_free_text_fallback_reviews_questions_in_order_and_folds_each_turn_once():
+    BaseAgent.default_memory = RollingSummary(keep_turns=0, fold_every=1)
+    BaseAgent.backend = FakeBackend(latency=0.002, jitter=0.002, script=[
+        (r'\{"questions": \[', json.dumps({"questions": QUESTIONS, "done": True})),
+        (r'\{"objections": \[', "I object to all of them."),
+        (r'\{"rulings": \[', "Let me think about that."),
+        (r"Should you object\? If so", "Objection, leading the witness."),
+        (r"raised an objection", "Overruled."),
+    ])
+    with contextlib.redirect_stdout(io.StringIO()):
+        trial = build_trial(CASE, compact=True)
+        while not trial.ended:
+            trial.run_next_step()
+            for agent in trial._agents_by_role().values():
+                assert agent.memory.folded <= len(agent.history)
+    checked = [re.search(r"asked: '(.*)'", event["prompt"]).group(1)
+               for event in trial.transcript.chronological() if event["kind"] == "objection_check"]
+    assert checked and checked == QUESTIONS * (len(checked) // len(QUESTIONS))
+
+
+def test_malformed_question_list_is_retried_once_then_asked_in_free_text():
+    trial = run_compact_trial([(r'\{"questions": \[', "Where were you that night?")])
+    assert calls(trial, "questions") == 2 * calls(trial, "question") > 0
+
+
+def test_question_list_that_conforms_on_the_retry_is_used():
+    def second_try(rng, request):
+        if "did not follow this format" in request["messages"][-1]["content"]:
+            return json.dumps({"questions": QUESTIONS[:1], "done": True})
+        return '{"questions": ["Where were'
+
+    trial = run_compact_trial([(r'\{"questions": \[', second_try)])
+    assert calls(trial, "question") == 0
+    assert calls(trial, "questions") == 2 * sum(event["kind"] == "questions"
+                                                for event in trial.transcript.chronological())
@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+from courtroom_simulator.agents.rate_limit import RateLimiter, TokenBucket
+
+
+def test_bucket_reserves_until_empty_then_asks_to_wait():
+    bucket = TokenBucket(60, period=60.0)  # one unit per second
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(2) == pytest.approx(2.0, abs=0.05)
+
+
+def test_bucket_charges_an_oversized_reservation_in_full():
+    bucket = TokenBucket(6000, period=60.0)  # 100 tokens a second
+    # Larger than the whole bucket: it may go out now, but the excess is owed
+    assert bucket.reserve(9000) == 0.0
+    assert bucket.reserve(500) == pytest.approx(35.0, abs=0.1)
+
+
+def test_bucket_refills_over_time_up_to_capacity():
+    bucket = TokenBucket(100, period=1.0)
+    bucket.reserve(100)
+    time.sleep(0.05)
+    bucket.adjust(0)
+    assert 0 < bucket.tokens < 100
+    bucket.adjust(1000)
+    assert bucket.tokens == 100
+
+
+def test_limiter_settles_and_refunds_reservations():
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1000)
+    limiter.acquire(600)
+    limiter.settle(600, 100)  # used less than reserved: the rest comes back
+    assert limiter.tokens.tokens == pytest.approx(900, abs=1)
+    limiter.acquire(300)
+    limiter.refund(300)  # the request failed
+    assert limiter.tokens.tokens == pytest.approx(900, abs=1)
+
+
+def test_limiter_settles_oversized_calls_against_what_was_charged():
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=6000)
+    limiter.acquire(9000)
+    limiter.settle(9000, 8000)
+    assert limiter.tokens.tokens == pytest.approx(-2000, abs=5)
+
+
+def test_penalize_blocks_every_caller_until_retry_after():
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1e6)
+    assert limiter.penalize(retry_after=0.1) == 0.1
+    started = time.monotonic()
+    limiter.acquire(1)
+    assert time.monotonic() - started >= 0.09
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from courtroom_simulator.agents.backends import BackendError, BackendTimeout, FakeBackend, LLMBackend, RateLimitError
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.agents.rate_limit import RateLimiter
+from courtroom_simulator.agents.resilience import CircuitBreaker, CircuitOpenError, ResilientBackend, RetryPolicy
+
+REQUEST = {"model": "m", "messages": [{"role": "user", "content": "Open the trial."}], "max_tokens": 64}
+RESPONSE = {"choices": [{"message": {"content": "Court is in session."}}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 4, "total_tokens": 9}}
+
+
+class LedgerLimiter(RateLimiter):
+    """Unthrottled limiter that records what it was asked to charge and refund."""
+
+    def __init__(self):
+        super().__init__(requests_per_minute=1e6, tokens_per_minute=1e9)
+        self.acquired, self.refunded = [], []
+
+    def acquire(self, estimated_tokens: int):
+        self.acquired.append(estimated_tokens)
+        super().acquire(estimated_tokens)
+
+    async def aacquire(self, estimated_tokens: int):
+        self.acquired.append(estimated_tokens)
+        await super().aacquire(estimated_tokens)
+
+    def refund(self, estimated_tokens: int):
+        self.refunded.append(estimated_tokens)
+        super().refund(estimated_tokens)
+
+
+class SlowFirstCall(LLMBackend):
+    """The first request stalls for `stall` seconds; later ones answer at once."""
+
+    def __init__(self, stall: float, fail_hedge: bool = False):
+        self.stall = stall
+        self.fail_hedge = fail_hedge
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _next(self) -> int:
+        with self._lock:
+            self.calls += 1
+            return self.calls
+
+    def create(self, request: dict) -> dict:
+        if self._next() == 1:
+            time.sleep(self.stall)
+            return RESPONSE
+        if self.fail_hedge:
+            raise BackendError("Service unavailable", status=503)
+        return RESPONSE
+
+    async def acreate(self, request: dict) -> dict:
+        if self._next() == 1:
+            await asyncio.sleep(self.stall)
+            return RESPONSE
+        if self.fail_hedge:
+            raise BackendError("Service unavailable", status=503)
+        return RESPONSE
+
+
+def test_retry_policy_retries_only_retryable_errors():
+    policy = RetryPolicy(max_retries=2, base_delay=1.0, max_delay=3.0)
+    assert policy.should_retry(BackendError("down", status=503), 0)
+    assert not policy.should_retry(BackendError("down", status=503), 2)
+    assert not policy.should_retry(BackendError("bad request", status=400), 0)
+    assert not policy.should_retry(ValueError("bug"), 0)
+    assert policy.delay(RateLimitError("slow down", retry_after=10.0), 0) == 3.0
+    assert 0.0 <= policy.delay(BackendError("down", status=503), 5) <= 3.0
+
+
+def test_breaker_opens_after_consecutive_server_errors_and_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_after=0.05)
+    breaker.record(RateLimitError("slow down"))
+    breaker.record(BackendError("bad request", status=400))
+    assert breaker.state == "closed"
+    breaker.record(BackendError("down", status=503))
+    breaker.record(BackendTimeout("no response"))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    time.sleep(0.06)
+    breaker.before_call()  # the one trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record(None)
+    assert breaker.state == "closed"
+
+
+def test_open_breaker_fails_fast_without_calling_the_backend():
+    backend = FakeBackend(server_error_rate=1.0)
+    resilient = ResilientBackend(backend, breaker=CircuitBreaker(failure_threshold=2))
+    for _ in range(2):
+        with pytest.raises(BackendError):
+            resilient.create(REQUEST)
+    with pytest.raises(CircuitOpenError):
+        resilient.create(REQUEST)
+    assert backend.stats["requests"] == 2
+
+
+def test_slow_calls_time_out():
+    resilient = ResilientBackend(FakeBackend(latency=0.5), timeout=0.05)
+    with pytest.raises(BackendTimeout):
+        resilient.create(REQUEST)
+    with pytest.raises(BackendTimeout):
+        asyncio.run(resilient.acreate(REQUEST))
+    assert resilient.stats["timeouts"] == 2
+
+
+def test_hedge_wins_and_is_charged_to_the_rate_budget():
+    limiter = LedgerLimiter()
+    resilient = ResilientBackend(SlowFirstCall(stall=0.5), hedge_after=0.02, rate_limiter=limiter)
+    assert resilient.create(REQUEST) == RESPONSE
+    resilient = ResilientBackend(SlowFirstCall(stall=0.5), hedge_after=0.02, rate_limiter=limiter)
+    assert asyncio.run(resilient.acreate(REQUEST)) == RESPONSE
+    assert (resilient.stats["hedges"], resilient.stats["hedge_wins"]) == (1, 1)
+    assert len(limiter.acquired) == 2 and not limiter.refunded
+
+
+def test_failed_hedge_is_refunded_and_the_first_call_still_answers():
+    limiter = LedgerLimiter()
+    resilient = ResilientBackend(SlowFirstCall(stall=0.1, fail_hedge=True), hedge_after=0.02, rate_limiter=limiter)
+    assert asyncio.run(resilient.acreate(REQUEST)) == RESPONSE
+    assert resilient.stats["hedge_wins"] == 0
+    assert limiter.refunded == limiter.acquired
+
+
+def test_agent_retries_and_refunds_each_failed_attempt():
+    BaseAgent.backend = FakeBackend(server_error_rate=0.5)
+    BaseAgent.retry_policy = RetryPolicy(max_retries=50, base_delay=0.0)
+    BaseAgent.rate_limiter = limiter = LedgerLimiter()
+    agent = BaseAgent("Judge", "You are a judge.")
+    reply = agent.respond("Open the trial.")
+    failures = BaseAgent.backend.stats["server_errors"]
+    assert failures and len(limiter.refunded) == failures
+    assert len(limiter.acquired) == failures + 1
+    assert reply == BaseAgent("Judge", "You are a judge.").respond("Open the trial.")
+
+
+def test_agent_gives_up_after_its_retries():
+    BaseAgent.backend = FakeBackend(server_error_rate=1.0)
+    BaseAgent.retry_policy = RetryPolicy(max_retries=2, base_delay=0.0)
+    agent = BaseAgent("Judge", "You are a judge.")
+    with pytest.raises(BackendError):
+        agent.respond("Open the trial.")
+    assert BaseAgent.backend.stats["requests"] == 3
+    assert len(agent.history) == 0
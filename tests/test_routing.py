@@ -0,0 +1,51 @@
+from courtroom_simulator.agents.backends import FakeBackend
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.agents.routing import DEFAULT_TIERS, ModelRouter, parse_routes
+from courtroom_simulator.trial_manager import _states_ruling
+
+
+def ruling_by_tier(rng, request):
+    # The cheap tier hedges; the large tier gives a clear ruling
+    return "Sustained." if request["model"] == DEFAULT_TIERS["large"] else "Let me think about that."
+
+
+def test_procedural_calls_go_to_the_small_tier():
+    router = ModelRouter()
+    assert router.route("objection_ruling", "agent-model") == ("small", DEFAULT_TIERS["small"])
+    assert router.route("opening", "agent-model") == ("large", "agent-model")
+    assert router.can_escalate("objection_ruling")
+    assert not router.can_escalate("opening")
+    assert not ModelRouter(escalate=False).can_escalate("objection_ruling")
+
+
+def test_parse_routes_overrides_the_defaults():
+    routes = parse_routes("objection_check=large, closing=small")
+    assert routes["objection_check"] == "large"
+    assert routes["closing"] == "small"
+    assert routes["verdict_label"] == "small"
+
+
+def test_invalid_small_tier_reply_escalates_once():
+    BaseAgent.backend = FakeBackend(script=[(r"raised an objection", ruling_by_tier)])
+    BaseAgent.router = ModelRouter()
+    judge = BaseAgent("Judge", "You are a judge.")
+    reply = judge.respond("Defense raised an objection: leading.", kind="objection_ruling",
+                          validate=_states_ruling)
+    assert reply == "Sustained."
+    assert [call["tier"] for call in judge.calls] == ["small", "large"]
+    report = BaseAgent.router.report()
+    assert report["large"]["escalations"] == 1
+    assert (report["small"]["calls"], report["large"]["calls"]) == (1, 1)
+    # Only the final exchange is kept
+    assert judge.history[-1]["content"] == "Sustained."
+    assert len(judge.history) == 2
+
+
+def test_no_escalate_keeps_the_small_tier_reply():
+    BaseAgent.backend = FakeBackend(script=[(r"raised an objection", ruling_by_tier)])
+    BaseAgent.router = ModelRouter(escalate=False)
+    judge = BaseAgent("Judge", "You are a judge.")
+    reply = judge.respond("Defense raised an objection: leading.", kind="objection_ruling",
+                          validate=_states_ruling)
+    assert reply == "Let me think about that."
+    assert [call["tier"] for call in judge.calls] == ["small"]
@@ -0,0 +1,43 @@
+import asyncio
+import contextlib
+import io
+
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.agents.rate_limit import RateLimiter
+from courtroom_simulator.scheduler import TrialScheduler
+from courtroom_simulator.trial_factory import abuild_trial
+
+CASE = "CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. 7 of 1960. The accused was convicted of theft."
+
+
+def run_jobs(jobs, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return asyncio.run(TrialScheduler(max_concurrent_trials=2).arun(jobs, **kwargs))
+
+
+def test_runs_every_trial_and_reports_failures_per_case():
+    def broken():
+        raise ValueError("no such case")
+
+    finished = []
+    results = run_jobs([("a", lambda: abuild_trial(CASE)), ("b", broken), ("c", lambda: abuild_trial(CASE))],
+                       on_complete=lambda case_id, trial, elapsed: finished.append(case_id))
+    assert results["a"].ended and results["c"].ended
+    assert isinstance(results["b"], ValueError)
+    assert sorted(finished) == ["a", "c"]
+
+
+class CountingLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(requests_per_minute=1e6, tokens_per_minute=1e9)
+        self.acquired = 0
+
+    async def aacquire(self, estimated_tokens: int):
+        self.acquired += 1
+        await super().aacquire(estimated_tokens)
+
+
+def test_every_call_draws_on_the_shared_budget():
+    BaseAgent.rate_limiter = limiter = CountingLimiter()
+    results = run_jobs([(i, lambda: abuild_trial(CASE)) for i in range(3)])
+    assert limiter.acquired == sum(trial.token_usage()["calls"] for trial in results.values())
@@ -0,0 +1,75 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+from courtroom_simulator.case_store import open_cases
+from courtroom_simulator.sessions import TrialStore, remove_stale_spill_dirs
+
+
+@pytest.fixture
+def store(run_in_tmp):
+    return TrialStore(open_cases("cases.csv"), "spill", max_trials=1)
+
+
+def run_steps(store, key, steps):
+    with contextlib.redirect_stdout(io.StringIO()), store.lease(key) as trial:
+        for _ in range(steps):
+            trial.run_next_step()
+
+
+def test_least_recently_used_trial_spills_and_restores_unchanged(store):
+    first, second = TrialStore.key("s1", "1"), TrialStore.key("s2", "2")
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.create(first, "1")
+    run_steps(store, first, 3)
+    expected = list(store.get(first).transcript.chronological())
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.create(second, "2")
+    assert (store.resident()["trials"], store.resident()["spilled"]) == (1, 1)
+    assert os.path.exists(store.spill.path(first))
+    restored = store.get(first)
+    assert list(restored.transcript.chronological()) == expected
+    assert (store.stats["spilled"], store.stats["restored"]) == (2, 1)
+    run_steps(store, first, 1)
+    assert restored.steps_completed == 4
+
+
+def test_leased_trial_is_never_spilled(store):
+    first, second = TrialStore.key("s1", "1"), TrialStore.key("s2", "2")
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.create(first, "1")
+        with store.lease(first):
+            store.create(second, "2")
+            assert store.resident()["trials"] == 2
+    assert store.resident()["trials"] == 1
+
+
+def test_abandoned_spilled_trials_expire_with_their_files(store):
+    store.expire_s = 0.0
+    first, second = TrialStore.key("s1", "1"), TrialStore.key("s2", "2")
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.create(first, "1")
+        store.create(second, "2")
+        store.get(second)
+    assert first not in store and store.get(first) is None
+    assert not os.path.exists(store.spill.path(first))
+    assert store.stats["expired"] == 1
+    assert second in store
+
+
+def test_startup_clears_leftover_spill_files(run_in_tmp):
+    os.makedirs("spill")
+    with open(os.path.join("spill", "s1-old.json"), "w") as f:
+        f.write("{}")
+    TrialStore(open_cases("cases.csv"), "spill")
+    assert os.listdir("spill") == []
+
+
+def test_stale_spill_dirs_of_exited_servers_are_removed(tmp_path):
+    live, stale = tmp_path / str(os.getpid()), tmp_path / "999999999"
+    live.mkdir()
+    stale.mkdir()
+    remove_stale_spill_dirs(str(tmp_path))
+    assert live.exists() and not stale.exists()
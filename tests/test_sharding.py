@@ -0,0 +1,61 @@
+import contextlib
+import csv
+import io
+
+import pytest
+
+from courtroom_simulator.batch_trialrunner import main
+from courtroom_simulator.sharding import in_shard, parse_shard, shard_of
+
+IDS = [str(n) for n in range(1, 7)]
+
+
+def run(*args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        main(["--fake-llm", "--no-cache", "--data", "cases.csv", "--run-dir", "run", *args])
+
+
+def submission_ids() -> list[str]:
+    with open("submission.csv", encoding="utf-8", newline="") as f:
+        return sorted(row["id"] for row in csv.DictReader(f))
+
+
+def test_parse_shard():
+    assert parse_shard("2/8") == (2, 8)
+    for spec in ("8/8", "x/2", "1/0"):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+def test_every_case_lands_in_exactly_one_shard():
+    for case_id in IDS:
+        assert shard_of(case_id, 3) == shard_of(int(case_id), 3)
+        assert sum(in_shard(case_id, (i, 3)) for i in range(3)) == 1
+
+
+def test_merged_shards_cover_every_case_once(run_in_tmp):
+    for shard in ("0/2", "1/2"):
+        run("--shard", shard)
+    run("--merge")
+    assert submission_ids() == IDS
+
+
+def test_merge_without_shards_leaves_the_submission_alone(run_in_tmp):
+    (run_in_tmp / "submission.csv").write_text("id,label\n1,guilty\n")
+    (run_in_tmp / "run").mkdir()
+    with pytest.raises(SystemExit, match="No shard journals"):
+        run("--merge")
+    assert (run_in_tmp / "submission.csv").read_text() == "id,label\n1,guilty\n"
+
+
+def test_merge_picks_one_split_when_several_are_present(run_in_tmp):
+    for shard in ("0/2", "1/2", "1/3"):
+        run("--shard", shard)
+    with pytest.raises(SystemExit, match="--workers N"):
+        run("--merge")
+    assert not (run_in_tmp / "submission.csv").exists()
+    run("--merge", "--workers", "2")
+    assert submission_ids() == IDS
+    # An incomplete split merges only what it has
+    run("--merge", "--workers", "3")
+    assert submission_ids() == sorted(case_id for case_id in IDS if in_shard(case_id, (1, 3)))
@@ -0,0 +1,63 @@
+import contextlib
+import io
+
+import pytest
+
+from courtroom_simulator.agents.backends import FakeBackend
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.trial_factory import build_trial
+
+CASE = "CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. 7 of 1960. The accused was convicted of theft."
+QUESTION = "Where were you that night? No further questions."
+
+
+def run_trial(objection: str, ruling: str, speculative: bool):
+    BaseAgent.backend = FakeBackend(script=[
+        (r"Ask .* question", QUESTION),
+        (r"Should you object", objection),
+        (r"raised an objection", ruling),
+    ])
+    with contextlib.redirect_stdout(io.StringIO()):
+        trial = build_trial(CASE, speculative=speculative)
+        trial.run_to_completion()
+    return trial
+
+
+def answers(trial) -> list[str]:
+    return [event["reply"] for event in trial.transcript.chronological() if event["kind"] == "answer"]
+
+
+@pytest.mark.parametrize("objection, ruling, kept", [
+    ("No objection.", "Overruled.", True),
+    ("Objection, leading the witness.", "Overruled.", True),
+    ("Objection, leading the witness.", "Sustained.", False),
+])
+def test_speculation_accounting(objection, ruling, kept):
+    trial = run_trial(objection, ruling, speculative=True)
+    report = trial.speculation_report()
+    assert report["attempts"] > 0
+    assert report["hits"] + report["wasted_calls"] == report["attempts"]
+    assert report["hits"] == (report["attempts"] if kept else 0)
+    assert report["hit_rate"] == report["hits"] / report["attempts"]
+    assert (report["wasted_tokens"] > 0) == (not kept)
+    # Each kept answer is committed once; a discarded one never reaches the record
+    assert len(answers(trial)) == report["hits"]
+
+
+@pytest.mark.parametrize("objection, ruling", [
+    ("No objection.", "Overruled."),
+    ("Objection, leading the witness.", "Sustained."),
+])
+def test_speculation_leaves_the_same_record(objection, ruling):
+    plain = run_trial(objection, ruling, speculative=False)
+    speculative = run_trial(objection, ruling, speculative=True)
+    assert list(speculative.transcript.chronological()) == list(plain.transcript.chronological())
+    assert speculative.verdict_label == plain.verdict_label
+
+
+def test_overruled_speculation_is_committed_after_the_ruling():
+    trial = run_trial("Objection, leading the witness.", "Overruled.", speculative=True)
+    kinds = [event["kind"] for event in trial.transcript.chronological()]
+    ruling = kinds.index("objection_ruling")
+    assert kinds[ruling + 1] == "answer"
+    assert "answer" not in kinds[:ruling]
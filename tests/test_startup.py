@@ -0,0 +1,15 @@
+import importlib.util
+import os
+
+import pytest
+
+# The probe lives with the start-up benchmark; load it from there rather than copying it
+_BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "bench_startup.py")
+_spec = importlib.util.spec_from_file_location("bench_startup", _BENCH)
+bench_startup = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench_startup)
+
+
+@pytest.mark.parametrize("name", sorted(bench_startup.COMMANDS))
+def test_command_loads_no_heavy_module(name):
+    assert bench_startup.loaded_heavy(bench_startup.COMMANDS[name]) == []
@@ -0,0 +1,65 @@
+import asyncio
+import contextlib
+import io
+
+from courtroom_simulator.agents.backends import FakeBackend, LLMBackend
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.trial_factory import build_trial
+
+CASE = "CRIMINAL APPELLATE JURISDICTION: Criminal Appeal No. 7 of 1960. The accused was convicted of theft."
+
+
+class WholeReplyBackend(LLMBackend):
+    def create(self, request: dict) -> dict:
+        return {"choices": [{"message": {"content": "Court is in session."}}],
+                "usage": {"prompt_tokens": 5, "completion_tokens": 4, "total_tokens": 9}}
+
+
+def test_on_token_receives_the_reply_in_chunks():
+    chunks = []
+    agent = BaseAgent("Judge", "You are a judge.")
+    reply = agent.respond("Open the trial.", on_token=chunks.append)
+    assert len(chunks) > 1
+    assert "".join(chunks) == reply
+    assert agent.history[-1]["content"] == reply
+    # Streamed and plain calls send the same request and get the same reply
+    assert BaseAgent("Judge", "You are a judge.").respond("Open the trial.") == reply
+
+
+def test_stream_and_astream_yield_the_committed_reply():
+    agent = BaseAgent("Judge", "You are a judge.")
+    fragments = list(agent.stream("Open the trial."))
+    assert "".join(fragments) == agent.history[-1]["content"]
+
+    async def collect():
+        other = BaseAgent("Judge", "You are a judge.")
+        return [fragment async for fragment in other.astream("Open the trial.")], other
+
+    async_fragments, other = asyncio.run(collect())
+    assert async_fragments == fragments
+    assert other.history[:] == agent.history[:]
+
+
+def test_backends_without_streaming_send_one_chunk():
+    BaseAgent.backend = WholeReplyBackend()
+    chunks = []
+    reply = BaseAgent("Judge", "You are a judge.").respond("Open the trial.", on_token=chunks.append)
+    assert chunks == [reply] == ["Court is in session."]
+
+
+def test_trial_events_rebuild_every_turn():
+    BaseAgent.backend = FakeBackend(token_latency=0.0)
+    events = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        trial = build_trial(CASE)
+        trial.on_event = events.append
+        trial.run_to_completion()
+    text, ended = {}, {}
+    for event in events:
+        if event["event"] == "token":
+            text[event["turn"]] = text.get(event["turn"], "") + event["text"]
+        elif event["event"] == "turn_end":
+            ended[event["turn"]] = event["text"]
+    assert ended and all(text.get(turn, "") == reply for turn, reply in ended.items())
+    assert events[-1]["event"] == "step_end" and events[-1]["ended"]
+    assert [event["label"] for event in events if event["event"] == "verdict"] == [trial.verdict_label]
@@ -0,0 +1,52 @@
+import json
+
+from courtroom_simulator.agents.base_agent import BaseAgent
+from courtroom_simulator.agents.llm_cache import ResponseCache
+from courtroom_simulator.agents.tracing import Tracer, percentile, trace_context
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([3.0, 1.0, 2.0], 0.5) == 2.0
+    assert percentile([float(i) for i in range(1, 101)], 0.95) == 95.0
+
+
+def test_cache_hits_are_counted_but_kept_out_of_the_percentiles():
+    tracer = Tracer()
+    tracer.record_call("Judge", "turn", "default", "m", wall_s=2.0, latency_s=2.0, ttft_s=0.5,
+                       prompt_tokens=10, completion_tokens=5)
+    tracer.record_call("Judge", "turn", "default", "m", wall_s=0.0, latency_s=0.0, ttft_s=0.0,
+                       prompt_tokens=10, completion_tokens=5, cached=True)
+    summary = tracer.summary()
+    assert summary["agent"]["Judge"]["count"] == 1
+    assert summary["agent"]["Judge"]["p50_s"] == 2.0
+    assert summary["kind"]["turn"]["count"] == 1
+    assert summary["ttft"]["Judge"]["count"] == 1
+    assert summary["totals"]["calls"] == 1
+    assert summary["totals"]["cache_hits"] == 1
+    assert summary["totals"]["prompt_tokens"] == 10
+
+
+def test_agent_calls_are_traced_with_their_context(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    BaseAgent.tracer = Tracer(str(path))
+    BaseAgent.cache = ResponseCache()
+    with trace_context(case_id="7"):
+        BaseAgent("Judge", "You are a judge.").respond("Open the trial.")
+        BaseAgent("Judge", "You are a judge.").respond("Open the trial.")
+    BaseAgent.tracer.close()
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [event["cached"] for event in events] == [False, True]
+    assert all(event["case_id"] == "7" and event["agent"] == "Judge" for event in events)
+    assert BaseAgent.tracer.summary()["agent"]["Judge"]["count"] == 1
+
+
+def test_metrics_are_prometheus_text():
+    tracer = Tracer()
+    tracer.record_call("Judge", "turn", "default", "m", wall_s=1.0)
+    with tracer.span("opening_statements"):
+        pass
+    metrics = tracer.metrics()
+    assert 'courtroom_llm_calls_total{agent="Judge",kind="turn",tier="default"} 1' in metrics
+    assert 'courtroom_llm_latency_seconds_count{agent="Judge"} 1' in metrics
+    assert 'courtroom_phase_duration_seconds_count{phase="opening_statements"} 1' in metrics
@@ -0,0 +1,42 @@
+from courtroom_simulator.agents.transcript import Transcript
+
+
+def make_transcript():
+    transcript = Transcript()
+    judge, witness = transcript.add_speaker("Judge"), transcript.add_speaker("Witness 1")
+    transcript.phase = "opening"
+    transcript.append(judge, "Open the trial.", "Court is in session.")
+    transcript.phase = "prosecution_case"
+    transcript.append(witness, "Where were you?", "At home.", kind="answer")
+    transcript.append(judge, "Objection?", "Overruled.", kind="objection_ruling")
+    return transcript
+
+
+def test_truncate_drops_later_exchanges_from_every_view():
+    transcript = make_transcript()
+    judge = transcript.view(0)
+    transcript.truncate(1)
+    assert len(transcript.events) == 1
+    assert judge[:] == [{"role": "user", "content": "Open the trial."},
+                        {"role": "assistant", "content": "Court is in session."}]
+    assert len(transcript.view(1)) == 0
+
+
+def test_state_round_trip_onto_attached_speakers():
+    saved = make_transcript()
+    restored = Transcript()
+    restored.add_speaker("Witness 1")
+    restored.add_speaker("Judge")
+    restored.phase = "closing"
+    restored.load_state_dict(saved.state_dict())
+    assert list(restored.chronological()) == list(saved.chronological())
+    assert restored.view(0)[:] == saved.view(1)[:]
+    assert restored.phase == "closing"
+
+
+def test_load_keeps_lines_of_speakers_no_longer_attached():
+    restored = Transcript()
+    restored.add_speaker("Judge")
+    restored.load_state_dict(make_transcript().state_dict())
+    assert restored.speakers == ["Judge", "Witness 1"]
+    assert [event["reply"] for event in restored.chronological()] == ["Court is in session.", "At home.", "Overruled."]